@@ -0,0 +1,280 @@
+import math
+import random
+import time
+
+import basic_ops
+import pattern_ops
+
+
+def journal_score(grid, journal):
+    """Calcule le score d'une grille à partir de son journal de placements.
+
+    Args:
+        grid (Grid): Grille actuelle.
+        journal (PlacementJournal): Journal des mots de la grille.
+
+    Returns:
+        float: Score de la grille, voir basic_ops.score_grid.
+    """
+    crossings = sum(1 for index in range(grid.height * grid.width) if len(journal.owners(index)) > 1)
+    return basic_ops.score_grid(grid.occupancy(), crossings, len(journal))
+
+
+def owns_a_cell(journal, placement_id):
+    """Indique si un mot est le seul propriétaire d'au moins une de ses cases."""
+    possibility = journal.placements[placement_id]
+    return any(journal.owners(index) == {placement_id} for index in journal.cells(possibility))
+
+
+def leaves_valid_runs(grid, possibility):
+    """Vérifie qu'un mot retiré ne laisse aucune suite de lettres orpheline dans sa direction.
+
+    Args:
+        grid (Grid): Grille après le retrait du mot.
+        possibility (dict): Le mot retiré.
+
+    Returns:
+        bool: True si les lettres restantes sur l'emprise du mot sont isolées
+        dans sa direction, False sinon.
+    """
+    line, column = possibility["location"]
+    previous_filled = False
+    for k in range(len(possibility["word"])):
+        filled = not grid.is_free(line, column + k) if possibility["D"] == "E" else not grid.is_free(line + k, column)
+        if filled and previous_filled:
+            return False
+        previous_filled = filled
+    return True
+
+
+def apply_ops(grid, journal, words, ops, undo=False):
+    """Applique ou annule une liste d'opérations élémentaires.
+
+    Args:
+        grid (Grid): Grille actuelle.
+        journal (PlacementJournal): Journal des mots de la grille.
+        words (WordIndex): Mots disponibles.
+        ops (list): Opérations ("add", possibilité), ("record", possibilité)
+            pour un mot dont les lettres sont déjà écrites, ou ("remove",
+            possibilité) ; chaque opération appliquée reçoit l'identifiant de
+            son placement.
+        undo (bool): Si True, annule les opérations dans l'ordre inverse.
+    """
+    for op in (reversed(ops) if undo else ops):
+        kind, possibility = op[0], op[1]
+        if (kind != "remove") != undo:
+            op.append(journal.record(possibility) if kind == "record" else journal.add(possibility))
+            words.mark_used(possibility["word"])
+        else:
+            journal.remove(op.pop())
+            words.release(possibility["word"])
+
+
+def remove_word(grid, journal, words, placement_id, rng=random):
+    """Retire un mot, si cela laisse une grille valide.
+
+    rng n'est pas utilisé : il donne à tous les mouvements la même signature.
+
+    Returns:
+        list: Opérations appliquées, ou None si le retrait est refusé.
+    """
+    possibility = journal.placements[placement_id]
+    ops = [["remove", possibility, placement_id]]
+    apply_ops(grid, journal, words, ops)
+
+    if not leaves_valid_runs(grid, possibility):
+        apply_ops(grid, journal, words, ops, undo=True)
+        return None
+    return ops
+
+
+def place_word(grid, journal, words, possibility, ops):
+    """Ajoute un mot et les mots croisés qu'il crée, s'il est valide.
+
+    Returns:
+        bool: True si le mot a été placé, auquel cas ops est complété.
+    """
+    if possibility["word"] not in words or not basic_ops.is_valid(possibility, grid, words):
+        return False
+
+    line, column = possibility["location"]
+    new_words = basic_ops.find_new_words(possibility["word"], line, column, possibility["D"], grid, words)
+    if new_words is None:
+        return False
+
+    added = [["add", possibility]] + [["record", word] for word in new_words]
+    # Le mot principal écrit ses lettres ; les mots croisés sont seulement enregistrés
+    apply_ops(grid, journal, words, added)
+    ops.extend(added)
+    return True
+
+
+def swap_word(grid, journal, words, placement_id, rng=random):
+    """Remplace un mot par un autre mot qui respecte le même motif.
+
+    Returns:
+        list: Opérations appliquées, ou None si aucun autre mot ne convient.
+    """
+    possibility = journal.placements[placement_id]
+    ops = [["remove", possibility, placement_id]]
+    apply_ops(grid, journal, words, ops)
+
+    line, column = possibility["location"]
+    slot = (line, column, possibility["D"], len(possibility["word"]), 0)
+    pattern = pattern_ops.slot_pattern(slot, grid, words, {})
+    word = words.random_match(pattern, rng) if pattern is not None else None
+
+    if word is None or word == possibility["word"] or \
+       not place_word(grid, journal, words, {"word": word, "location": [line, column], "D": possibility["D"]}, ops):
+        apply_ops(grid, journal, words, ops, undo=True)
+        return None
+    return ops
+
+
+def shift_word(grid, journal, words, placement_id, rng=random):
+    """Décale un mot d'une case dans une direction aléatoire.
+
+    Returns:
+        list: Opérations appliquées, ou None si le décalage est invalide.
+    """
+    ops = remove_word(grid, journal, words, placement_id, rng)
+    if ops is None:
+        return None
+
+    possibility = ops[0][1]
+    line, column = possibility["location"]
+    d_line, d_column = rng.choice(((-1, 0), (1, 0), (0, -1), (0, 1)))
+    shifted = {"word": possibility["word"], "location": [line + d_line, column + d_column], "D": possibility["D"]}
+
+    inside = 0 <= line + d_line < grid.height and 0 <= column + d_column < grid.width
+    if not inside or not place_word(grid, journal, words, shifted, ops):
+        apply_ops(grid, journal, words, ops, undo=True)
+        return None
+    return ops
+
+
+def add_word(grid, journal, words, rng=random):
+    """Ajoute un mot dans un emplacement ouvert, avec le moteur par motifs.
+
+    Returns:
+        list: Opérations appliquées, ou None si aucun emplacement ne peut être rempli.
+    """
+    new, new_words = pattern_ops.find_slot_candidate(grid, words, set(), rng)
+    if new is None:
+        return None
+
+    ops = [["add", new]] + [["record", word] for word in new_words]
+    apply_ops(grid, journal, words, ops)
+    return ops
+
+
+def reopen_dead_slots(grid, journal, words, dead_slots, radius, rng=random):
+    """Retire les mots autour d'un emplacement impossible à remplir.
+
+    Un emplacement mort est tiré au hasard, et les mots qui recoupent le
+    carré de côté 2 * radius + 1 centré sur sa première case sont retirés,
+    tant que leur retrait laisse une grille valide ; les mots devenus isolés
+    sont retirés aussi. Les mots retirés redeviennent disponibles.
+
+    Args:
+        grid (Grid): Grille actuelle.
+        journal (PlacementJournal): Journal des mots de la grille.
+        words (WordIndex): Mots disponibles.
+        dead_slots (set): Emplacements morts, voir pattern_ops.find_slot_candidate.
+        radius (int): Demi-côté de la zone rouverte.
+        rng (random.Random): Générateur aléatoire. Par défaut, celui du module random.
+
+    Returns:
+        int: Nombre de mots retirés, isolés compris.
+    """
+    line, column = rng.choice(sorted(dead_slots))[:2]
+    zone = []
+    for placement_id, possibility in journal.placements.items():
+        p_line, p_column = possibility["location"]
+        length = len(possibility["word"])
+        last_line = p_line + length - 1 if possibility["D"] == "S" else p_line
+        last_column = p_column + length - 1 if possibility["D"] == "E" else p_column
+        if not (last_line < line - radius or p_line > line + radius or
+                last_column < column - radius or p_column > column + radius):
+            zone.append(placement_id)
+
+    # Un mot dont le retrait laisserait des lettres orphelines peut être retiré après ses voisins
+    removed = 0
+    while zone:
+        refused = [placement_id for placement_id in zone if placement_id in journal.placements and
+                   remove_word(grid, journal, words, placement_id, rng) is None]
+        if len(refused) == len(zone):
+            break
+        removed += len(zone) - len(refused)
+        zone = refused
+
+    for possibility in journal.cull_isolated():
+        words.release(possibility["word"])
+        removed += 1
+    return removed
+
+
+def anneal_grid(grid, journal, words, timeout, initial_temperature=5.0, final_temperature=0.05, should_stop=None,
+                rng=random):
+    """Améliore une grille remplie par recuit simulé.
+
+    À chaque pas, un mouvement est tiré au hasard (retirer, remplacer,
+    décaler ou ajouter un mot). Il est gardé s'il améliore le score, ou avec
+    une probabilité exp(delta / T) sinon, la température T décroissant
+    géométriquement de initial_temperature à final_temperature sur le temps
+    imparti. La meilleure grille rencontrée est restaurée à la fin.
+
+    Args:
+        grid (Grid): Grille à améliorer, modifiée en place.
+        journal (PlacementJournal): Journal des mots de la grille.
+        words (WordIndex): Mots disponibles.
+        timeout (float): Temps alloué, en secondes.
+        initial_temperature (float): Température de départ.
+        final_temperature (float): Température à l'échéance.
+        should_stop (callable): Fonction sans argument qui, si elle retourne
+            True, interrompt le recuit.
+        rng (random.Random): Générateur aléatoire. Par défaut, celui du module random.
+
+    Returns:
+        list: Historique (temps écoulé, occupation) relevé à chaque amélioration.
+    """
+    start_time = time.time()
+    score = journal_score(grid, journal)
+    best_score, best_words = score, journal.words()
+    history = [(0.0, grid.occupancy())]
+    moves = (remove_word, swap_word, shift_word)
+
+    while True:
+        elapsed = time.time() - start_time
+        if elapsed >= timeout or (should_stop is not None and should_stop()):
+            break
+        temperature = initial_temperature * (final_temperature / initial_temperature) ** (elapsed / timeout)
+
+        candidates = [placement_id for placement_id in journal.placements if owns_a_cell(journal, placement_id)]
+        if candidates and rng.random() < 0.75:
+            ops = rng.choice(moves)(grid, journal, words, rng.choice(candidates), rng)
+        else:
+            ops = add_word(grid, journal, words, rng)
+        if ops is None:
+            continue
+
+        new_score = journal_score(grid, journal)
+        delta = new_score - score
+        if delta >= 0 or rng.random() < math.exp(delta / temperature):
+            score = new_score
+            if score > best_score:
+                best_score, best_words = score, journal.words()
+                history.append((elapsed, grid.occupancy()))
+        else:
+            apply_ops(grid, journal, words, ops, undo=True)
+
+    # Restauration de la meilleure grille rencontrée
+    if score < best_score:
+        # Retirer un mot peut en rétablir un autre qu'il avait absorbé
+        while journal.placements:
+            words.release(journal.remove(max(journal.placements))["word"])
+        for possibility in best_words:
+            journal.add(possibility)
+            words.mark_used(possibility["word"])
+
+    return history
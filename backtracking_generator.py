@@ -0,0 +1,275 @@
+import math
+import time
+
+import basic_ops
+import instrumentation
+import pattern_ops
+from grid_generator import GridGenerator
+
+
+class BacktrackingGenerator(GridGenerator):
+    """Générateur par recherche en profondeur avec retour arrière.
+
+    À chaque nœud, l'emplacement ouvert le plus contraint (celui qui a le moins
+    de mots compatibles, parmi ceux qui croisent des lettres existantes) est
+    rempli tour à tour avec quelques-uns de ses mots. Après chaque placement,
+    une vérification en avant compte les cases qui ne peuvent plus recevoir de
+    lettre d'après l'index de mots ; si l'occupation désirée devient hors
+    d'atteinte, la branche est abandonnée. Chaque échec remonte l'ensemble des
+    placements qui en sont responsables, ce qui permet de sauter directement
+    au dernier d'entre eux (retour arrière dirigé par les conflits).
+
+    Chaque boucle d'exécution dispose de timeout secondes ; à l'échéance, la
+    meilleure grille partielle rencontrée est gardée.
+    """
+
+    # Nombre de mots essayés au plus pour un emplacement
+    max_branching = 3
+    # Nombre d'emplacements ayant au moins un mot évalués pour choisir le plus contraint
+    max_evaluated_slots = 24
+
+    def generate_content_for_grid(self):
+        """Remplit la grille par recherche avec retour arrière, dans le temps imparti."""
+        area = self.grid.height * self.grid.width
+        self.goal_cells = math.ceil(self.target_occupancy * area)
+        self.search_deadline = time.time() + self.timeout
+        self.stack = []
+        self.dead_cells = set()
+        self.dead_slots = set()
+        self.best = []
+        self.best_filled = self.grid.filled
+        self.nodes = 0
+        self.backjumps = 0
+
+        self.search()
+
+        # Retour à l'état initial puis rejeu de la meilleure branche trouvée
+        while self.stack:
+            self.undo()
+        for possibility, new_words in self.best:
+            self.place(possibility, new_words)
+        self.stack = []
+
+        occupancy = basic_ops.compute_occupancy(self.grid)
+        instrumentation.count("search.nodes", self.nodes)
+        instrumentation.count("search.backjumps", self.backjumps)
+        instrumentation.emit("search_done", nodes=self.nodes, backjumps=self.backjumps, occupancy=occupancy)
+
+    def search(self):
+        """Explore récursivement les placements à partir de l'état courant.
+
+        Returns:
+            set: Profondeurs des placements responsables de l'échec de cette
+            branche, ou None si la recherche doit s'arrêter (objectif atteint,
+            temps écoulé ou arrêt demandé).
+        """
+        depth = len(self.stack)
+        self.nodes += 1
+
+        if self.grid.filled >= self.goal_cells or time.time() > self.search_deadline:
+            return None
+        if self.stop_requested():
+            return None
+
+        slot, candidates, found_dead = self.choose_slot()
+        if slot is None:
+            self.dead_slots -= found_dead
+            return set(range(depth))
+
+        conflicts = set()
+        for possibility, new_words in candidates:
+            self.place(possibility, new_words)
+            if self.grid.filled > self.best_filled:
+                self.best_filled = self.grid.filled
+                self.best = [(entry[0], entry[1]) for entry in self.stack]
+
+            result = self.forward_check()
+            if result is None:
+                result = self.search()
+                if result is None:
+                    return None
+
+            self.undo()
+            if depth not in result:
+                # Ce choix n'a pas causé l'échec : on remonte directement plus haut
+                self.backjumps += 1
+                self.dead_slots -= found_dead
+                return result
+            conflicts |= result
+
+        self.dead_slots -= found_dead
+        conflicts.discard(depth)
+        return conflicts | self.slot_conflicts(slot)
+
+    def choose_slot(self):
+        """Choisit l'emplacement le plus contraint et quelques mots pour le remplir.
+
+        Les emplacements sans aucun mot sont ajoutés à self.dead_slots pour
+        toute la durée du nœud ; l'appelant les en retire en le quittant.
+
+        Returns:
+            tuple: L'emplacement choisi, la liste de ses candidats (possibilité,
+            nouveaux mots) et l'ensemble des emplacements trouvés sans mot.
+            L'emplacement vaut None si aucun emplacement n'a de mot.
+        """
+        slots = [slot for slot in pattern_ops.open_slots(self.grid, self.word_list.lengths())
+                 if slot not in self.dead_slots]
+        self.rng.shuffle(slots)
+        anchored = [slot for slot in slots if slot[4]]
+        found_dead = set()
+        cache = {}
+
+        for pool in (anchored, slots) if anchored else (slots,):
+            best_slot, best_pattern, best_count = None, None, None
+            evaluated = 0
+
+            for slot in sorted(pool, key=lambda slot: -slot[4]):
+                if slot in found_dead:
+                    continue
+                pattern = pattern_ops.slot_pattern(slot, self.grid, self.word_list, cache)
+                count = self.word_list.match(pattern).bit_count() if pattern is not None else 0
+                if not count:
+                    found_dead.add(slot)
+                    continue
+                if best_count is None or count < best_count:
+                    best_slot, best_pattern, best_count = slot, pattern, count
+                evaluated += 1
+                if evaluated >= self.max_evaluated_slots or best_count == 1:
+                    break
+
+            if best_slot is not None:
+                candidates = self.slot_candidates(best_slot, best_pattern)
+                if candidates:
+                    self.dead_slots |= found_dead
+                    return best_slot, candidates, found_dead
+
+        self.dead_slots |= found_dead
+        return None, None, found_dead
+
+    def slot_candidates(self, slot, pattern):
+        """Tire au plus max_branching mots valides pour un emplacement.
+
+        Args:
+            slot (tuple): Emplacement (ligne, colonne, direction, longueur, croisements).
+            pattern (list): Motif de contraintes de l'emplacement.
+
+        Returns:
+            list: Candidats (possibilité, nouveaux mots).
+        """
+        line, column, direction = slot[0], slot[1], slot[2]
+        words = set()
+        for _ in range(3 * self.max_branching):
+            words.add(self.word_list.random_match(pattern, self.rng))
+            if len(words) >= self.max_branching:
+                break
+
+        candidates = []
+        for word in sorted(words):
+            new_words = basic_ops.find_new_words(word, line, column, direction, self.grid, self.word_list)
+            if new_words is not None:
+                candidates.append(({"word": word, "location": [line, column], "D": direction}, new_words))
+
+        self.rng.shuffle(candidates)
+        return candidates
+
+    def place(self, possibility, new_words):
+        """Écrit un mot et ses mots croisés, et empile de quoi les annuler."""
+        basic_ops.add_word_to_grid(possibility, self.grid)
+        ids = [self.journal.record(possibility)] + [self.journal.record(word) for word in new_words]
+
+        for word in [possibility] + new_words:
+            self.word_list.mark_used(word["word"])
+
+        filled = {index for index in self.journal.cells(possibility) if index in self.dead_cells}
+        self.dead_cells -= filled
+        newly_dead = self.update_dead_cells(possibility) - self.dead_cells
+        self.dead_cells |= newly_dead
+
+        line, column = possibility["location"]
+        touched = {slot for slot in self.dead_slots
+                   if pattern_ops.slot_touches(slot, line, column, possibility["D"], len(possibility["word"]))}
+        self.dead_slots -= touched
+
+        self.stack.append((possibility, new_words, ids, newly_dead, filled, touched))
+
+    def undo(self):
+        """Annule le dernier placement empilé par place()."""
+        possibility, new_words, ids, newly_dead, filled, touched = self.stack.pop()
+
+        for placement_id in reversed(ids):
+            self.journal.remove(placement_id)
+        for word in [possibility] + new_words:
+            self.word_list.release(word["word"])
+
+        self.dead_cells -= newly_dead
+        self.dead_cells |= filled
+        self.dead_slots |= touched
+
+    def update_dead_cells(self, possibility):
+        """Cherche les cases vides autour d'un mot qui ne peuvent plus recevoir de lettre.
+
+        Une case est perdue quand aucune lettre ne forme un mot disponible,
+        ni avec ses voisins verticaux, ni avec ses voisins horizontaux.
+
+        Returns:
+            set: Indices des cases perdues autour du mot.
+        """
+        line, column = possibility["location"]
+        length = len(possibility["word"])
+        if possibility["D"] == "E":
+            ring = [(line + d, column + k) for k in range(length) for d in (-1, 1)]
+            ring += [(line, column - 1), (line, column + length)]
+        else:
+            ring = [(line + k, column + d) for k in range(length) for d in (-1, 1)]
+            ring += [(line - 1, column), (line + length, column)]
+
+        dead = set()
+        for i, j in ring:
+            if not self.grid.is_free(i, j) or not (0 <= i < self.grid.height and 0 <= j < self.grid.width):
+                continue
+            across = pattern_ops.allowed_letters(i, j, "E", self.grid, self.word_list)
+            down = pattern_ops.allowed_letters(i, j, "S", self.grid, self.word_list)
+            if across is not None and not across and down is not None and not down:
+                dead.add(i * self.grid.width + j)
+
+        return dead
+
+    def forward_check(self):
+        """Vérifie que l'occupation désirée reste atteignable.
+
+        Returns:
+            set: Profondeurs des placements qui bordent les cases perdues si
+            l'objectif est hors d'atteinte, None sinon.
+        """
+        reachable = self.grid.height * self.grid.width - len(self.dead_cells)
+        if reachable >= self.goal_cells:
+            return None
+
+        return self.owner_depths(self.dead_cells) | {len(self.stack) - 1}
+
+    def slot_conflicts(self, slot):
+        """Profondeurs des placements qui contraignent un emplacement."""
+        line, column, direction, length, _ = slot
+        if direction == "E":
+            cells = [(line + d, column + k) for k in range(-1, length + 1) for d in (-1, 0, 1)]
+        else:
+            cells = [(line + k, column + d) for k in range(-1, length + 1) for d in (-1, 0, 1)]
+
+        width = self.grid.width
+        return self.owner_depths(i * width + j for i, j in cells
+                                 if 0 <= i < self.grid.height and 0 <= j < width)
+
+    def owner_depths(self, indices):
+        """Profondeurs des placements de la recherche qui recouvrent ou bordent des cases."""
+        depth_of_id = {placement_id: depth for depth, entry in enumerate(self.stack) for placement_id in entry[2]}
+        width, height = self.grid.width, self.grid.height
+        depths = set()
+
+        for index in indices:
+            line, col = divmod(index, width)
+            for i, j in ((line, col), (line - 1, col), (line + 1, col), (line, col - 1), (line, col + 1)):
+                if 0 <= i < height and 0 <= j < width:
+                    depths.update(depth_of_id[owner] for owner in self.journal.owners(i * width + j)
+                                  if owner in depth_of_id)
+
+        return depths
@@ -1,22 +1,137 @@
 import random
 import time
 
+import instrumentation
+from grid import BitboardGrid, CompactGrid, Grid
+from word_index import WordIndex
 
-def generate_random_possibility(words, dim):
+# Nombre de possibilités tirées entre deux appels à should_stop dans generate_valid_candidates
+CANDIDATE_CHECK_INTERVAL = 64
+# Nombre de candidats valides rassemblés puis comparés à chaque placement de basic_grid_fill
+CANDIDATE_BATCH = 8
+
+
+def generate_random_possibility(words, dim, rng=random):
     """Génère une possibilité aléatoire pour le placement d'un mot dans la grille.
 
+    Avec un WordIndex, la position et la direction sont tirées en premier et
+    seuls les mots qui tiennent dans l'espace restant sont proposés.
+
     Args:
-        words (list): Liste des mots disponibles.
+        words (list | WordIndex): Mots disponibles.
         dim (list): Dimensions de la grille.
+        rng (random.Random): Générateur aléatoire. Par défaut, celui du module random.
+
+    Returns:
+        dict: Dictionnaire contenant le mot, sa position et sa direction, ou
+        None si aucun mot disponible ne tient à la position tirée.
+    """
+    location = [rng.randint(0, dim[0] - 1), rng.randint(0, dim[1] - 1)]
+    direction = "S" if rng.random() > 0.5 else "E"
+
+    if isinstance(words, WordIndex):
+        space = dim[1] - location[1] if direction == "E" else dim[0] - location[0]
+        word = words.random_word(space, rng=rng)
+        if word is None:
+            return None
+    else:
+        word = rng.choice(words)
+
+    return {"word": word, "location": location, "D": direction}
+
+
+def anchor_starts(grid, lengths, region=None):
+    """Recense les départs de mots qui peuvent mener à un placement.
+
+    Un départ n'est retenu que si la case qui le précède est libre. Si
+    l'espace jusqu'au bord contient une lettre ou une case voisine d'une
+    lettre (une ancre), le mot doit au moins l'atteindre ; sinon, la région
+    est libre et tout mot qui y tient convient.
+
+    Args:
+        grid (Grid): Grille actuelle.
+        lengths (list): Longueurs triées des mots du dictionnaire.
+        region (tuple): Lignes [début, fin) et colonnes [début, fin) où les
+            départs sont recensés, ou None pour toute la grille. Seules les
+            cases que ces mots peuvent atteindre sont lues : le coût suit la
+            taille de la région, pas celle de la grille.
+
+    Returns:
+        list: Départs (ligne, colonne, direction, longueur minimale, longueur maximale).
+    """
+    starts = []
+    if not lengths:
+        return starts
+    first_line, last_line, first_col, last_col = region or (0, grid.height, 0, grid.width)
+    first_line, first_col = max(0, first_line), max(0, first_col)
+    last_line, last_col = min(grid.height, last_line), min(grid.width, last_col)
+
+    for direction in ("E", "S"):
+        if direction == "E":
+            size, lines, b_start, b_end = grid.width, range(first_line, last_line), first_col, last_col
+        else:
+            size, lines, b_start, b_end = grid.height, range(first_col, last_col), first_line, last_line
+        # Cases lues : celles qu'un mot parti de la région peut atteindre
+        reach = min(size, b_end + lengths[-1] - 1)
+
+        for a in lines:
+            # Cases de la ligne (ou de la colonne), à partir de celle qui précède la région
+            low = max(0, b_start - 1)
+            coordinates = [(a, b) if direction == "E" else (b, a) for b in range(low, reach)]
+            cells = [grid.cell(line, col) for line, col in coordinates]
+
+            # Pour chaque case, position de la prochaine ancre sur la ligne (ou la colonne) ; au-delà
+            # des cases lues, seule compte l'existence d'une ancre, forcément hors de portée
+            next_anchor = [None] * (reach - low + 1)
+            for b in range(reach, size):
+                line, col = (a, b) if direction == "E" else (b, a)
+                if grid.cell(line, col) != 0 or grid.side_neighbors(line, col, direction):
+                    next_anchor[-1] = b
+                    break
+            for k in range(reach - low - 1, -1, -1):
+                line, col = coordinates[k]
+                hot = cells[k] != 0 or grid.side_neighbors(line, col, direction)
+                next_anchor[k] = low + k if hot else next_anchor[k + 1]
+
+            for b in range(b_start, b_end):
+                k = b - low
+                if b > 0 and cells[k - 1] != 0:
+                    continue
+                min_length = lengths[0] if next_anchor[k] is None else max(lengths[0], next_anchor[k] - b + 1)
+                max_length = min(lengths[-1], size - b)
+                if min_length <= max_length:
+                    starts.append((*coordinates[k], direction, min_length, max_length))
+
+    return starts
+
+
+def generate_anchored_possibility(words, grid, starts, rng=random):
+    """Génère une possibilité à partir d'un départ recensé par anchor_starts.
+
+    Le mot est tiré parmi ceux qui respectent les lettres déjà présentes sur
+    son emplacement : il ne peut donc pas entrer en collision avec la grille.
+
+    Args:
+        words (WordIndex): Mots disponibles.
+        grid (Grid): Grille actuelle.
+        starts (list): Départs possibles, non vide.
+        rng (random.Random): Générateur aléatoire. Par défaut, celui du module random.
 
     Returns:
-        dict: Dictionnaire contenant le mot, sa position et sa direction.
+        dict: Dictionnaire contenant le mot, sa position et sa direction, ou
+        None si aucun mot disponible ne convient à l'emplacement tiré.
     """
-    return {
-        "word": random.choice(words),
-        "location": [random.randint(0, dim[0] - 1), random.randint(0, dim[1] - 1)],
-        "D": "S" if random.random() > 0.5 else "E"
-    }
+    line, column, direction, min_length, max_length = rng.choice(starts)
+    length = rng.randint(min_length, max_length)
+    if direction == "E":
+        pattern = [grid.cell(line, column + k) or None for k in range(length)]
+    else:
+        pattern = [grid.cell(line + k, column) or None for k in range(length)]
+
+    word = words.random_match(pattern, rng)
+    if word is None:
+        return None
+    return {"word": word, "location": [line, column], "D": direction}
 
 
 def is_within_bounds(word_len, line, column, direction, grid_width, grid_height):
@@ -45,18 +160,17 @@ def collides_with_existing_words(word, line, column, direction, grid):
         line (int): Ligne de départ.
         column (int): Colonne de départ.
         direction (str): Direction ('E' ou 'S').
-        grid (list): Grille actuelle.
+        grid (Grid): Grille actuelle.
 
     Returns:
         bool: True si collision, False sinon.
     """
+    if isinstance(grid, BitboardGrid):
+        return grid.word_collides(word, line, column, direction)
     for k, letter in enumerate(word):
-        if direction == "E":
-            if grid[line][column + k] != 0 and grid[line][column + k] != letter:
-                return True
-        elif direction == "S":
-            if grid[line + k][column] != 0 and grid[line + k][column] != letter:
-                return True
+        cell = grid.cell(line, column + k) if direction == "E" else grid.cell(line + k, column)
+        if cell != 0 and cell != letter:
+            return True
     return False
 
 
@@ -68,11 +182,13 @@ def ends_are_isolated(word, line, column, direction, grid):
         line (int): Ligne de départ.
         column (int): Colonne de départ.
         direction (str): Direction ('E' ou 'S').
-        grid (list): Grille actuelle.
+        grid (Grid): Grille actuelle.
 
     Returns:
         bool: True si les extrémités sont isolées, False sinon.
     """
+    if isinstance(grid, BitboardGrid):
+        return grid.word_ends_are_free(word, line, column, direction)
     if direction == "E":
         return is_cell_free(line, column - 1, grid) and is_cell_free(line, column + len(word), grid)
     elif direction == "S":
@@ -83,35 +199,43 @@ def ends_are_isolated(word, line, column, direction, grid):
 def find_new_words(word, line, column, direction, grid, words):
     """Trouve de nouveaux mots créés par l'ajout d'un mot à la grille.
 
+    Chaque lettre posée sur une case vide touchant une lettre existante forme
+    un mot perpendiculaire, qui doit être disponible dans le dictionnaire.
+    Un mot croisé peut prolonger un mot déjà placé : en l'enregistrant, le
+    journal de la grille retire le mot le plus court (voir PlacementJournal).
+
     Args:
         word (str): Le mot à ajouter.
         line (int): Ligne de départ.
         column (int): Colonne de départ.
         direction (str): Direction ('E' ou 'S').
-        grid (list): Grille actuelle.
-        words (list): Liste des mots valides.
+        grid (Grid): Grille actuelle.
+        words (list | WordIndex): Mots valides.
 
     Returns:
         list: Liste des nouveaux mots trouvés ou None si invalide.
     """
     new_words = []
+    seen = {word}
 
     for k, letter in enumerate(word):
         if direction == "E":
-            if grid[line][column + k] == 0 and \
-               (line > 0 and grid[line - 1][column + k] != 0 or line < len(grid) - 1 and grid[line + 1][column + k] != 0):
-                poss_word = extract_word(line, column + k, grid, direction)
-                if poss_word not in words:
+            if grid.cell(line, column + k) == 0 and grid.vertical_neighbors(line, column + k):
+                poss_word, location = extract_crossing_word(line, column + k, letter, grid, "S")
+                if poss_word not in words or poss_word in seen:
+                    instrumentation.count("rejected.crossing")
                     return None
-                new_words.append({"D": "S", "word": poss_word, "location": [line, column + k]})
+                seen.add(poss_word)
+                new_words.append({"D": "S", "word": poss_word, "location": location})
 
         elif direction == "S":
-            if grid[line + k][column] == 0 and \
-               (column > 0 and grid[line + k][column - 1] != 0 or column < len(grid[0]) - 1 and grid[line + k][column + 1] != 0):
-                poss_word = extract_word(line + k, column, grid, direction)
-                if poss_word not in words:
+            if grid.cell(line + k, column) == 0 and grid.horizontal_neighbors(line + k, column):
+                poss_word, location = extract_crossing_word(line + k, column, letter, grid, "E")
+                if poss_word not in words or poss_word in seen:
+                    instrumentation.count("rejected.crossing")
                     return None
-                new_words.append({"D": "E", "word": poss_word, "location": [line + k, column]})
+                seen.add(poss_word)
+                new_words.append({"D": "E", "word": poss_word, "location": location})
 
     return new_words
 
@@ -122,7 +246,7 @@ def extract_word(line, column, grid, direction):
     Args:
         line (int): Ligne de départ.
         column (int): Colonne de départ.
-        grid (list): Grille actuelle.
+        grid (Grid): Grille actuelle.
         direction (str): Direction ('E' ou 'S').
 
     Returns:
@@ -130,23 +254,69 @@ def extract_word(line, column, grid, direction):
     """
     poss_word = []
     if direction == "E":
-        while column < len(grid[0]) and grid[line][column] != 0:
-            poss_word.append(grid[line][column])
+        while column < grid.width and grid.cell(line, column) != 0:
+            poss_word.append(grid.cell(line, column))
             column += 1
     elif direction == "S":
-        while line < len(grid) and grid[line][column] != 0:
-            poss_word.append(grid[line][column])
+        while line < grid.height and grid.cell(line, column) != 0:
+            poss_word.append(grid.cell(line, column))
             line += 1
     return ''.join(poss_word)
 
 
+def extract_crossing_word(line, column, letter, grid, direction):
+    """Extrait le mot formé en posant une lettre sur une case vide de la grille.
+
+    Si la grille a un cache des mots croisés (voir run_cache), les lettres
+    qui entourent la case y sont lues plutôt que relues dans la grille.
+
+    Args:
+        line (int): Ligne de la case vide.
+        column (int): Colonne de la case vide.
+        letter (str): La lettre posée.
+        grid (Grid): Grille actuelle.
+        direction (str): Direction du mot formé ('E' ou 'S').
+
+    Returns:
+        tuple: Le mot formé et sa position de départ.
+    """
+    cache = grid.run_cache
+    entry = cache.get(line, column, direction) if cache is not None else None
+    if entry is None:
+        entry = crossing_run(line, column, grid, direction)
+        if cache is not None:
+            cache.put(line, column, direction, *entry)
+
+    prefix, suffix, start = entry
+    return prefix + letter + suffix, [line, start] if direction == "E" else [start, column]
+
+
+def crossing_run(line, column, grid, direction):
+    """Lit les lettres contiguës de part et d'autre d'une case vide, dans une direction.
+
+    Returns:
+        tuple: Préfixe, suffixe et position de départ du mot formé le long de
+        la ligne (pour 'E') ou de la colonne (pour 'S').
+    """
+    if direction == "E":
+        start = column
+        while start > 0 and grid.cell(line, start - 1) != 0:
+            start -= 1
+        return extract_word(line, start, grid, direction), extract_word(line, column + 1, grid, direction), start
+
+    start = line
+    while start > 0 and grid.cell(start - 1, column) != 0:
+        start -= 1
+    return extract_word(start, column, grid, direction), extract_word(line + 1, column, grid, direction), start
+
+
 def is_valid(possibility, grid, words):
     """Détermine si une possibilité est valide dans la grille donnée.
 
     Args:
         possibility (dict): Dictionnaire contenant le mot, sa position et sa direction.
-        grid (list): Grille actuelle.
-        words (list): Liste des mots valides.
+        grid (Grid): Grille actuelle.
+        words (list | WordIndex): Mots valides.
 
     Returns:
         bool: True si valide, False sinon.
@@ -155,27 +325,97 @@ def is_valid(possibility, grid, words):
     word = possibility["word"]
     D = possibility["D"]
 
-    if not is_within_bounds(len(word), i, j, D, len(grid[0]), len(grid)):
+    if isinstance(grid, BitboardGrid):
+        conflict = grid.placement_conflict(word, i, j, D)
+        if conflict is not None:
+            instrumentation.count("rejected." + conflict)
+            return False
+        return True
+
+    if not is_within_bounds(len(word), i, j, D, grid.width, grid.height):
+        instrumentation.count("rejected.bounds")
         return False
     if collides_with_existing_words(word, i, j, D, grid):
+        instrumentation.count("rejected.collision")
         return False
     if not ends_are_isolated(word, i, j, D, grid):
+        instrumentation.count("rejected.ends")
         return False
 
     return True
 
 
-def score_candidate(candidate_word, new_words):
+def score_candidate(candidate_word, new_words, potential=0):
     """Calcule le score d'un mot candidat.
 
     Args:
         candidate_word (str): Le mot candidat.
         new_words (list): Liste des nouveaux mots créés.
+        potential (int): Nombre de cases que d'autres mots pourront encore
+            croiser (voir fit_potential).
 
     Returns:
         int: Score calculé.
     """
-    return len(candidate_word) + 10 * len(new_words)
+    return len(candidate_word) + 10 * len(new_words) + potential
+
+
+def fit_potential(possibility, grid, words):
+    """Compte les cases remplies par une possibilité qu'un autre mot pourra encore croiser.
+
+    Pour chaque case encore vide que la possibilité remplirait, les deux
+    emplacements perpendiculaires les plus courts qui commencent ou finissent
+    sur cette case sont essayés : la case compte si un mot disponible y tient
+    avec la lettre posée et les lettres déjà présentes.
+
+    Args:
+        possibility (dict): Dictionnaire contenant le mot, sa position et sa direction.
+        grid (Grid): Grille actuelle, sans la possibilité.
+        words (WordIndex): Mots disponibles.
+
+    Returns:
+        int: Nombre de cases qui peuvent encore être croisées.
+    """
+    lengths = words.lengths()
+    if not lengths:
+        return 0
+    length = lengths[0]
+    line, column = possibility["location"]
+    direction = possibility["D"]
+
+    potential = 0
+    for k, letter in enumerate(possibility["word"]):
+        i, j = (line, column + k) if direction == "E" else (line + k, column)
+        if grid.cell(i, j) != 0:
+            continue
+        for offset in (0, length - 1):
+            # Emplacement perpendiculaire dont la case (i, j) est la première ou la dernière
+            if direction == "E":
+                cells = [(i + d - offset, j) for d in range(length)]
+            else:
+                cells = [(i, j + d - offset) for d in range(length)]
+            if not all(0 <= a < grid.height and 0 <= b < grid.width for a, b in cells):
+                continue
+            pattern = [letter if (a, b) == (i, j) else grid.cell(a, b) or None for a, b in cells]
+            if words.match(pattern):
+                potential += 1
+                break
+
+    return potential
+
+
+def score_grid(occupancy, crossings, n_words):
+    """Calcule le score d'une grille entière, sur le modèle de score_candidate.
+
+    Args:
+        occupancy (float): Taux d'occupation de la grille.
+        crossings (int): Nombre de cases partagées par plusieurs mots.
+        n_words (int): Nombre de mots dans la grille.
+
+    Returns:
+        float: Score calculé.
+    """
+    return 100 * occupancy + 10 * crossings / max(n_words, 1)
 
 
 def add_word_to_grid(possibility, grid):
@@ -183,16 +423,17 @@ def add_word_to_grid(possibility, grid):
 
     Args:
         possibility (dict): Dictionnaire contenant le mot, sa position et sa direction.
-        grid (list): Grille actuelle.
+        grid (Grid): Grille actuelle.
     """
     i, j = possibility["location"]
     word = possibility["word"]
 
     if possibility["D"] == "E":
-        grid[i][j:j + len(word)] = list(word)
+        for index, letter in enumerate(word):
+            grid.set(i, j + index, letter)
     elif possibility["D"] == "S":
         for index, letter in enumerate(word):
-            grid[i + index][j] = letter
+            grid.set(i + index, j, letter)
 
 
 def select_candidate(candidates, scores):
@@ -214,62 +455,114 @@ def compute_occupancy(grid):
     """Calcule le taux d'occupation de la grille.
 
     Args:
-        grid (list): Grille actuelle.
+        grid (Grid): Grille actuelle.
 
     Returns:
         float: Taux d'occupation.
     """
-    return 1 - (sum(x.count(0) for x in grid) / (len(grid) * len(grid[0])))
+    return grid.occupancy()
 
 
-def create_empty_grid(dimensions):
+def create_empty_grid(dimensions, compact=False, bitboard=False):
     """Crée une grille vide avec les dimensions données.
 
     Args:
         dimensions (list): Dimensions de la grille.
+        compact (bool): Si True, utilise une CompactGrid stockée dans un tampon d'octets.
+        bitboard (bool): Si True, utilise une BitboardGrid, dont les vérifications
+            de placement se font par masques de bits.
 
     Returns:
-        list: Grille vide.
+        Grid | CompactGrid: Grille vide.
     """
-    return [[0] * dimensions[1] for _ in range(dimensions[0])]
+    if bitboard:
+        return BitboardGrid(dimensions)
+    return CompactGrid(dimensions) if compact else Grid(dimensions)
 
 
-def generate_valid_candidates(grid, words, dim, timeout):
+def generate_valid_candidates(grid, words, dim, timeout, should_stop=None, anchored=True, rng=random,
+                              n_candidates=1, region=None):
     """Génère de nouveaux candidats valides pour la grille.
 
+    Jusqu'à n_candidates candidats sont rassemblés dans le même temps
+    imparti. Une fois le premier trouvé après n essais, les suivants
+    disposent au plus de 2 * n_candidates * n essais en tout : le lot reste
+    bon marché quand les placements valides se font rares. Avec plusieurs
+    candidats et un WordIndex, le score de chacun tient aussi compte des
+    cases qui pourront encore être croisées (voir fit_potential).
+
     Args:
-        grid (list): Grille actuelle.
-        words (list): Liste des mots valides.
+        grid (Grid): Grille actuelle.
+        words (list | WordIndex): Mots valides.
         dim (list): Dimensions de la grille.
         timeout (int): Temps maximum pour la génération.
+        should_stop (callable): Fonction sans argument consultée toutes les
+            CANDIDATE_CHECK_INTERVAL possibilités ; si elle retourne True, la
+            recherche s'interrompt sans attendre timeout.
+        anchored (bool): Avec un WordIndex, tire les possibilités depuis les
+            départs utiles de la grille (voir anchor_starts) plutôt que
+            uniformément sur toute la grille.
+        rng (random.Random): Générateur aléatoire. Par défaut, celui du module random.
+        n_candidates (int): Nombre de candidats valides à rassembler.
+        region (tuple): Avec les tirages ancrés, limite les départs des mots à
+            une région de la grille (voir anchor_starts).
 
     Returns:
-        tuple: Liste des candidats, liste des scores et des nouveaux mots.
+        tuple: Liste des candidats, liste de leurs scores et liste des
+        nouveaux mots créés par chacun d'eux. Les trois valent None si aucune
+        possibilité ne peut être tirée : plus aucun mot disponible qui tienne
+        dans la grille, ou aucun départ utile.
     """
     candidates = []
     scores = []
     new_words = []
     tries = 0
+    max_tries = None
+
+    # Sans aucun mot disponible qui tienne dans la grille, aucune possibilité ne peut être tirée
+    if not len(words) or isinstance(words, WordIndex) and not words.count(max(dim)):
+        return None, None, None
+
+    starts = None
+    if anchored and isinstance(words, WordIndex):
+        starts = anchor_starts(grid, words.lengths(), region)
+        if not starts:
+            return None, None, None
+    with_potential = n_candidates > 1 and isinstance(words, WordIndex)
 
     start_time = time.time()
 
-    while not candidates and time.time() < start_time + timeout:
+    while len(candidates) < n_candidates and time.time() < start_time + timeout:
+        if max_tries is not None and tries >= max_tries:
+            break
         tries += 1
-        new = generate_random_possibility(words, dim)
-
+        if should_stop is not None and tries % CANDIDATE_CHECK_INTERVAL == 0 and should_stop():
+            break
+        if starts is not None:
+            new = generate_anchored_possibility(words, grid, starts, rng)
+        else:
+            new = generate_random_possibility(words, dim, rng)
+
+        if new is None:
+            instrumentation.count("rejected.no_word")
+            continue
         if not is_valid(new, grid, words):
             continue
 
-        new_words = find_new_words(new["word"], new["location"][0], new["location"][1], new["D"], grid, words)
+        crossings = find_new_words(new["word"], new["location"][0], new["location"][1], new["D"], grid, words)
 
-        if new_words is None:
-            new_words = []
+        if crossings is None:
             continue
 
-        score = score_candidate(new["word"], new_words)
+        potential = fit_potential(new, grid, words) if with_potential else 0
         candidates.append(new)
-        scores.append(score)
+        scores.append(score_candidate(new["word"], crossings, potential))
+        new_words.append(crossings)
+        if max_tries is None:
+            max_tries = 2 * n_candidates * tries
 
+    instrumentation.count("candidates.tries", tries)
+    instrumentation.count("candidates.accepted", len(candidates))
     return candidates, scores, new_words
 
 
@@ -279,17 +572,12 @@ def is_cell_free(line, col, grid):
     Args:
         line (int): Ligne de la cellule.
         col (int): Colonne de la cellule.
-        grid (list): Grille actuelle.
+        grid (Grid): Grille actuelle.
 
     Returns:
         bool: True si la cellule est libre, False sinon.
     """
-    if line < 0 or col < 0:
-        return True
-    try:
-        return grid[line][col] == 0
-    except IndexError:
-        return True
+    return grid.is_free(line, col)
 
 
 def is_isolated(possibility, grid):
@@ -297,7 +585,7 @@ def is_isolated(possibility, grid):
 
     Args:
         possibility (dict): Dictionnaire contenant le mot, sa position et sa direction.
-        grid (list): Grille actuelle.
+        grid (Grid): Grille actuelle.
 
     Returns:
         bool: True si isolé, False sinon.
@@ -308,27 +596,54 @@ def is_isolated(possibility, grid):
 
     if not ends_are_isolated(word, line, column, direction, grid):
         return False
+    if isinstance(grid, BitboardGrid):
+        return not grid.word_touches_sides(word, line, column, direction)
 
     for i in range(len(word)):
         if direction == "E":
-            if not is_cell_free(line - 1, column + i, grid) or not is_cell_free(line + 1, column + i, grid):
+            if grid.vertical_neighbors(line, column + i):
                 return False
         elif direction == "S":
-            if not is_cell_free(line + i, column - 1, grid) or not is_cell_free(line + i, column + 1, grid):
+            if grid.horizontal_neighbors(line + i, column):
                 return False
 
     return True
 
 
-def basic_grid_fill(grid, occ_goal, timeout, dim, words):
+def mark_word_used(words, word):
+    """Retire un mot placé des mots disponibles.
+
+    Args:
+        words (list | WordIndex): Mots disponibles.
+        word (str): Le mot placé.
+    """
+    if isinstance(words, WordIndex):
+        words.mark_used(word)
+    elif word in words:
+        words.remove(word)
+
+
+def basic_grid_fill(grid, occ_goal, timeout, dim, words, should_stop=None, anchored=True, rng=random,
+                    n_candidates=CANDIDATE_BATCH, region=None, record=None):
     """Remplit la grille avec des mots valides jusqu'à atteindre l'objectif d'occupation.
 
     Args:
-        grid (list): Grille actuelle.
+        grid (Grid): Grille actuelle.
         occ_goal (float): Objectif d'occupation.
         timeout (int): Temps maximum pour le remplissage.
         dim (list): Dimensions de la grille.
-        words (list): Liste des mots valides.
+        words (list | WordIndex): Mots valides. Une liste est consommée au fur et
+            à mesure, un WordIndex voit ses mots marqués comme utilisés.
+        should_stop (callable): Fonction sans argument qui, si elle retourne
+            True, interrompt le remplissage avant l'objectif.
+        anchored (bool): Voir generate_valid_candidates.
+        rng (random.Random): Générateur aléatoire. Par défaut, celui du module random.
+        n_candidates (int): Nombre de candidats valides comparés à chaque
+            placement ; le meilleur est écrit dans la grille.
+        region (tuple): Voir generate_valid_candidates.
+        record (callable): Fonction appelée avec chaque mot ajouté, mot
+            principal puis mots croisés, dès qu'il est écrit dans la grille
+            (PlacementJournal.record, par exemple).
 
     Returns:
         list: Liste des mots ajoutés.
@@ -338,12 +653,21 @@ def basic_grid_fill(grid, occ_goal, timeout, dim, words):
     added_words = []
 
     while occupancy < occ_goal and time.time() - start_time < timeout:
-        candidates, scores, new_words = generate_valid_candidates(grid, words, dim, timeout / 10)
+        if should_stop is not None and should_stop():
+            break
+
+        remaining = timeout - (time.time() - start_time)
+        candidates, scores, crossings = generate_valid_candidates(grid, words, dim, min(timeout / 10, remaining),
+                                                                  should_stop, anchored, rng, n_candidates, region)
 
+        if candidates is None:
+            instrumentation.emit("no_open_slot")
+            break
         if not candidates:
             continue
 
         new, new_score = select_candidate(candidates, scores)
+        new_words = crossings[candidates.index(new)]
 
         add_word_to_grid(new, grid)
         added_words.append(new)
@@ -351,13 +675,17 @@ def basic_grid_fill(grid, occ_goal, timeout, dim, words):
         for word in new_words:
             added_words.append(word)
 
-        words.remove(new["word"])
+        mark_word_used(words, new["word"])
         for word in new_words:
-            words.remove(word["word"])
+            mark_word_used(words, word["word"])
+        if record is not None:
+            for word in [new] + new_words:
+                record(word)
 
         occupancy = compute_occupancy(grid)
-        print(f'Word "{new["word"]}" added. Occupancy: {occupancy:.3f}. Score: {new_score}.')
+        instrumentation.count("placements")
+        instrumentation.emit("word_added", word=new["word"], occupancy=occupancy, score=new_score)
         if new_words:
-            print(f'This also created the words: {new_words}')
+            instrumentation.emit("crossings_created", new_words=new_words)
 
     return added_words
@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+""" Crossword Batch Generator
+
+Ce script produit un lot de grilles de mots croisés en une seule exécution :
+la liste de mots est lue et indexée une seule fois, puis les grilles sont
+générées sur un nombre borné de processus et écrites au format JSON, une par
+ligne, dès qu'elles sont prêtes.
+"""
+
+# Imports standards
+import argparse
+import json
+import os
+import sys
+import time
+
+# Imports personnalisés
+import file_ops
+import parallel_ops
+import render_ops
+from crossword_generator import ALGORITHM_CLASS_MAP, add_word_list_arguments, apply_word_weights, word_list_options
+
+
+def parse_cmdline_args():
+    """Utilise argparse pour obtenir les arguments de ligne de commande."""
+    parser = argparse.ArgumentParser(description='Generate a batch of crossword puzzles.')
+    add_word_list_arguments(parser)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('-c', type=int, dest="count",
+                        help="Nombre de grilles à générer avec les paramètres -d, -n, -t, -o et -a.")
+    source.add_argument('-m', type=str, dest="manifest",
+                        help="Un fichier JSON lines décrivant une grille par ligne, avec les clés "
+                             "dim, occupancy, seed et, en option, timeout, n_loops et algorithm.")
+    parser.add_argument('-d', type=int, nargs="+", default=[20, 20], dest="dim",
+                        help="Dimensions des grilles à construire.")
+    parser.add_argument('-n', type=int, default=1, dest="n_loops",
+                        help="Nombre de boucles d'exécution à effectuer par grille.")
+    parser.add_argument('-t', type=int, default=10, dest="timeout",
+                        help="Temps d'exécution maximum, en secondes, par boucle d'exécution.")
+    parser.add_argument('-o', type=float, default=1.0, dest="target_occ",
+                        help="Occupation désirée des grilles.")
+    parser.add_argument('-a', type=str, default="basic", dest="algorithm",
+                        help="L'algorithme à utiliser : " + ", ".join(ALGORITHM_CLASS_MAP) + ".")
+    parser.add_argument('-s', '--seed', type=int, default=0, dest="seed",
+                        help="Graine de base : avec -c, la grille i utilise la graine seed + i.")
+    parser.add_argument('-j', type=int, default=os.cpu_count(), dest="jobs",
+                        help="Nombre de processus de travail.")
+    parser.add_argument('--out', type=str, default=None, dest="out_file",
+                        help="Fichier JSON lines de sortie. Par défaut, la sortie standard.")
+    parser.add_argument('--render', type=str, default=None, choices=render_ops.OUTPUT_FORMATS, dest="render_format",
+                        help="Écrit aussi les grilles réussies dans ce format, plusieurs grilles par document.")
+    parser.add_argument('--render-out', type=str, default="batch.pdf", dest="render_out",
+                        help="Fichier de sortie de --render, numéroté s'il y a plusieurs documents.")
+    parser.add_argument('--per-document', type=int, default=0, dest="per_document",
+                        help="Nombre de grilles par document avec --render. Par défaut, toutes dans un seul ; "
+                             "les documents PDF sont compilés en parallèle.")
+
+    return parser.parse_args()
+
+
+def square_dimensions(dim):
+    """Complète des dimensions données avec une seule valeur en grille carrée."""
+    return dim if len(dim) == 2 else [dim[0], dim[0]]
+
+
+def read_manifest(filename, args):
+    """Lit un manifeste ligne par ligne et en déduit les tâches de génération.
+
+    Args:
+        filename (str): Fichier JSON lines, une grille par ligne.
+        args (argparse.Namespace): Arguments donnant les valeurs par défaut.
+
+    Yields:
+        tuple: Tâche de génération, voir parallel_ops.generate_batch. Un
+        algorithme inconnu donne une classe None, et une ligne invalide une
+        tâche portant son erreur : les deux sont comptées comme des échecs.
+    """
+    with open(filename) as manifest:
+        index = 0
+        for line in manifest:
+            if not line.strip():
+                continue
+            try:
+                spec = json.loads(line)
+                if not isinstance(spec, dict):
+                    raise TypeError("expected a JSON object")
+                dim = spec.get("dim", args.dim)
+                job = (index, ALGORITHM_CLASS_MAP.get(spec.get("algorithm", args.algorithm)),
+                       square_dimensions([int(value) for value in (dim if isinstance(dim, list) else [dim])]),
+                       int(spec.get("n_loops", args.n_loops)), float(spec.get("timeout", args.timeout)),
+                       float(spec.get("occupancy", args.target_occ)), int(spec.get("seed", args.seed + index)))
+            except (IndexError, TypeError, ValueError) as error:
+                job = (index, None, None, None, None, None, None, None, f"invalid manifest line: {error}")
+            yield job
+            index += 1
+
+
+def count_jobs(args):
+    """Construit les tâches de génération de l'option -c.
+
+    Args:
+        args (argparse.Namespace): Arguments de la ligne de commande.
+
+    Yields:
+        tuple: Tâche de génération, voir parallel_ops.generate_batch.
+    """
+    generator_class = ALGORITHM_CLASS_MAP[args.algorithm]
+    for index in range(args.count):
+        yield (index, generator_class, square_dimensions(args.dim), args.n_loops, args.timeout,
+               args.target_occ, args.seed + index)
+
+
+def print_batch_stats(results, elapsed):
+    """Affiche les statistiques de débit et d'échec d'un lot.
+
+    Args:
+        results (list): Résumés (occupation désirée, occupation, durée, erreur) de chaque grille.
+        elapsed (float): Durée totale du lot, en secondes.
+    """
+    failures = [result for result in results if result[3] is not None]
+    successes = [result for result in results if result[3] is None]
+    below_target = [result for result in successes if result[1] < result[0]]
+    durations = sorted(result[2] for result in results)
+
+    print(f"Generated {len(results)} grids in {elapsed:.2f} s "
+          f"({len(results) / elapsed if elapsed else 0:.2f} grids/s).", file=sys.stderr)
+    print(f"Failures: {len(failures)}. Below target occupancy: {len(below_target)}.", file=sys.stderr)
+    if durations:
+        print(f"Per grid: mean {sum(durations) / len(durations):.3f} s, "
+              f"median {durations[len(durations) // 2]:.3f} s, max {durations[-1]:.3f} s.", file=sys.stderr)
+    if successes:
+        print(f"Mean occupancy: {sum(result[1] for result in successes) / len(successes):.3f}.", file=sys.stderr)
+
+
+def render_batch(puzzles, args):
+    """Écrit les grilles d'un lot dans un ou plusieurs documents.
+
+    Args:
+        puzzles (list): Couples (grille, mots utilisés), dans l'ordre du lot.
+        args (argparse.Namespace): Arguments de la ligne de commande.
+    """
+    size = args.per_document or len(puzzles) or 1
+    chunks = [puzzles[start:start + size] for start in range(0, len(puzzles), size)]
+    paths = [render_ops.numbered_path(args.render_out, index, len(chunks)) for index in range(len(chunks))]
+
+    if args.render_format == "pdf":
+        errors = render_ops.render_pdfs(list(zip(chunks, paths)), max(1, args.jobs))
+    else:
+        errors = []
+        for chunk, path in zip(chunks, paths):
+            try:
+                render_ops.write_puzzles(chunk, path, args.render_format)
+                errors.append(None)
+            except OSError as error:
+                errors.append(error)
+
+    for path, error in zip(paths, errors):
+        if error is not None:
+            print(f"Could not render {path}: {error}", file=sys.stderr)
+    print(f"Rendered {len(puzzles)} grids into {errors.count(None)} of {len(chunks)} documents.", file=sys.stderr)
+
+
+def main():
+    # Analyse des arguments
+    args = parse_cmdline_args()
+    if args.algorithm not in ALGORITHM_CLASS_MAP:
+        print(f"Unknown algorithm: {args.algorithm}.", file=sys.stderr)
+        return
+
+    # Lecture et indexation des mots, une seule fois pour tout le lot
+    words = file_ops.read_word_index(args.word_files, **word_list_options(args))
+    apply_word_weights(words, args)
+    print(f"Read {len(words)} words from file.", file=sys.stderr)
+
+    jobs = read_manifest(args.manifest, args) if args.manifest else count_jobs(args)
+    out = open(args.out_file, "w") if args.out_file else sys.stdout
+    results = []
+    rendered = []
+    start_time = time.time()
+
+    try:
+        for result in parallel_ops.generate_batch(words, jobs, max(1, args.jobs)):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            results.append((result["target_occupancy"], result.get("occupancy", 0.0),
+                            result["elapsed"], result.get("error")))
+            if args.render_format and "grid" in result:
+                rendered.append((result["index"], result["grid"], result["words"]))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print_batch_stats(results, time.time() - start_time)
+
+    if args.render_format:
+        render_batch([(grid, words) for _, grid, words in sorted(rendered, key=lambda item: item[0])], args)
+
+
+if __name__ == "__main__":
+    main()
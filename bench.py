@@ -0,0 +1,234 @@
+#!/usr/bin/python3
+""" Crossword Generator Benchmark
+
+Ce script mesure les performances des algorithmes de génération sur un
+balayage de dimensions, d'occupations désirées et d'algorithmes, avec des
+graines fixes. La liste de mots est soit fournie, soit synthétique (générée
+de façon déterministe), pour que les résultats soient reproductibles.
+
+Chaque cas s'exécute dans un processus neuf, l'un après l'autre, afin que le
+pic de mémoire mesuré lui soit propre. Les résultats sont écrits en JSON et
+peuvent être comparés à ceux d'une exécution précédente avec --compare.
+"""
+
+# Imports standards
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Imports personnalisés
+import basic_ops
+import file_ops
+import instrumentation
+from crossword_generator import ALGORITHM_CLASS_MAP, create_generator
+
+CONSONANTS = "BCDFGHJKLMNPRSTVZ"
+VOWELS = "AEIOU"
+
+
+def parse_cmdline_args():
+    """Utilise argparse pour obtenir les arguments de ligne de commande."""
+    parser = argparse.ArgumentParser(description='Benchmark crossword grid generation.')
+    parser.add_argument('-f', type=str, default=None, dest="word_file",
+                        help="Un fichier contenant des mots, un mot par ligne. Par défaut, une liste synthétique.")
+    parser.add_argument('-w', type=int, default=60000, dest="n_words",
+                        help="Nombre de mots de la liste synthétique.")
+    parser.add_argument('-d', type=int, nargs="+", default=[10, 15, 20], dest="dims",
+                        help="Dimensions (grilles carrées) à mesurer.")
+    parser.add_argument('-o', type=float, nargs="+", default=[0.5, 0.7], dest="targets",
+                        help="Occupations désirées à mesurer.")
+    parser.add_argument('-a', type=str, nargs="+", default=list(ALGORITHM_CLASS_MAP), dest="algorithms",
+                        help="Algorithmes à mesurer : " + ", ".join(ALGORITHM_CLASS_MAP) + ".")
+    parser.add_argument('--sampling', type=str, nargs="+", default=["anchored"], choices=["anchored", "uniform"],
+                        dest="samplings",
+                        help="Tirages des positions à mesurer : depuis les ancres de la grille, ou uniformes.")
+    parser.add_argument('--candidates', type=int, nargs="+", default=[basic_ops.CANDIDATE_BATCH],
+                        dest="candidate_batches",
+                        help="Nombres de candidats comparés à chaque placement de l'algorithme basic à mesurer.")
+    parser.add_argument('-s', type=int, nargs="+", default=[0, 1, 2], dest="seeds",
+                        help="Graines de chaque cas.")
+    parser.add_argument('-n', type=int, default=1, dest="n_loops",
+                        help="Nombre de boucles d'exécution par grille.")
+    parser.add_argument('-t', type=int, default=10, dest="timeout",
+                        help="Temps d'exécution maximum, en secondes, par boucle d'exécution.")
+    parser.add_argument('--out', type=str, default=None, dest="out_file",
+                        help="Fichier JSON de sortie. Par défaut, la sortie standard.")
+    parser.add_argument('--compare', type=str, default=None, dest="baseline",
+                        help="Fichier JSON d'une exécution précédente, à comparer aux résultats.")
+
+    return parser.parse_args()
+
+
+def synthetic_word_list(filename, n_words, seed=0):
+    """Écrit une liste de mots synthétiques, alternant consonnes et voyelles.
+
+    Args:
+        filename (str): Fichier de sortie, un mot par ligne.
+        n_words (int): Nombre de mots distincts.
+        seed (int): Graine du tirage, pour une liste identique d'une exécution à l'autre.
+    """
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < n_words:
+        length = rng.randint(3, 12)
+        words.add("".join(rng.choice(CONSONANTS if i % 2 == 0 else VOWELS) for i in range(length)))
+
+    with open(filename, "w", encoding="latin1") as words_file:
+        words_file.write("\n".join(sorted(words)) + "\n")
+
+
+def run_case(word_file, algorithm, sampling, candidate_batch, dim, target, seed, n_loops, timeout):
+    """Exécute un cas de mesure, dans un processus dédié.
+
+    L'occupation est relevée à chaque appel de should_stop, ce qui donne le
+    temps mis pour atteindre l'occupation désirée sans modifier les algorithmes.
+
+    Returns:
+        dict: Mesures du cas.
+    """
+    sys.stdout = open(os.devnull, "w")
+    instrumentation.set_sink(instrumentation.SilentSink())
+    words = file_ops.read_word_index(word_file)
+
+    generator = create_generator(algorithm, words, [dim, dim], n_loops, timeout, target)
+    generator.rng = random.Random(seed)
+    generator.anchored_sampling = sampling == "anchored"
+    generator.candidate_batch = candidate_batch
+    start_time = time.perf_counter()
+    reached = []
+
+    def probe():
+        if not reached and generator.grid.occupancy() >= target:
+            reached.append(time.perf_counter() - start_time)
+        return False
+
+    def probed_cull():
+        # Dernier relevé avant que le tri des mots isolés ne fasse baisser l'occupation
+        probe()
+        cull_isolated_words()
+
+    cull_isolated_words = generator.cull_isolated_words
+    generator.cull_isolated_words = probed_cull
+    generator.should_stop = probe
+    generator.generate_grid()
+    elapsed = time.perf_counter() - start_time
+    probe()
+
+    counters = instrumentation.counters
+    tries = counters.get("candidates.tries", 0)
+    return {"algorithm": algorithm, "sampling": sampling, "candidates": candidate_batch, "dim": dim,
+            "target_occupancy": target, "seed": seed,
+            "occupancy": round(generator.grid.occupancy(), 4),
+            "time_to_target": round(reached[0], 4) if reached else None,
+            "elapsed": round(elapsed, 4),
+            "placements": generator.journal.n_recorded,
+            "placements_per_second": round(generator.journal.n_recorded / elapsed, 1) if elapsed else None,
+            "candidate_tries": tries,
+            "acceptance_rate": round(counters.get("candidates.accepted", 0) / tries, 5) if tries else None,
+            "rejections": {name.split(".", 1)[1]: value for name, value in counters.items()
+                           if name.startswith("rejected.")},
+            "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
+
+def git_commit():
+    """Retourne le commit courant du dépôt, ou None hors d'un dépôt git."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(results, baseline_file):
+    """Affiche l'évolution du temps médian par cas par rapport à une exécution précédente.
+
+    Args:
+        results (dict): Résultats de cette exécution.
+        baseline_file (str): Fichier JSON d'une exécution précédente.
+    """
+    with open(baseline_file) as baseline:
+        previous = json.load(baseline)
+
+    def medians(data):
+        groups = {}
+        for case in data["cases"]:
+            key = (case["algorithm"], case.get("sampling", "uniform"), case.get("candidates", 1), case["dim"],
+                   case["target_occupancy"])
+            value = case["time_to_target"] if case["time_to_target"] is not None else case["elapsed"]
+            groups.setdefault(key, []).append((value, case["occupancy"]))
+        return {key: (sorted(value for value, _ in group)[len(group) // 2],
+                      sum(occupancy for _, occupancy in group) / len(group))
+                for key, group in groups.items()}
+
+    old, new = medians(previous), medians(results)
+    print(f"Comparison with {baseline_file} (commit {previous['meta'].get('commit')}):", file=sys.stderr)
+    for key in sorted(new):
+        if key not in old:
+            continue
+        (old_time, old_occupancy), (new_time, new_occupancy) = old[key], new[key]
+        ratio = new_time / old_time if old_time else float("inf")
+        print(f"  {key[0]:>10} {key[1]:>8} K={key[2]:<3} {key[3]}x{key[3]} @ {key[4]:.2f}: "
+              f"median time {old_time:.3f} s -> {new_time:.3f} s (x{ratio:.2f}), "
+              f"occupancy {old_occupancy:.3f} -> {new_occupancy:.3f}", file=sys.stderr)
+
+
+def main():
+    # Analyse des arguments
+    args = parse_cmdline_args()
+    unknown = [algorithm for algorithm in args.algorithms if algorithm not in ALGORITHM_CLASS_MAP]
+    if unknown:
+        print(f"Unknown algorithms: {', '.join(unknown)}.", file=sys.stderr)
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        word_file = args.word_file
+        if word_file is None:
+            word_file = os.path.join(tmpdir, "words.txt")
+            synthetic_word_list(word_file, args.n_words)
+        # Compilation du dictionnaire une seule fois, avant les mesures
+        n_words = len(file_ops.read_word_index(word_file))
+
+        cases = list(itertools.product(args.algorithms, args.samplings, args.candidate_batches, args.dims, args.targets,
+                                       args.seeds))
+        results = {"meta": {"commit": git_commit(), "python": platform.python_version(),
+                            "platform": platform.platform(), "word_file": args.word_file or "synthetic",
+                            "n_words": n_words, "n_loops": args.n_loops, "timeout": args.timeout,
+                            "date": time.strftime("%Y-%m-%dT%H:%M:%S")},
+                   "cases": []}
+
+        # Un processus neuf par cas, pour un pic de mémoire propre à chacun
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context, max_tasks_per_child=1) as executor:
+            for algorithm, sampling, candidate_batch, dim, target, seed in cases:
+                case = executor.submit(run_case, word_file, algorithm, sampling, candidate_batch, dim, target, seed,
+                                       args.n_loops, args.timeout).result()
+                results["cases"].append(case)
+                print(f"{algorithm:>10} {sampling:>8} K={candidate_batch:<3} {dim}x{dim} @ {target:.2f} seed {seed}: "
+                      f"occupancy {case['occupancy']:.3f}, time to target {case['time_to_target']}, "
+                      f"{case['placements_per_second']} placements/s.",
+                      file=sys.stderr)
+
+    out = open(args.out_file, "w") if args.out_file else sys.stdout
+    try:
+        json.dump(results, out, indent=2)
+        out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.baseline:
+        compare_results(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
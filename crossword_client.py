@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+""" Crossword Generation Client
+
+Ce script envoie des demandes de grilles à crossword_server.py, sur une
+socket Unix ou un port TCP local, et affiche les grilles reçues.
+"""
+
+# Imports standards
+import argparse
+import asyncio
+import json
+import sys
+
+# Imports personnalisés
+import file_ops
+
+
+def parse_cmdline_args():
+    """Utilise argparse pour obtenir les arguments de ligne de commande."""
+    parser = argparse.ArgumentParser(description='Request crossword puzzles from a local crossword server.')
+    endpoint = parser.add_mutually_exclusive_group(required=True)
+    endpoint.add_argument('--socket', type=str, default=None, dest="socket_path",
+                          help="Chemin de la socket Unix du serveur.")
+    endpoint.add_argument('--port', type=int, default=None, dest="port",
+                          help="Port TCP du serveur, sur 127.0.0.1.")
+    parser.add_argument('-m', type=str, default=None, dest="manifest",
+                        help="Un fichier JSON lines de demandes, une par ligne. Sinon, -c demandes "
+                             "sont construites à partir des options suivantes.")
+    parser.add_argument('-c', type=int, default=1, dest="count",
+                        help="Nombre de grilles à demander.")
+    parser.add_argument('-d', type=int, nargs="+", default=[15, 15], dest="dim",
+                        help="Dimensions des grilles.")
+    parser.add_argument('-o', type=float, default=0.7, dest="target_occ",
+                        help="Occupation désirée des grilles.")
+    parser.add_argument('-a', type=str, default="pattern", dest="algorithm",
+                        help="L'algorithme à utiliser.")
+    parser.add_argument('-w', type=str, default=None, dest="word_list",
+                        help="Identifiant du dictionnaire à utiliser. Par défaut, celui du serveur.")
+    parser.add_argument('-s', '--seed', type=int, default=0, dest="seed",
+                        help="Graine de base : la demande i utilise la graine seed + i.")
+    parser.add_argument('-r', type=float, default=None, dest="request_timeout",
+                        help="Temps maximum, en secondes, accordé à chaque demande.")
+    parser.add_argument('--show', action="store_true", dest="show",
+                        help="Affiche chaque grille reçue plutôt que sa ligne JSON.")
+
+    return parser.parse_args()
+
+
+def build_requests(args):
+    """Construit les demandes à envoyer, depuis le manifeste ou les options."""
+    if args.manifest:
+        with open(args.manifest) as manifest:
+            return [json.loads(line) for line in manifest if line.strip()]
+
+    requests = []
+    for index in range(args.count):
+        spec = {"id": index, "dim": args.dim, "occupancy": args.target_occ, "algorithm": args.algorithm,
+                "seed": args.seed + index}
+        if args.word_list is not None:
+            spec["word_list"] = args.word_list
+        if args.request_timeout is not None:
+            spec["request_timeout"] = args.request_timeout
+        requests.append(spec)
+    return requests
+
+
+async def request_grids(args, requests):
+    """Envoie toutes les demandes sur une connexion et affiche les réponses à leur arrivée."""
+    if args.socket_path is not None:
+        reader, writer = await asyncio.open_unix_connection(args.socket_path)
+    else:
+        reader, writer = await asyncio.open_connection("127.0.0.1", args.port)
+
+    for spec in requests:
+        writer.write((json.dumps(spec) + "\n").encode("utf-8"))
+    await writer.drain()
+
+    for _ in requests:
+        line = await reader.readline()
+        if not line:
+            print("Connection closed by the server.", file=sys.stderr)
+            break
+        response = json.loads(line)
+        if args.show and "grid" in response:
+            print(f"Request {response['id']}: occupancy {response['occupancy']:.3f} "
+                  f"in {response['elapsed']:.2f} s.")
+            file_ops.write_grid_to_screen(response["grid"], [word["word"] for word in response["words"]])
+        else:
+            print(json.dumps(response))
+
+    writer.close()
+    await writer.wait_closed()
+
+
+def main():
+    args = parse_cmdline_args()
+    asyncio.run(request_grids(args, build_requests(args)))
+
+
+if __name__ == "__main__":
+    main()
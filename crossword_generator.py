@@ -8,43 +8,172 @@ l'imprimer sur du papier, si cela vous intéresse.
 
 # Imports standards
 import argparse
+import functools
+import random
 
 # Imports personnalisés
+import basic_ops
 import file_ops
 import grid_generator
-from grid_generator import GridGenerator
+import instrumentation
+import parallel_ops
+import render_ops
+from backtracking_generator import BacktrackingGenerator
+from grid_generator import GridGenerator, PatternGridGenerator
+from grid_template import GridTemplate
+from template_generator import TemplateGridGenerator
+from tiled_generator import TiledGridGenerator
+
+
+# Valeurs par défaut de -n, -t et -o
+DEFAULT_RUN = {"n_loops": 1, "timeout": 10, "target_occ": 1.0}
 
 
 def parse_cmdline_args():
     """Utilise argparse pour obtenir les arguments de ligne de commande."""
     parser = argparse.ArgumentParser(description='Generate a crossword puzzle.')
-    parser.add_argument('-f', type=str, default="words.txt", dest="word_file",
-                        help="Un fichier contenant des mots, un mot par ligne.")
+    add_word_list_arguments(parser)
     parser.add_argument('-d', type=int, nargs="+", default=[20, 20], dest="dim",
                         help="Dimensions de la grille à construire.")
-    parser.add_argument('-n', type=int, default=1, dest="n_loops",
-                        help="Nombre de boucles d'exécution à effectuer.")
-    parser.add_argument('-t', type=int, default=10, dest="timeout",
-                        help="Temps d'exécution maximum, en secondes, par boucle d'exécution.")
-    parser.add_argument('-o', type=float, default=1.0, dest="target_occ",
-                        help="Occupation désirée de la grille finale. Par défaut, 1.0, ce qui utilise tout le temps alloué.")
+    parser.add_argument('--template', type=str, default=None, dest="template_file",
+                        help="Gabarit de la grille (texte ou JSON), avec ses cases noires fixées à l'avance : "
+                             "seuls ses emplacements sont remplis, et -d et -a sont ignorés.")
+    parser.add_argument('--tiles', type=int, default=None, dest="tile_size",
+                        help="Remplit la grille par tuiles de ce côté, en parallèle sur -j processus, puis relie "
+                             "les tuiles ; -a choisit l'algorithme des tuiles. Pour les très grandes grilles.")
+    # -n, -t et -o valent None s'ils ne sont pas donnés : avec --resume, ceux du point de reprise s'appliquent
+    parser.add_argument('-n', type=int, default=None, dest="n_loops",
+                        help=f"Nombre de boucles d'exécution à effectuer. Par défaut, {DEFAULT_RUN['n_loops']}.")
+    parser.add_argument('-t', type=int, default=None, dest="timeout",
+                        help=f"Temps d'exécution maximum, en secondes, par boucle d'exécution. "
+                             f"Par défaut, {DEFAULT_RUN['timeout']}.")
+    parser.add_argument('-o', type=float, default=None, dest="target_occ",
+                        help=f"Occupation désirée de la grille finale. Par défaut, {DEFAULT_RUN['target_occ']}, "
+                             f"ce qui utilise tout le temps alloué.")
     parser.add_argument('-p', type=str, default="out.pdf", dest="out_pdf",
-                        help="Nom du fichier PDF de sortie.")
+                        help="Nom du fichier de sortie. Son extension suit --format si le nom n'est pas donné.")
+    parser.add_argument('--format', type=str, default="pdf", choices=render_ops.OUTPUT_FORMATS, dest="output_format",
+                        help="Format de sortie : PDF compilé avec LaTeX, source LaTeX seule, texte brut, JSON ou SVG.")
     parser.add_argument('-a', type=str, default="basic", dest="algorithm",
-                        help="L'algorithme à utiliser.")
+                        help="L'algorithme à utiliser : basic, pattern ou backtrack.")
+    storage = parser.add_mutually_exclusive_group()
+    storage.add_argument('--compact', action="store_true", dest="compact",
+                         help="Stocke la grille dans un tampon d'octets compact plutôt qu'en listes Python.")
+    storage.add_argument('--bitboard', action="store_true", dest="bitboard",
+                         help="Tient en plus des masques de bits de la grille, pour vérifier chaque placement "
+                              "en quelques opérations sur des entiers.")
+    parser.add_argument('--uniform-sampling', action="store_false", dest="anchored_sampling",
+                        help="Avec l'algorithme basic, tire les positions uniformément sur toute la grille plutôt "
+                             "que depuis les cases voisines des lettres et les régions libres.")
+    parser.add_argument('--no-run-cache', action="store_false", dest="run_cache",
+                        help="Relit dans la grille les lettres qui entourent chaque case vide plutôt que de les "
+                             "garder en cache entre deux propositions.")
+    parser.add_argument('--candidates', type=int, default=basic_ops.CANDIDATE_BATCH, dest="candidate_batch",
+                        help="Avec l'algorithme basic, nombre de placements valides comparés avant d'écrire le "
+                             "meilleur ; 1 écrit le premier trouvé.")
+    parser.add_argument('--anneal', type=float, default=0, dest="anneal_timeout",
+                        help="Temps, en secondes, d'amélioration de la grille remplie par recuit simulé.")
+    parser.add_argument('-j', type=int, default=1, dest="jobs",
+                        help="Nombre d'essais indépendants à lancer en parallèle, un par processus. "
+                             "La grille la plus remplie est gardée.")
+    parser.add_argument('-e', action="store_true", dest="early_stop",
+                        help="Avec -j, arrête tous les essais dès que l'un d'eux atteint l'occupation désirée.")
+    parser.add_argument('-q', '--quiet', action="store_true", dest="quiet",
+                        help="N'affiche aucun message par mot pendant la génération.")
+    parser.add_argument('--events', type=str, default=None, dest="events_file",
+                        help="Fichier où écrire les événements de génération, un objet JSON par ligne.")
+    parser.add_argument('--stats', action="store_true", dest="stats",
+                        help="Affiche à la fin les compteurs, les raisons de rejet et le temps passé "
+                             "dans les fonctions critiques (sans -j).")
+    parser.add_argument('-s', '--seed', type=int, default=None, dest="seed",
+                        help="Graine aléatoire, pour rejouer une génération. "
+                             "Avec -j, l'essai i utilise la graine seed + i.")
+    parser.add_argument('--replay-log', type=str, default=None, dest="replay_log",
+                        help="Fichier où écrire le journal de rejeu de la grille : graine, paramètres et mots "
+                             "dans l'ordre de placement (compressé si le nom finit par .gz, .bz2 ou .xz).")
+    parser.add_argument('--replay', type=str, default=None, dest="replay_file",
+                        help="Reconstruit la grille d'un journal de rejeu, sans recherche ; ses dimensions, "
+                             "son algorithme et son gabarit remplacent -d, -a et --template.")
+    parser.add_argument('--resume', type=str, default=None, dest="resume_file",
+                        help="Reprend la génération à partir d'un point de reprise, d'un journal de rejeu ou "
+                             "d'une grille écrite avec --format json, et continue de la remplir (sans -j). Ses "
+                             "dimensions, son algorithme et son gabarit remplacent -d, -a et --template ; ses "
+                             "valeurs de -n, -t, -o et --tiles s'appliquent sauf si ces options sont données.")
+    parser.add_argument('--checkpoint', type=str, default=None, dest="checkpoint_file",
+                        help="Fichier de reprise réécrit régulièrement pendant la génération (sans -j) : grille, "
+                             "mots utilisés, état du générateur aléatoire et boucles terminées.")
+    parser.add_argument('--checkpoint-interval', type=float, default=grid_generator.CHECKPOINT_INTERVAL,
+                        dest="checkpoint_interval",
+                        help="Temps, en secondes, entre deux écritures du fichier de reprise.")
 
     return parser.parse_args()
 
 
+def add_word_list_arguments(parser):
+    """Ajoute les options de lecture et de sélection de la liste de mots, communes aux scripts."""
+    parser.add_argument('-f', type=str, nargs="+", default=["words.txt"], dest="word_files",
+                        help="Un ou plusieurs fichiers contenant des mots, un mot par ligne, éventuellement "
+                             "compressés (.gz, .bz2, .xz). Les mots sont fusionnés et dédoublonnés.")
+    parser.add_argument('--no-cache', action="store_false", dest="cache",
+                        help="Relit la liste de mots sans utiliser ni écrire le dictionnaire compilé (.idx).")
+    parser.add_argument('--max-length', type=int, default=None, dest="max_length",
+                        help="Longueur maximale des mots retenus.")
+    parser.add_argument('--alphabet', type=str, default=None, dest="alphabet",
+                        help="Lettres autorisées : les mots contenant d'autres lettres sont ignorés.")
+    parser.add_argument('--blocklist', type=str, nargs="+", default=None, dest="blocklist",
+                        help="Fichiers de mots à exclure, un mot par ligne.")
+    parser.add_argument('--max-words', type=int, default=None, dest="max_words",
+                        help="Nombre maximum de mots retenus, dans l'ordre de lecture.")
+    parser.add_argument('--upper', action="store_true", dest="fold_case",
+                        help="Met tous les mots en majuscules.")
+    parser.add_argument('--strip-accents', action="store_true", dest="strip_accents",
+                        help="Retire les accents des mots.")
+    parser.add_argument('--weights', type=str, default=None, dest="weights_file",
+                        help="Fichier de poids des mots (un mot et son poids par ligne, une fréquence par exemple) : "
+                             "les mots sont tirés proportionnellement à leur poids, 1 par défaut.")
+    parser.add_argument('--length-bias', type=float, default=0.0, dest="length_bias",
+                        help="Multiplie le poids de chaque mot par sa longueur à cette puissance : "
+                             "positive, favorise les mots longs ; négative, les mots courts.")
+
+
+def word_list_options(args):
+    """Retourne les options de file_ops.read_word_index données sur la ligne de commande."""
+    return {"cache": args.cache, "max_length": args.max_length, "alphabet": args.alphabet,
+            "blocklist": args.blocklist, "max_words": args.max_words, "fold_case": args.fold_case,
+            "strip_accents": args.strip_accents}
+
+
+def apply_word_weights(words, args):
+    """Pondère les tirages de mots selon --weights et --length-bias, s'ils sont donnés."""
+    if args.weights_file is None and not args.length_bias:
+        return
+
+    frequencies = {}
+    if args.weights_file is not None:
+        frequencies = file_ops.read_word_weights(args.weights_file, fold_case=args.fold_case,
+                                                 strip_accents=args.strip_accents)
+    words.set_weights(lambda word: frequencies.get(word, 1.0) * len(word) ** args.length_bias)
+
+
+# Classes de générateur disponibles, par nom d'algorithme (option -a)
+ALGORITHM_CLASS_MAP = {"basic": GridGenerator, "pattern": PatternGridGenerator, "backtrack": BacktrackingGenerator}
+
+
 def create_generator(algorithm, word_list, dimensions, n_loops, timeout, target_occupancy):
     """Construit l'objet générateur pour l'algorithme donné."""
-    algorithm_class_map = {"basic": GridGenerator}
-
-    if algorithm not in algorithm_class_map:
+    if algorithm not in ALGORITHM_CLASS_MAP:
         print(f"Could not create generator object for unknown algorithm: {algorithm}.")
         return None
 
-    return algorithm_class_map[algorithm](word_list, dimensions, n_loops, timeout, target_occupancy)
+    return ALGORITHM_CLASS_MAP[algorithm](word_list, dimensions, n_loops, timeout, target_occupancy)
+
+
+def run_header(args, seed, dimensions):
+    """Paramètres d'une génération, enregistrés en tête des journaux de rejeu et des points de reprise."""
+    return {"seed": seed, "algorithm": args.algorithm, "dimensions": dimensions, "template": args.template_file,
+            "word_files": args.word_files, "n_loops": args.n_loops, "timeout": args.timeout,
+            "target_occupancy": args.target_occ, "anneal_timeout": args.anneal_timeout,
+            "anchored_sampling": args.anchored_sampling, "tile_size": args.tile_size}
 
 
 def main():
@@ -52,22 +181,138 @@ def main():
     args = parse_cmdline_args()
 
     # Lecture des mots depuis le fichier
-    words = file_ops.read_word_list(args.word_file)
+    words = file_ops.read_word_index(args.word_files, **word_list_options(args))
+    apply_word_weights(words, args)
     print(f"Read {len(words)} words from file.")
 
+    # Lecture du journal de rejeu ou du point de reprise, dont les paramètres remplacent ceux de la ligne de commande
+    placements = None
+    source_file = args.replay_file or args.resume_file
+    if source_file:
+        try:
+            source_header, placements = file_ops.read_replay_log(source_file)
+        except (OSError, ValueError) as error:
+            print(f"Could not read replay log {source_file}: {error}")
+            return
+        args.dim = source_header["dimensions"]
+        args.algorithm = source_header.get("algorithm", args.algorithm)
+        args.template_file = source_header.get("template", args.template_file)
+        if args.seed is None:
+            args.seed = source_header.get("seed")
+        if args.resume_file:
+            # Les options données sur la ligne de commande l'emportent sur celles du point de reprise
+            if args.tile_size is None:
+                args.tile_size = source_header.get("tile_size")
+            for dest, key in (("n_loops", "n_loops"), ("timeout", "timeout"), ("target_occ", "target_occupancy")):
+                if getattr(args, dest) is None:
+                    setattr(args, dest, source_header.get(key))
+    for dest, default in DEFAULT_RUN.items():
+        if getattr(args, dest) is None:
+            setattr(args, dest, default)
+
     # Construction de l'objet générateur
     dim = args.dim if len(args.dim) == 2 else [args.dim[0], args.dim[0]]
-    generator = create_generator(args.algorithm, words, dim, args.n_loops, args.timeout, args.target_occ)
+    template = None
+    if args.template_file:
+        try:
+            template = GridTemplate.load(args.template_file)
+        except (OSError, ValueError) as error:
+            print(f"Could not read grid template {args.template_file}: {error}")
+            return
+        dim = template.dimensions
+        try:
+            generator = TemplateGridGenerator(words, dim, args.n_loops, args.timeout, args.target_occ,
+                                              template=template)
+        except ValueError as error:
+            print(f"Could not use grid template {args.template_file}: {error}")
+            return
+        print(f"Using a {dim[0]}x{dim[1]} template with {len(template.slots)} slots.")
+    elif args.tile_size:
+        if args.algorithm not in ALGORITHM_CLASS_MAP:
+            print(f"Could not create generator object for unknown algorithm: {args.algorithm}.")
+            return
+        generator = TiledGridGenerator(words, dim, args.n_loops, args.timeout, args.target_occ,
+                                       tile_class=ALGORITHM_CLASS_MAP[args.algorithm], tile_size=args.tile_size,
+                                       jobs=max(1, args.jobs))
+        print(f"Filling {len(generator.tiles())} tiles on {generator.jobs} processes.")
+    else:
+        generator = create_generator(args.algorithm, words, dim, args.n_loops, args.timeout, args.target_occ)
     if not generator:
         return
+    generator.compact_grid = args.compact
+    generator.bitboard_grid = args.bitboard
+    generator.run_cache = args.run_cache
+    generator.anneal_timeout = args.anneal_timeout
+    generator.anchored_sampling = args.anchored_sampling
+    generator.candidate_batch = max(1, args.candidate_batch)
+    generator.checkpoint_file = args.checkpoint_file
+    generator.checkpoint_interval = args.checkpoint_interval
+
+    # Destination des événements de génération et chronométrage
+    events_file = open(args.events_file, "w") if args.events_file else None
+    if events_file:
+        instrumentation.set_sink(instrumentation.JsonLinesSink(events_file))
+    elif args.quiet:
+        instrumentation.set_sink(instrumentation.SilentSink())
+    if args.stats:
+        instrumentation.enable_timers()
+
+    seed = args.seed if args.seed is not None else random.SystemRandom().randrange(2 ** 32)
+    print(f"Using random seed {seed}.")
+    generator.checkpoint_header = run_header(args, seed, dim)
 
     # Génération de la grille
-    generator.generate_grid()
+    if placements is not None:
+        generator.rng = random.Random(seed)
+        if args.resume_file and "checkpoint" in source_header:
+            generator.restore_checkpoint(source_header, placements)
+            print(f"Resuming from {source_file} after {generator.loops_done} loops, with {len(placements)} words.")
+        else:
+            generator.replay(placements)
+            print(f"Replayed {len(placements)} words from {source_file}.")
+        if args.resume_file:
+            generator.generate_grid(resume=True)
+        grid = generator.get_grid()
+        words_in_grid = generator.get_words_in_grid()
+    elif args.jobs > 1 and not args.tile_size:
+        generator_class = functools.partial(type(generator), compact_grid=args.compact, bitboard_grid=args.bitboard,
+                                            run_cache=args.run_cache, anneal_timeout=args.anneal_timeout,
+                                            anchored_sampling=args.anchored_sampling,
+                                            candidate_batch=max(1, args.candidate_batch))
+        if template is not None:
+            generator_class = functools.partial(generator_class, template=template)
+        seed, _, grid, words_in_grid = parallel_ops.generate_best_grid(
+            generator_class, words, dim, args.n_loops, args.timeout, args.target_occ,
+            args.jobs, seed, args.early_stop)
+        print(f"Kept the grid of the attempt with seed {seed}.")
+    else:
+        generator.rng = random.Random(seed)
+        generator.generate_grid()
+        grid = generator.get_grid()
+        words_in_grid = generator.get_words_in_grid()
+
+    if events_file:
+        events_file.close()
+    if args.stats:
+        instrumentation.print_report()
+
+    # Journal de rejeu : les mots dans l'ordre de placement suffisent à reconstruire la grille
+    if args.replay_log:
+        try:
+            file_ops.write_replay_log(args.replay_log, run_header(args, seed, dim), words_in_grid)
+            print(f"Wrote the replay log to {args.replay_log}.")
+        except OSError as error:
+            print(f"Could not write replay log {args.replay_log}: {error}")
 
     # Écriture de la grille
-    grid = generator.get_grid()
-    words_in_grid = generator.get_words_in_grid()
-    file_ops.write_grid_to_file(grid, words=[word for word in words_in_grid], out_pdf=args.out_pdf)
+    out_path = args.out_pdf
+    if out_path == "out.pdf" and args.output_format != "pdf":
+        out_path = "out." + {"text": "txt"}.get(args.output_format, args.output_format)
+    try:
+        render_ops.write_puzzles([(grid, words_in_grid)], out_path, args.output_format)
+        print(f"Wrote the grid to {out_path}.")
+    except (OSError, RuntimeError) as error:
+        print(f"Could not write {out_path}: {error}")
     file_ops.write_grid_to_screen(grid, words_in_grid)
 
 
@@ -0,0 +1,265 @@
+#!/usr/bin/python3
+""" Crossword Generation Server
+
+Ce script sert des grilles de mots croisés à la demande. Les demandes sont
+des objets JSON, un par ligne, reçus sur l'entrée standard ou sur une socket
+locale (Unix ou TCP sur 127.0.0.1) ; chaque grille est renvoyée sous forme
+d'une ligne JSON dès qu'elle est prête, avec l'identifiant de sa demande.
+
+Les dictionnaires sont préchargés une fois dans chaque processus de travail.
+Le nombre de demandes traitées en même temps et en attente est borné, et
+chaque demande dispose d'un temps maximum au-delà duquel la meilleure grille
+obtenue jusque-là est rendue. Tout fonctionne hors ligne.
+"""
+
+# Imports standards
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Imports personnalisés
+import file_ops
+import parallel_ops
+from crossword_generator import ALGORITHM_CLASS_MAP
+
+# Délai laissé à un processus de travail, au-delà du temps de la demande, pour rendre sa grille
+RESULT_GRACE_PERIOD = 5.0
+
+
+def parse_cmdline_args():
+    """Utilise argparse pour obtenir les arguments de ligne de commande."""
+    parser = argparse.ArgumentParser(description='Serve crossword puzzles over stdin or a local socket.')
+    parser.add_argument('-f', type=str, nargs="+", default=["words.txt"], dest="word_files",
+                        help="Dictionnaires à précharger, sous la forme fichier ou identifiant=fichier. "
+                             "Le premier est le dictionnaire par défaut.")
+    endpoint = parser.add_mutually_exclusive_group()
+    endpoint.add_argument('--socket', type=str, default=None, dest="socket_path",
+                          help="Chemin d'une socket Unix à écouter.")
+    endpoint.add_argument('--port', type=int, default=None, dest="port",
+                          help="Port TCP à écouter, sur 127.0.0.1 uniquement.")
+    parser.add_argument('-j', type=int, default=os.cpu_count(), dest="jobs",
+                        help="Nombre de processus de travail.")
+    parser.add_argument('-c', type=int, default=None, dest="concurrency",
+                        help="Nombre maximum de grilles générées en même temps. Par défaut, -j.")
+    parser.add_argument('-q', type=int, default=64, dest="max_pending",
+                        help="Nombre maximum de demandes acceptées à la fois, en cours ou en attente ; "
+                             "au-delà, les demandes sont refusées.")
+    parser.add_argument('-r', type=float, default=30.0, dest="request_timeout",
+                        help="Temps maximum, en secondes, accordé à une demande ; une demande peut en "
+                             "demander moins avec la clé request_timeout.")
+
+    return parser.parse_args()
+
+
+def parse_word_files(word_files):
+    """Associe chaque dictionnaire à son identifiant.
+
+    Args:
+        word_files (list): Éléments "fichier" ou "identifiant=fichier".
+
+    Returns:
+        dict: Fichier de chaque dictionnaire, par identifiant. Sans
+        identifiant, un fichier est connu sous son nom sans extension.
+    """
+    dictionaries = {}
+    for entry in word_files:
+        name, _, filename = entry.rpartition("=")
+        dictionaries[name or os.path.splitext(os.path.basename(filename))[0]] = filename
+    return dictionaries
+
+
+class GenerationService:
+    """Distribue les demandes de grilles à un groupe de processus, avec contrôle d'admission."""
+
+    def __init__(self, word_files, n_workers, concurrency, max_pending, request_timeout):
+        """Démarre les processus de travail.
+
+        Args:
+            word_files (dict): Fichier de chaque dictionnaire, par identifiant.
+            n_workers (int): Nombre de processus de travail.
+            concurrency (int): Nombre maximum de grilles générées en même temps.
+            max_pending (int): Nombre maximum de demandes acceptées à la fois.
+            request_timeout (float): Temps maximum accordé à une demande.
+        """
+        self.default_word_list = next(iter(word_files))
+        self.max_pending = max_pending
+        self.request_timeout = request_timeout
+        self.pending = 0
+        self.served = 0
+        self.slots = asyncio.Semaphore(concurrency)
+        self.executor = ProcessPoolExecutor(max_workers=n_workers, initializer=parallel_ops._init_service_worker,
+                                            initargs=(word_files,))
+
+    def close(self):
+        """Arrête les processus de travail."""
+        self.executor.shutdown(cancel_futures=True)
+
+    async def submit(self, spec):
+        """Traite une demande de grille.
+
+        Args:
+            spec (dict): Demande, avec les clés id, dim, occupancy, word_list,
+                seed et, en option, algorithm, timeout, n_loops et request_timeout.
+
+        Returns:
+            dict: Résultat de la grille (voir parallel_ops._run_batch_job), ou
+            une erreur ("busy", "timeout", demande invalide).
+        """
+        request_id = spec.get("id")
+        if self.pending >= self.max_pending:
+            return {"id": request_id, "error": "busy"}
+
+        try:
+            dim = spec.get("dim", [15, 15])
+            dim = dim if isinstance(dim, list) else [dim]
+            dimensions = [int(dim[0]), int(dim[-1])]
+            request_timeout = min(float(spec.get("request_timeout", self.request_timeout)), self.request_timeout)
+            job = (spec.get("word_list", self.default_word_list), self.served,
+                   ALGORITHM_CLASS_MAP.get(spec.get("algorithm", "pattern")), dimensions,
+                   int(spec.get("n_loops", 1)), float(spec.get("timeout", request_timeout)),
+                   float(spec.get("occupancy", 0.7)), int(spec.get("seed", self.served)))
+        except (TypeError, ValueError, IndexError) as error:
+            return {"id": request_id, "error": f"invalid request: {error}"}
+
+        # Le temps de la demande court depuis son admission, attente comprise
+        deadline = time.time() + request_timeout
+        self.pending += 1
+        self.served += 1
+        try:
+            result = await asyncio.wait_for(self._run(job, deadline), request_timeout + RESULT_GRACE_PERIOD)
+        except asyncio.TimeoutError:
+            result = {"error": "timeout"}
+        finally:
+            self.pending -= 1
+
+        result["id"] = request_id
+        return result
+
+    async def _run(self, job, deadline):
+        """Attend une place libre puis génère la grille d'une demande admise.
+
+        Args:
+            job (tuple): Arguments de parallel_ops._run_service_job.
+            deadline (float): Instant (time.time()) auquel la demande expire.
+
+        Returns:
+            dict: Résultat de la grille.
+
+        Raises:
+            asyncio.TimeoutError: La demande a expiré avant qu'une place se libère.
+        """
+        await asyncio.wait_for(self.slots.acquire(), max(0.0, deadline - time.time()))
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, parallel_ops._run_service_job,
+                                                                    *job, deadline)
+        finally:
+            self.slots.release()
+
+
+async def serve_lines(service, read_line, write_line):
+    """Traite un flux de demandes, une par ligne, et écrit les réponses au fil de l'eau.
+
+    Args:
+        service (GenerationService): Le service.
+        read_line (coroutine function): Lit la ligne suivante, b"" ou "" en fin de flux.
+        write_line (coroutine function): Écrit une ligne de réponse.
+    """
+    tasks = set()
+
+    async def answer(line):
+        try:
+            spec = json.loads(line)
+            response = await service.submit(spec) if isinstance(spec, dict) else {"error": "invalid request"}
+        except json.JSONDecodeError as error:
+            response = {"error": f"invalid JSON: {error}"}
+        await write_line(json.dumps(response) + "\n")
+
+    while True:
+        line = await read_line()
+        if not line:
+            break
+        if line.strip():
+            task = asyncio.create_task(answer(line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.wait(tasks)
+
+
+async def serve_stdio(service):
+    """Sert les demandes lues sur l'entrée standard, jusqu'à sa fermeture."""
+    loop = asyncio.get_running_loop()
+    lock = asyncio.Lock()
+
+    async def read_line():
+        return await loop.run_in_executor(None, sys.stdin.readline)
+
+    async def write_line(line):
+        async with lock:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+
+    await serve_lines(service, read_line, write_line)
+
+
+async def serve_socket(service, socket_path=None, port=None):
+    """Sert les demandes reçues sur une socket Unix ou un port TCP local."""
+    async def handle_connection(reader, writer):
+        lock = asyncio.Lock()
+
+        async def write_line(line):
+            async with lock:
+                writer.write(line.encode("utf-8"))
+                await writer.drain()
+
+        try:
+            await serve_lines(service, reader.readline, write_line)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    if socket_path is not None:
+        server = await asyncio.start_unix_server(handle_connection, path=socket_path)
+    else:
+        server = await asyncio.start_server(handle_connection, host="127.0.0.1", port=port)
+
+    print(f"Listening on {socket_path or f'127.0.0.1:{port}'}.", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+async def run(args):
+    word_files = parse_word_files(args.word_files)
+    service = GenerationService(word_files, max(1, args.jobs), args.concurrency or max(1, args.jobs),
+                                args.max_pending, args.request_timeout)
+    try:
+        if args.socket_path is not None or args.port is not None:
+            await serve_socket(service, args.socket_path, args.port)
+        else:
+            await serve_stdio(service)
+    finally:
+        service.close()
+
+
+def main():
+    # Analyse des arguments
+    args = parse_cmdline_args()
+
+    # Compilation des dictionnaires une seule fois, avant le démarrage des processus
+    for name, filename in parse_word_files(args.word_files).items():
+        print(f"Loaded word list {name} with {len(file_ops.read_word_index(filename))} words.", file=sys.stderr)
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
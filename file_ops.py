@@ -1,30 +1,383 @@
+import bz2
+import gzip
+import hashlib
+import itertools
+import json
+import lzma
 import os
 import pprint
 import shutil
 import subprocess
+import sys
 import tempfile
+import unicodedata
+
+from word_index import WordIndex
+
+# Version du format des dictionnaires compilés ; la changer invalide les caches existants
+COMPILED_VERSION = 2
+
+# Fonctions d'ouverture des fichiers compressés, par extension
+COMPRESSED_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def open_word_source(filename):
+    """Ouvre un fichier de mots en lecture binaire, décompressé à la volée selon son extension."""
+    return COMPRESSED_OPENERS.get(os.path.splitext(filename)[1].lower(), open)(filename, "rb")
+
+
+def normalize_word(word, fold_case=False, strip_accents=False):
+    """Normalise un mot : forme Unicode composée (NFC), casse et accents en option.
+
+    Args:
+        word (str): Le mot, sans espaces autour.
+        fold_case (bool): Si True, met le mot en majuscules.
+        strip_accents (bool): Si True, retire les accents et autres signes diacritiques.
+
+    Returns:
+        str: Le mot normalisé.
+    """
+    if word.isascii():
+        return word.upper() if fold_case else word
+
+    if strip_accents:
+        word = "".join(char for char in unicodedata.normalize("NFD", word) if not unicodedata.combining(char))
+    word = unicodedata.normalize("NFC", word)
+    return word.upper() if fold_case else word
+
+
+def iter_words(filenames, encoding="auto", fold_case=False, strip_accents=False):
+    """Lit les mots de plusieurs fichiers, un par ligne, sans jamais les garder en mémoire.
+
+    Les fichiers .gz, .bz2 et .xz sont décompressés au fil de la lecture.
+    Avec l'encodage "auto", chaque ligne est décodée en UTF-8 si elle est
+    valide, en latin1 sinon : les listes des deux encodages se mélangent.
+
+    Args:
+        filenames (str | list): Le ou les fichiers à lire, dans l'ordre.
+        encoding (str): Encodage des fichiers, ou "auto".
+        fold_case (bool): Si True, met les mots en majuscules.
+        strip_accents (bool): Si True, retire les accents des mots.
+
+    Yields:
+        str: Les mots normalisés (voir normalize_word), lignes vides exclues.
+    """
+    for filename in [filenames] if isinstance(filenames, str) else filenames:
+        with open_word_source(filename) as source:
+            for line in source:
+                word = decode_line(line, encoding).strip()
+                if word:
+                    yield normalize_word(word, fold_case, strip_accents)
+
+
+def decode_line(line, encoding="auto"):
+    """Décode une ligne lue en binaire ; "auto" essaie UTF-8, puis latin1."""
+    if encoding != "auto":
+        return line.decode(encoding)
+    try:
+        return line.decode("utf-8")
+    except UnicodeDecodeError:
+        return line.decode("latin1")
+
+
+def read_word_weights(filename, encoding="auto", fold_case=False, strip_accents=False):
+    """Lit les poids des mots, pour pondérer leurs tirages (voir WordIndex.set_weights).
+
+    Chaque ligne contient un mot suivi de son poids (une fréquence, par
+    exemple), séparés par des espaces ou une tabulation ; les lignes sans
+    poids lisible sont ignorées. Les mots sont normalisés comme la liste de
+    mots (voir iter_words).
+
+    Args:
+        filename (str): Fichier de poids, éventuellement compressé.
+        encoding (str): Encodage du fichier, ou "auto".
+        fold_case (bool): Si True, met les mots en majuscules.
+        strip_accents (bool): Si True, retire les accents des mots.
+
+    Returns:
+        dict: Poids de chaque mot. Un mot présent plusieurs fois garde son plus grand poids.
+    """
+    weights = {}
+    with open_word_source(filename) as source:
+        for line in source:
+            fields = decode_line(line, encoding).split()
+            try:
+                word, weight = normalize_word(fields[0], fold_case, strip_accents), float(fields[-1])
+            except (IndexError, ValueError):
+                continue
+            if len(fields) > 1 and weight > 0:
+                weights[word] = max(weight, weights.get(word, 0.0))
+    return weights
+
+
+def length_filter(min_length=None, max_length=None):
+    """Filtre des mots dont la longueur est comprise entre min_length et max_length, inclus."""
+    min_length = min_length or 0
+    max_length = max_length or float("inf")
+    return lambda word: min_length <= len(word) <= max_length
+
+
+def distinct_letters_filter(min_different_letters):
+    """Filtre des mots qui ont au moins min_different_letters lettres différentes."""
+    return lambda word: len(set(word)) >= min_different_letters
+
+
+def alphabet_filter(alphabet):
+    """Filtre des mots écrits uniquement avec les lettres de alphabet."""
+    letters = frozenset(alphabet)
+    return lambda word: letters.issuperset(word)
+
+
+def blocklist_filter(blocked_words):
+    """Filtre des mots absents de blocked_words (un ensemble de mots normalisés)."""
+    return lambda word: word not in blocked_words
+
+
+def stream_words(filenames, filters=(), max_words=None, dedupe=True, **normalization):
+    """Lit, normalise, dédoublonne et filtre les mots de plusieurs fichiers, au fil de l'eau.
+
+    Les filtres sont des fonctions qui prennent un mot et retournent True
+    pour le garder (voir length_filter, alphabet_filter...) ; ils
+    s'appliquent dans l'ordre. Le générateur peut alimenter directement un
+    WordIndex, sans liste intermédiaire.
+
+    Args:
+        filenames (str | list): Le ou les fichiers à lire, dans l'ordre.
+        filters (iterable): Filtres à appliquer à chaque mot.
+        max_words (int): Nombre maximum de mots à produire. Par défaut, aucun.
+        dedupe (bool): Si True, ne produit chaque mot qu'une fois.
+        **normalization: encoding, fold_case et strip_accents, voir iter_words.
+
+    Yields:
+        str: Les mots retenus, dans l'ordre de lecture.
+    """
+    filters = tuple(filters)
+    seen = set()
+    n_words = 0
+    if max_words == 0:
+        return
+
+    for word in iter_words(filenames, **normalization):
+        if not all(keep(word) for keep in filters):
+            continue
+        if dedupe:
+            if word in seen:
+                continue
+            seen.add(word)
+        yield word
+        n_words += 1
+        if n_words == max_words:
+            return
+
+
+def word_filters(min_length=2, min_different_letters=2, max_length=None, alphabet=None, blocklist=None,
+                 **normalization):
+    """Construit les filtres de lecture des mots à partir des options de sélection.
+
+    Args:
+        min_length (int): Les mots doivent être strictement plus longs.
+        min_different_letters (int): Les mots doivent avoir strictement plus de lettres différentes.
+        max_length (int): Longueur maximale des mots, incluse. Par défaut, aucune.
+        alphabet (str): Lettres autorisées. Par défaut, toutes.
+        blocklist (str | list): Fichier(s) de mots à exclure, normalisés comme la liste.
+        **normalization: encoding, fold_case et strip_accents, voir iter_words.
+
+    Returns:
+        list: Filtres à passer à stream_words.
+    """
+    filters = [length_filter(min_length + 1, max_length), distinct_letters_filter(min_different_letters + 1)]
+    if alphabet:
+        filters.append(alphabet_filter(normalize_word(alphabet, normalization.get("fold_case", False),
+                                                      normalization.get("strip_accents", False))))
+    if blocklist:
+        filters.append(blocklist_filter(frozenset(iter_words(blocklist, **normalization))))
+    return filters
 
 
 def read_word_list(filename, min_length=2, min_different_letters=2):
     """Lit un fichier et retourne une liste de mots. Chaque mot doit être sur une ligne.
     
     Args:
-        filename (str): Le nom du fichier à lire.
+        filename (str | list): Le ou les fichiers à lire.
         min_length (int): Longueur minimale des mots à inclure.
         min_different_letters (int): Nombre minimum de lettres différentes dans le mot.
 
     Returns:
         list: Liste des mots valides.
     """
-    words = []
+    return list(stream_words(filename, word_filters(min_length, min_different_letters)))
+
+
+def file_digest(filenames):
+    """Calcule l'empreinte SHA-256 du contenu d'un ou plusieurs fichiers."""
+    digest = hashlib.sha256()
+    for filename in [filenames] if isinstance(filenames, str) else filenames:
+        with open(filename, "rb") as source:
+            for block in iter(lambda: source.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def read_word_index(filenames, min_length=2, min_different_letters=2, cache=True, max_words=None, **options):
+    """Lit une ou plusieurs listes de mots et retourne leur index, en passant par un dictionnaire compilé.
+
+    Le fichier compilé (words.txt -> words.idx) contient les mots filtrés,
+    groupés par longueur, et leurs index positionnels. Il est projeté en
+    mémoire au chargement, et donc partagé en lecture seule par les processus
+    qui l'ouvrent. Il est recompilé automatiquement quand les paramètres de
+    filtrage changent, ou quand un fichier source a changé de date ou de
+    taille et que leur contenu n'a plus la même empreinte. Avec plusieurs
+    fichiers ou des options de sélection, le nom du fichier compilé porte
+    une empreinte de ces paramètres (words.1a2b3c4d.idx).
+
+    Args:
+        filenames (str | list): Le ou les fichiers à lire, éventuellement compressés.
+        min_length (int): Longueur minimale des mots à inclure.
+        min_different_letters (int): Nombre minimum de lettres différentes dans le mot.
+        cache (bool): Si False, ignore le dictionnaire compilé.
+        max_words (int): Nombre maximum de mots à garder. Par défaut, aucun.
+        **options: max_length, alphabet, blocklist (voir word_filters), et
+            encoding, fold_case, strip_accents (voir iter_words).
+
+    Returns:
+        WordIndex: Index des mots valides.
+    """
+    filenames = [filenames] if isinstance(filenames, str) else list(filenames)
+    if options.get("encoding") == "auto":
+        del options["encoding"]
+    normalization = {key: options[key] for key in ("encoding", "fold_case", "strip_accents") if key in options}
+
+    def build_index():
+        filters = word_filters(min_length, min_different_letters, **options)
+        return WordIndex(stream_words(filenames, filters, max_words, **normalization))
+
+    if not cache:
+        return build_index()
+
+    blocklist = options.get("blocklist") or []
+    blocklist = [blocklist] if isinstance(blocklist, str) else list(blocklist)
+    sources = filenames + blocklist
+    parameters = {"version": COMPILED_VERSION, "files": filenames, "min_length": min_length,
+                  "min_different_letters": min_different_letters, "max_words": max_words,
+                  **{key: value for key, value in options.items() if value}, "blocklist": blocklist}
+
+    root = os.path.splitext(filenames[0])[0]
+    if len(filenames) == 1 and not max_words and not any(options.values()):
+        compiled_filename = root + ".idx"
+    else:
+        key = hashlib.sha256(json.dumps(parameters, sort_keys=True).encode("utf-8")).hexdigest()
+        compiled_filename = f"{root}.{key[:8]}.idx"
+
+    stats = [[stat.st_mtime_ns, stat.st_size] for stat in map(os.stat, sources)]
+    metadata = WordIndex.read_metadata(compiled_filename)
+    if metadata is not None and metadata.get("parameters") == parameters and metadata.get("stats") == stats:
+        return WordIndex.load(compiled_filename)
+
+    digest = file_digest(sources)
+    if metadata is not None and metadata.get("parameters") == parameters and metadata.get("sha256") == digest:
+        return WordIndex.load(compiled_filename)
+
+    index = build_index()
+    try:
+        # Écriture dans un fichier temporaire puis renommage, pour ne jamais laisser de cache tronqué
+        fd, tmp_filename = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(compiled_filename)), suffix=".idx")
+        with os.fdopen(fd, "wb") as compiled_file:
+            index.save(compiled_file, {"parameters": parameters, "stats": stats, "sha256": digest})
+        os.chmod(tmp_filename, 0o644)
+        os.replace(tmp_filename, compiled_filename)
+    except OSError as error:
+        print(f"Could not write compiled dictionary {compiled_filename}: {error}.", file=sys.stderr)
+        return index
+
+    return WordIndex.load(compiled_filename)
+
+
+# Version du format des journaux de rejeu
+REPLAY_VERSION = 1
+
+
+def open_text_file(filename, mode):
+    """Ouvre un fichier texte UTF-8, compressé à la volée selon son extension."""
+    return COMPRESSED_OPENERS.get(os.path.splitext(filename)[1].lower(), open)(filename, mode + "t",
+                                                                             encoding="utf-8")
+
+
+def write_replay_log(filename, header, placements):
+    """Écrit le journal de rejeu d'une génération.
+
+    Le journal est un fichier JSON lines : une ligne d'en-tête (graine,
+    algorithme, paramètres...), puis une ligne compacte [direction, ligne,
+    colonne, mot] par mot, dans l'ordre de placement. Il est écrit dans un
+    fichier temporaire puis renommé : un journal réécrit régulièrement (un
+    point de reprise) n'est jamais laissé tronqué.
+
+    Args:
+        filename (str): Fichier du journal, compressé selon son extension.
+        header (dict): Paramètres de la génération.
+        placements (list): Mots placés, dans l'ordre de leur placement.
+    """
+    fd, tmp_filename = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)),
+                                        suffix=os.path.splitext(filename)[1])
+    os.close(fd)
+    try:
+        with open_text_file(tmp_filename, "w") as log:
+            log.write(json.dumps(dict(header, replay=REPLAY_VERSION)) + "\n")
+            for possibility in placements:
+                log.write(json.dumps([possibility["D"], *possibility["location"], possibility["word"]]) + "\n")
+        os.chmod(tmp_filename, 0o644)
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        os.unlink(tmp_filename)
+        raise
+
+
+def read_replay_log(filename):
+    """Lit un journal de rejeu écrit par write_replay_log(), ou une grille JSON.
+
+    Une grille écrite au format json (voir render_ops) est aussi acceptée :
+    sa première grille donne les dimensions et les mots, sans autre paramètre.
+
+    Args:
+        filename (str): Fichier du journal ou de la grille.
 
-    with open(filename, encoding='latin1') as words_file:
-        for line in words_file:
-            word = line.strip()
-            if len(word) > min_length and len(set(word)) > min_different_letters:
-                words.append(word)
+    Returns:
+        tuple: L'en-tête (dict) et les placements, dans l'ordre.
 
-    return words
+    Raises:
+        ValueError: Si le fichier n'est ni un journal de rejeu ni une grille JSON valide.
+    """
+    with open_text_file(filename, "r") as log:
+        try:
+            header = json.loads(next(log))
+            if "replay" not in header and "grid" in header:
+                grid = header["grid"]
+                return {"dimensions": [len(grid), len(grid[0])]}, [
+                    {"word": word["word"], "location": list(word["location"]), "D": word["D"]}
+                    for word in header["words"]]
+            if header.get("replay") != REPLAY_VERSION:
+                raise ValueError(f"unsupported version {header.get('replay')}")
+            placements = []
+            for line in log:
+                if line.strip():
+                    direction, line_index, column, word = json.loads(line)
+                    placements.append({"word": word, "location": [line_index, column], "D": direction})
+        except (StopIteration, json.JSONDecodeError, AttributeError, KeyError, IndexError, TypeError,
+                ValueError) as error:
+            raise ValueError(f"Invalid replay log {filename}: {error or 'empty file'}.") from error
+    return header, placements
+
+
+# Préambule LaTeX commun à tous les documents, construit une seule fois
+LATEX_PREAMBLE = "".join(line + "\n" for line in (
+    r"\documentclass[a4paper]{article}",
+    r"\usepackage[utf8]{inputenc}",
+    r"\usepackage[table]{xcolor}",
+    r"\usepackage{multicol}",
+    r"\usepackage{fullpage}",
+    r"\usepackage{graphicx}",
+    "",
+    r"\begin{document}",
+))
 
 
 def write_grid_to_file(grid, out_file="table.tex", out_pdf="out.pdf", keep_tex=False, words=[]):
@@ -33,37 +386,145 @@ def write_grid_to_file(grid, out_file="table.tex", out_pdf="out.pdf", keep_tex=F
     Args:
         grid (list): Grille à écrire, sous forme de liste de listes.
         out_file (str): Nom du fichier de sortie LaTeX.
-        out_pdf (str): Nom du fichier PDF de sortie.
+        out_pdf (str): Nom du fichier PDF de sortie, ou None pour n'écrire que le fichier LaTeX.
         keep_tex (bool): Si True, conserve le fichier .tex après compilation.
         words (list): Liste des mots utilisés dans la grille.
     """
-    with open(out_file, "w") as texfile:
-        # Écrire le préambule
-        texfile.write("\documentclass[a4paper]{article}\n")
-        texfile.write(r"\usepackage[utf8]{inputenc}\n")
-        texfile.write(r"\usepackage[table]{xcolor}\n")
-        texfile.write(r"\usepackage{multicol}\n")
-        texfile.write(r"\usepackage{fullpage}\n")
-        texfile.write(r"\usepackage{graphicx}\n\n")
-        texfile.write(r"\begin{document}\n")
-        texfile.write(r"\section*{Challenge}\n")
+    write_puzzles_to_file([(grid, words)], out_file, out_pdf, keep_tex)
+
+
+def write_puzzles_to_file(puzzles, out_file="table.tex", out_pdf="out.pdf", keep_tex=False):
+    """Écrit plusieurs grilles dans un seul document LaTeX et le compile en un seul appel.
+
+    Chaque grille occupe deux pages : l'énoncé avec ses mots, puis la solution.
+    Le document est écrit au fil de l'eau : les grilles peuvent venir d'un
+    générateur sans être toutes gardées en mémoire.
+
+    Args:
+        puzzles (iterable): Couples (grille, mots utilisés).
+        out_file (str): Nom du fichier de sortie LaTeX.
+        out_pdf (str): Nom du fichier PDF de sortie, ou None pour n'écrire que le fichier LaTeX.
+        keep_tex (bool): Si True, conserve le fichier .tex après compilation.
+    """
+    with open(out_file, "w", encoding="utf-8") as texfile:
+        write_chunks(texfile, tex_document_chunks(puzzles))
+
+    if out_pdf is not None:
+        compile_latex(out_file, out_pdf, keep_tex)
+
+
+def write_chunks(out, chunks, buffer_size=1 << 16):
+    """Écrit des morceaux de texte en les regroupant en blocs d'environ buffer_size caractères.
+
+    Args:
+        out: Flux texte de sortie : fichier, tube ou tampon en mémoire.
+        chunks (iterable): Morceaux de texte à écrire, dans l'ordre.
+        buffer_size (int): Taille des blocs écrits d'un seul appel.
+    """
+    pending = []
+    size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            out.write("".join(pending))
+            pending.clear()
+            size = 0
+
+    if pending:
+        out.write("".join(pending))
+
+
+def tex_document_chunks(puzzles):
+    """Produit un document LaTeX complet contenant plusieurs grilles, morceau par morceau.
+
+    Args:
+        puzzles (iterable): Couples (grille, mots utilisés), consommés au fur et à mesure.
+
+    Yields:
+        str: Morceaux successifs du document.
+    """
+    yield LATEX_PREAMBLE
+
+    for index, (grid, words) in enumerate(puzzles):
+        if index:
+            yield "\\newpage\n"
+        yield from tex_puzzle_chunks(grid, words)
 
-        # Écrire la grille
-        write_grid_to_tex(texfile, grid)
+    # Fin du document
+    yield "\\end{document}\n"
 
-        # Écrire les mots utilisés
-        if words:
-            write_words_section(texfile, words)
 
-        # Écrire la solution
-        texfile.write(r"\newpage\n")
-        texfile.write(r"\section*{Solution}\n")
-        write_grid_to_tex(texfile, grid, is_solution=True)
+def tex_puzzle_chunks(grid, words):
+    """Produit l'énoncé, les mots et la solution d'une grille en LaTeX.
 
-        # Fin du document
-        texfile.write("\end{document}\n")
+    Args:
+        grid (list): Grille à écrire.
+        words (list): Mots utilisés, chaînes ou possibilités.
+
+    Yields:
+        str: Morceaux successifs du code LaTeX.
+    """
+    yield "\\section*{Challenge}\n"
+    yield from tex_grid_chunks(grid)
 
-    compile_latex(out_file, out_pdf, keep_tex)
+    # Mots utilisés
+    if words:
+        yield from tex_words_chunks(words)
+
+    # Solution
+    yield "\\newpage\n\\section*{Solution}\n"
+    yield from tex_grid_chunks(grid, is_solution=True)
+
+
+def tex_grid_chunks(grid, is_solution=False):
+    """Produit le tableau LaTeX d'une grille, une ligne de la grille par morceau.
+
+    Args:
+        grid (list): Grille à écrire.
+        is_solution (bool): Indique si la grille est la solution. Sinon, les
+            cases remplies sont laissées vides.
+
+    Yields:
+        str: L'en-tête du tableau, puis chaque ligne, puis sa fin.
+    """
+    rows = iter(grid)
+    first = next(rows)
+    yield "\\resizebox{\\textwidth}{!}{\n\\begin{tabular}{|" + "c|" * len(first) + "}\n\\hline\n"
+
+    for line in itertools.chain((first,), rows):
+        cells = ("\\cellcolor{black}0" if element == 0 else str(element) if is_solution else ""
+                 for element in line)
+        yield " & ".join(cells) + "\\\\ \\hline\n"
+
+    yield "\\end{tabular}\n}\n"
+
+
+def tex_words_chunks(words):
+    """Produit la section LaTeX des mots utilisés.
+
+    Args:
+        words (list): Liste des mots utilisés, chaînes ou possibilités.
+
+    Yields:
+        str: L'en-tête de la section, puis les mots, puis sa fin.
+    """
+    words = sorted((word["word"] if isinstance(word, dict) else word for word in words),
+                   key=lambda word: (len(word), word))
+    yield "\\section*{Words used for the problem}\n\\begin{multicols}{4}\n\\noindent\n"
+    yield "".join(word + "\\\\\n" for word in words)
+    yield "\\end{multicols}\n"
+
+
+def write_puzzle_to_tex(texfile, grid, words):
+    """Écrit l'énoncé, les mots et la solution d'une grille dans le fichier LaTeX.
+
+    Args:
+        texfile: Fichier LaTeX à écrire.
+        grid (list): Grille à écrire.
+        words (list): Mots utilisés, chaînes ou possibilités.
+    """
+    write_chunks(texfile, tex_puzzle_chunks(grid, words))
 
 
 def write_grid_to_tex(texfile, grid, is_solution=False):
@@ -74,21 +535,7 @@ def write_grid_to_tex(texfile, grid, is_solution=False):
         grid (list): Grille à écrire.
         is_solution (bool): Indique si la grille est la solution.
     """
-    texfile.write(r"\resizebox{\textwidth}{!}{\n")
-    texfile.write(r"\begin{tabular}{|" + "c|" * len(grid[0]) + "}\n\hline\n")
-
-    for line in grid:
-        for index, element in enumerate(line):
-            if element == 0:
-                texfile.write(r"\cellcolor{black}0")
-            else:
-                texfile.write(str(element))
-            if index != len(line) - 1:
-                texfile.write(" & ")
-        texfile.write(r"\\ \hline\n")
-
-    texfile.write(r"\end{tabular}\n")
-    texfile.write(r"}\n")
+    write_chunks(texfile, tex_grid_chunks(grid, is_solution))
 
 
 def write_words_section(texfile, words):
@@ -96,40 +543,37 @@ def write_words_section(texfile, words):
 
     Args:
         texfile: Fichier LaTeX à écrire.
-        words (list): Liste des mots utilisés.
+        words (list): Liste des mots utilisés, chaînes ou possibilités.
     """
-    texfile.write(r"\section*{Words used for the problem}\n")
-    texfile.write(r"\begin{multicols}{4}\n")
-    texfile.write(r"\noindent\n")
-
-    words.sort(key=lambda word: (len(word), word[0]))
-    for word in words:
-        texfile.write(word + r"\\" + "\n")
-
-    texfile.write(r"\end{multicols}\n")
+    write_chunks(texfile, tex_words_chunks(words))
 
 
 def compile_latex(out_file, out_pdf, keep_tex):
     """Compile le fichier LaTeX en PDF.
 
+    La compilation a lieu dans un dossier temporaire qui lui est propre,
+    sans changer le dossier courant du processus : plusieurs compilations
+    peuvent donc tourner en même temps, dans des fils d'exécution distincts.
+
     Args:
         out_file (str): Nom du fichier LaTeX à compiler.
         out_pdf (str): Nom du fichier PDF de sortie.
         keep_tex (bool): Si True, conserve le fichier .tex après compilation.
+
+    Raises:
+        RuntimeError: Si pdflatex échoue ; le message reprend la fin de son journal.
     """
-    print("\n=== Compiling the generated LaTeX file! ===")
     with tempfile.TemporaryDirectory() as tmpdir:
-        original_dir = os.getcwd()
-        shutil.copy(out_file, tmpdir)
-        os.chdir(tmpdir)
-        os.rename(out_file, "out.tex")
-
-        proc = subprocess.call(['pdflatex', "out.tex"])
+        shutil.copy(out_file, os.path.join(tmpdir, "out.tex"))
 
-        shutil.copy("out.pdf", os.path.join(original_dir, out_pdf))
-        os.chdir(original_dir)
+        proc = subprocess.run(["pdflatex", "-interaction=nonstopmode", "-halt-on-error", "out.tex"],
+                              cwd=tmpdir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              stdin=subprocess.DEVNULL, text=True, errors="replace")
+        if proc.returncode != 0:
+            log_tail = "\n".join(proc.stdout.splitlines()[-20:])
+            raise RuntimeError(f"pdflatex failed on {out_file} with code {proc.returncode}:\n{log_tail}")
 
-    print("=== Done! ===\n")
+        shutil.copy(os.path.join(tmpdir, "out.pdf"), out_pdf)
 
     if not keep_tex:
         os.remove(out_file)
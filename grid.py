@@ -0,0 +1,428 @@
+class Grid:
+    """Grille de mots croisés qui tient à jour ses compteurs au fil des écritures.
+
+    Le nombre de cases remplies et, pour chaque case, le nombre de voisins
+    remplis horizontalement (gauche, droite) et verticalement (haut, bas) sont
+    mis à jour à chaque lettre écrite ou effacée. L'occupation se calcule donc
+    en O(1) et l'isolement d'un mot en O(len(mot)), sans parcourir la grille.
+
+    Les lignes restent accessibles par grid[ligne][colonne] pour la lecture ;
+    toute écriture doit passer par set() ou clear() pour garder les compteurs
+    justes.
+    """
+
+    def __init__(self, dimensions):
+        """Crée une grille vide.
+
+        Args:
+            dimensions (list): Nombre de lignes et de colonnes.
+        """
+        self.height, self.width = dimensions[0], dimensions[1]
+        self.rows = [[0] * self.width for _ in range(self.height)]
+        self.filled = 0
+        self._horizontal = [[0] * self.width for _ in range(self.height)]
+        self._vertical = [[0] * self.width for _ in range(self.height)]
+        # Cache optionnel des mots croisés (voir run_cache), prévenu de chaque changement de case
+        self.run_cache = None
+
+    def __getitem__(self, line):
+        return self.rows[line]
+
+    def __len__(self):
+        return self.height
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def cell(self, line, col):
+        """Retourne le contenu d'une case de la grille : une lettre, ou 0 si elle est vide."""
+        return self.rows[line][col]
+
+    def get(self, line, col):
+        """Retourne le contenu d'une case, ou 0 si elle est hors de la grille."""
+        if 0 <= line < self.height and 0 <= col < self.width:
+            return self.rows[line][col]
+        return 0
+
+    def is_free(self, line, col):
+        """Indique si une case est vide ; les cases hors de la grille sont libres."""
+        return not (0 <= line < self.height and 0 <= col < self.width) or self.rows[line][col] == 0
+
+    def horizontal_neighbors(self, line, col):
+        """Nombre de cases remplies à gauche et à droite d'une case."""
+        return self._horizontal[line][col]
+
+    def vertical_neighbors(self, line, col):
+        """Nombre de cases remplies au-dessus et au-dessous d'une case."""
+        return self._vertical[line][col]
+
+    def side_neighbors(self, line, col, direction):
+        """Nombre de voisins remplis d'une case, perpendiculairement à une direction.
+
+        Args:
+            line (int): Ligne de la case.
+            col (int): Colonne de la case.
+            direction (str): Direction du mot ('E' ou 'S').
+
+        Returns:
+            int: Voisins au-dessus et au-dessous pour 'E', à gauche et à droite pour 'S'.
+        """
+        if direction == "E":
+            return self._vertical[line][col]
+        return self._horizontal[line][col]
+
+    def _update_neighbors(self, line, col, delta):
+        """Répercute le remplissage ou l'effacement d'une case sur ses voisins."""
+        if col > 0:
+            self._horizontal[line][col - 1] += delta
+        if col < self.width - 1:
+            self._horizontal[line][col + 1] += delta
+        if line > 0:
+            self._vertical[line - 1][col] += delta
+        if line < self.height - 1:
+            self._vertical[line + 1][col] += delta
+
+    def set(self, line, col, letter):
+        """Écrit une lettre dans une case.
+
+        Args:
+            line (int): Ligne de la case.
+            col (int): Colonne de la case.
+            letter (str): La lettre à écrire.
+        """
+        if self.rows[line][col] == 0:
+            self.filled += 1
+            self._update_neighbors(line, col, 1)
+        if self.run_cache is not None and self.rows[line][col] != letter:
+            self.run_cache.invalidate(line, col)
+        self.rows[line][col] = letter
+
+    def clear(self, line, col):
+        """Vide une case.
+
+        Args:
+            line (int): Ligne de la case.
+            col (int): Colonne de la case.
+        """
+        if self.rows[line][col] != 0:
+            self.filled -= 1
+            self._update_neighbors(line, col, -1)
+            self.rows[line][col] = 0
+            if self.run_cache is not None:
+                self.run_cache.invalidate(line, col)
+
+    def clear_all(self):
+        """Vide toute la grille, sans réallouer ses lignes."""
+        for rows in (self.rows, self._horizontal, self._vertical):
+            for row in rows:
+                row[:] = [0] * self.width
+        self.filled = 0
+        if self.run_cache is not None:
+            self.run_cache.clear()
+
+    def occupancy(self):
+        """Retourne le taux d'occupation de la grille, en O(1)."""
+        return self.filled / (self.height * self.width)
+
+    def snapshot(self):
+        """Retourne une copie de l'état de la grille, à passer à restore()."""
+        return ([list(row) for row in self.rows], [list(row) for row in self._horizontal],
+                [list(row) for row in self._vertical], self.filled)
+
+    def restore(self, snapshot):
+        """Remet la grille dans l'état d'une copie obtenue par snapshot()."""
+        rows, horizontal, vertical, self.filled = snapshot
+        for target, source in ((self.rows, rows), (self._horizontal, horizontal), (self._vertical, vertical)):
+            for line in range(self.height):
+                target[line][:] = source[line]
+        if self.run_cache is not None:
+            self.run_cache.clear()
+
+    def to_lists(self):
+        """Retourne une copie de la grille sous forme de liste de listes."""
+        return [list(row) for row in self.rows]
+
+
+class BitboardGrid(Grid):
+    """Grille qui tient en plus des masques de bits de ses cases remplies.
+
+    Chaque ligne et chaque colonne a un entier dont le bit k est levé si sa
+    case k est remplie, et chaque lettre a de tels entiers pour les cases qui
+    la contiennent. Collision, extrémités libres et voisins latéraux d'un mot
+    entier se décident alors en quelques décalages et ET logiques (voir
+    word_collides, word_ends_are_free et word_touches_sides), plutôt que case
+    par case.
+    """
+
+    def __init__(self, dimensions):
+        super().__init__(dimensions)
+        self.row_bits = [0] * self.height
+        self.column_bits = [0] * self.width
+        self._letter_rows = {}
+        self._letter_columns = {}
+
+    def _letter_bits(self, letter):
+        """Masques (par ligne, par colonne) d'une lettre, créés à sa première écriture."""
+        if letter not in self._letter_rows:
+            self._letter_rows[letter] = [0] * self.height
+            self._letter_columns[letter] = [0] * self.width
+        return self._letter_rows[letter], self._letter_columns[letter]
+
+    def set(self, line, col, letter):
+        previous = self.rows[line][col]
+        if previous == letter:
+            return
+        if previous != 0:
+            self.clear(line, col)
+        super().set(line, col, letter)
+        self.row_bits[line] |= 1 << col
+        self.column_bits[col] |= 1 << line
+        letter_rows, letter_columns = self._letter_bits(letter)
+        letter_rows[line] |= 1 << col
+        letter_columns[col] |= 1 << line
+
+    def clear(self, line, col):
+        letter = self.rows[line][col]
+        if letter == 0:
+            return
+        super().clear(line, col)
+        self.row_bits[line] &= ~(1 << col)
+        self.column_bits[col] &= ~(1 << line)
+        self._letter_rows[letter][line] &= ~(1 << col)
+        self._letter_columns[letter][col] &= ~(1 << line)
+
+    def clear_all(self):
+        super().clear_all()
+        self.row_bits[:] = [0] * self.height
+        self.column_bits[:] = [0] * self.width
+        self._letter_rows.clear()
+        self._letter_columns.clear()
+
+    def restore(self, snapshot):
+        super().restore(snapshot)
+        # Les masques se recalculent à partir des lettres restaurées
+        self.row_bits[:] = [0] * self.height
+        self.column_bits[:] = [0] * self.width
+        self._letter_rows.clear()
+        self._letter_columns.clear()
+        for line, row in enumerate(self.rows):
+            for col, letter in enumerate(row):
+                if letter != 0:
+                    self.row_bits[line] |= 1 << col
+                    self.column_bits[col] |= 1 << line
+                    letter_rows, letter_columns = self._letter_bits(letter)
+                    letter_rows[line] |= 1 << col
+                    letter_columns[col] |= 1 << line
+
+    def _line_bits(self, line, column, direction):
+        """Indice de la ligne (ou colonne) d'un mot, position de départ et masques à utiliser."""
+        if direction == "E":
+            return line, column, self.row_bits, self._letter_rows
+        return column, line, self.column_bits, self._letter_columns
+
+    def placement_conflict(self, word, line, column, direction):
+        """Vérifie en une fois qu'un mot tient dans la grille, sans collision et avec ses extrémités libres.
+
+        Returns:
+            str: "bounds", "collision" ou "ends" selon la première vérification
+            qui échoue, None si le mot peut être placé.
+        """
+        index, start, bits, letter_bits = self._line_bits(line, column, direction)
+        length = len(word)
+        if start + length > (self.width if direction == "E" else self.height):
+            return "bounds"
+        line_bits = bits[index]
+        filled = (line_bits >> start) & ((1 << length) - 1)
+        while filled:
+            low = filled & -filled
+            letter_line = letter_bits.get(word[low.bit_length() - 1])
+            if letter_line is None or not (letter_line[index] >> start) & low:
+                return "collision"
+            filled ^= low
+        if line_bits & ((1 << (start + length)) | (1 << start >> 1)):
+            return "ends"
+        return None
+
+    def word_collides(self, word, line, column, direction):
+        """Indique si un mot recouvre une case remplie par une autre lettre.
+
+        Seules les cases remplies de son emplacement sont comparées au mot,
+        par le masque de la lettre attendue : dans une grille clairsemée, il
+        n'y en a souvent aucune.
+        """
+        index, start, bits, letter_bits = self._line_bits(line, column, direction)
+        filled = (bits[index] >> start) & ((1 << len(word)) - 1)
+        while filled:
+            low = filled & -filled
+            letter_line = letter_bits.get(word[low.bit_length() - 1])
+            if letter_line is None or not (letter_line[index] >> start) & low:
+                return True
+            filled ^= low
+        return False
+
+    def word_ends_are_free(self, word, line, column, direction):
+        """Indique si les cases juste avant et juste après un mot sont libres (ou hors de la grille)."""
+        index, start, bits, _ = self._line_bits(line, column, direction)
+        ends = (1 << (start + len(word))) | (1 << start >> 1)
+        return not bits[index] & ends
+
+    def word_touches_sides(self, word, line, column, direction):
+        """Indique si une case voisine d'un mot, perpendiculairement à sa direction, est remplie."""
+        index, start, bits, _ = self._line_bits(line, column, direction)
+        span = ((1 << len(word)) - 1) << start
+        return bool((index > 0 and bits[index - 1] & span) or (index < len(bits) - 1 and bits[index + 1] & span))
+
+
+class CompactGrid:
+    """Grille compacte stockée dans des tampons plats d'octets.
+
+    Même interface que Grid, mais chaque case occupe un octet d'un bytearray
+    parcouru par pas de ligne (0 pour une case vide, sinon le code latin1 de
+    la lettre), de même que les compteurs de voisins. Les copies et
+    restaurations de la grille entière se font en une copie de tampon, et
+    l'empreinte mémoire reste faible quand de nombreuses grilles candidates
+    sont gardées en mémoire.
+
+    grid[ligne] et l'itération sur la grille renvoient des lignes décodées
+    (listes de lettres et de 0), pour l'affichage et l'écriture LaTeX.
+    """
+
+    def __init__(self, dimensions):
+        """Crée une grille vide.
+
+        Args:
+            dimensions (list): Nombre de lignes et de colonnes.
+        """
+        self.height, self.width = dimensions[0], dimensions[1]
+        self.cells = bytearray(self.height * self.width)
+        self.filled = 0
+        self._horizontal = bytearray(self.height * self.width)
+        self._vertical = bytearray(self.height * self.width)
+        self.run_cache = None
+
+    def _decode_row(self, line):
+        start = line * self.width
+        return [chr(code) if code else 0 for code in self.cells[start:start + self.width]]
+
+    def __getitem__(self, line):
+        return self._decode_row(line)
+
+    def __len__(self):
+        return self.height
+
+    def __iter__(self):
+        return (self._decode_row(line) for line in range(self.height))
+
+    def cell(self, line, col):
+        """Retourne le contenu d'une case de la grille : une lettre, ou 0 si elle est vide."""
+        code = self.cells[line * self.width + col]
+        return chr(code) if code else 0
+
+    def get(self, line, col):
+        """Retourne le contenu d'une case, ou 0 si elle est hors de la grille."""
+        if 0 <= line < self.height and 0 <= col < self.width:
+            return self.cell(line, col)
+        return 0
+
+    def is_free(self, line, col):
+        """Indique si une case est vide ; les cases hors de la grille sont libres."""
+        return not (0 <= line < self.height and 0 <= col < self.width) or self.cells[line * self.width + col] == 0
+
+    def horizontal_neighbors(self, line, col):
+        """Nombre de cases remplies à gauche et à droite d'une case."""
+        return self._horizontal[line * self.width + col]
+
+    def vertical_neighbors(self, line, col):
+        """Nombre de cases remplies au-dessus et au-dessous d'une case."""
+        return self._vertical[line * self.width + col]
+
+    def side_neighbors(self, line, col, direction):
+        """Nombre de voisins remplis d'une case, perpendiculairement à une direction."""
+        if direction == "E":
+            return self._vertical[line * self.width + col]
+        return self._horizontal[line * self.width + col]
+
+    def _update_neighbors(self, line, col, delta):
+        """Répercute le remplissage ou l'effacement d'une case sur ses voisins."""
+        index = line * self.width + col
+        if col > 0:
+            self._horizontal[index - 1] += delta
+        if col < self.width - 1:
+            self._horizontal[index + 1] += delta
+        if line > 0:
+            self._vertical[index - self.width] += delta
+        if line < self.height - 1:
+            self._vertical[index + self.width] += delta
+
+    def set(self, line, col, letter):
+        """Écrit une lettre dans une case.
+
+        Args:
+            line (int): Ligne de la case.
+            col (int): Colonne de la case.
+            letter (str): La lettre à écrire, représentable en latin1.
+
+        Raises:
+            ValueError: Si la lettre ne tient pas sur un octet.
+        """
+        code = ord(letter)
+        if not 0 < code < 256:
+            raise ValueError(f"Letter {letter!r} cannot be stored in a compact grid.")
+
+        index = line * self.width + col
+        if self.cells[index] == 0:
+            self.filled += 1
+            self._update_neighbors(line, col, 1)
+        if self.run_cache is not None and self.cells[index] != code:
+            self.run_cache.invalidate(line, col)
+        self.cells[index] = code
+
+    def clear(self, line, col):
+        """Vide une case.
+
+        Args:
+            line (int): Ligne de la case.
+            col (int): Colonne de la case.
+        """
+        index = line * self.width + col
+        if self.cells[index] != 0:
+            self.filled -= 1
+            self._update_neighbors(line, col, -1)
+            self.cells[index] = 0
+            if self.run_cache is not None:
+                self.run_cache.invalidate(line, col)
+
+    def clear_all(self):
+        """Vide toute la grille, sans réallouer ses tampons."""
+        empty = bytes(self.height * self.width)
+        self.cells[:] = empty
+        self._horizontal[:] = empty
+        self._vertical[:] = empty
+        self.filled = 0
+        if self.run_cache is not None:
+            self.run_cache.clear()
+
+    def occupancy(self):
+        """Retourne le taux d'occupation de la grille, en O(1)."""
+        return self.filled / (self.height * self.width)
+
+    def count_filled(self):
+        """Recompte les cases remplies d'un seul passage sur le tampon."""
+        return len(self.cells) - self.cells.count(0)
+
+    def snapshot(self):
+        """Retourne une copie de l'état de la grille, à passer à restore()."""
+        return bytes(self.cells), bytes(self._horizontal), bytes(self._vertical), self.filled
+
+    def restore(self, snapshot):
+        """Remet la grille dans l'état d'une copie obtenue par snapshot()."""
+        cells, horizontal, vertical, self.filled = snapshot
+        self.cells[:] = cells
+        self._horizontal[:] = horizontal
+        self._vertical[:] = vertical
+        if self.run_cache is not None:
+            self.run_cache.clear()
+
+    def to_lists(self):
+        """Retourne une copie de la grille sous forme de liste de listes."""
+        return [self._decode_row(line) for line in range(self.height)]
@@ -1,13 +1,49 @@
+import queue
+import random
+import threading
+import time
+
+import annealing_ops
 import basic_ops
+import file_ops
+import instrumentation
+import pattern_ops
+from placement_journal import PlacementJournal
+from run_cache import CrossingRunCache
+from word_index import WordIndex
+
+# Intervalle par défaut, en secondes, entre deux points de reprise
+CHECKPOINT_INTERVAL = 60.0
 
 
 class GridGenerator:
-    def __init__(self, word_list, dimensions, n_loops, timeout, target_occupancy):
-        self.word_list = word_list
+    def __init__(self, word_list, dimensions, n_loops, timeout, target_occupancy, should_stop=None,
+                 compact_grid=False, anneal_timeout=0, anchored_sampling=True, rng=None,
+                 candidate_batch=basic_ops.CANDIDATE_BATCH, bitboard_grid=False, run_cache=True,
+                 checkpoint_file=None, checkpoint_interval=CHECKPOINT_INTERVAL):
+        self.word_list = word_list if isinstance(word_list, WordIndex) else WordIndex(word_list)
         self.dimensions = dimensions
         self.n_loops = n_loops
         self.timeout = timeout
         self.target_occupancy = target_occupancy
+        self.should_stop = should_stop
+        self.compact_grid = compact_grid
+        self.bitboard_grid = bitboard_grid
+        self.run_cache = run_cache
+        self.anneal_timeout = anneal_timeout
+        self.anchored_sampling = anchored_sampling
+        self.candidate_batch = candidate_batch
+        # Générateur aléatoire propre à ce générateur : une graine suffit à rejouer une génération
+        self.rng = rng if rng is not None else random.Random()
+        # Point de reprise réécrit régulièrement pendant la génération, avec les paramètres de checkpoint_header
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_header = {}
+        self.loops_done = 0
+        self.anneal_history = []
+        self.deadline = None
+        self.cancel_events = []
+        self.on_improve = None
         self.reset()
 
     def get_grid(self):
@@ -18,44 +54,307 @@ class GridGenerator:
         """Retourne la liste des mots présents dans la grille."""
         return self.words_in_grid
 
-    def generate_grid(self):
-        """Met à jour la grille interne avec du contenu."""
-        self.reset()
-        print(f"Generating {self.dimensions} grid with {len(self.word_list)} words.")
+    @property
+    def words_in_grid(self):
+        """Mots présents dans la grille, dans l'ordre de leur placement."""
+        return self.journal.words()
+
+    def generate_grid(self, deadline=None, cancel=None, on_improve=None, resume=False):
+        """Met à jour la grille interne avec du contenu.
+
+        Les boucles d'exécution s'arrêtent dès que l'occupation désirée est
+        atteinte après le tri des mots isolés.
+
+        Args:
+            deadline (float): Instant (time.time()) au-delà duquel la génération
+                s'arrête et garde la grille courante, ou None.
+            cancel (threading.Event | list): Jeton d'annulation coopérative, ou
+                liste de jetons : dès que l'un d'eux est levé, la génération
+                s'arrête au prochain point de contrôle.
+            on_improve (callable): Fonction appelée avec un instantané (voir
+                snapshot()) chaque fois que l'occupation de la grille progresse.
+            resume (bool): Si True, poursuit à partir de la grille courante (par
+                exemple reconstruite par replay() ou restore_checkpoint()) et de
+                la boucle où elle s'était arrêtée, au lieu de repartir de zéro.
+        """
+        if not resume:
+            self.reset()
+            self.loops_done = 0
+        self.deadline = deadline
+        self.cancel_events = list(cancel) if isinstance(cancel, (list, tuple)) else [cancel] if cancel else []
+        self.on_improve = on_improve
+        self._start_time = time.time()
+        self._next_checkpoint = self._start_time + self.checkpoint_interval
+        self._best_filled = 0
+        instrumentation.emit("generation_start", dimensions=self.dimensions, n_words=len(self.word_list))
 
         # Remplissage de la grille avec le nombre recommandé de boucles
-        for i in range(self.n_loops):
-            print(f"Starting execution loop {i + 1}:")
+        for i in range(self.loops_done, self.n_loops):
+            if self.stop_requested():
+                instrumentation.emit("stop_requested")
+                break
+            if i and basic_ops.compute_occupancy(self.grid) >= self.target_occupancy:
+                break
+
+            instrumentation.emit("loop_start", loop=i + 1)
             self.generate_content_for_grid()
 
-            print("Culling isolated words.")
+            # Dernier relevé avant que le tri ne fasse baisser l'occupation
+            self.report_progress()
+            instrumentation.emit("culling")
             self.cull_isolated_words()
-            self.reset_grid_to_existing_words()
+            self.loops_done = i + 1
+            self.checkpoint_if_due()
+
+        if self.anneal_timeout > 0 and not self.stop_requested():
+            self.improve_grid()
+
+        cache = self.grid.run_cache
+        if cache is not None:
+            instrumentation.count("run_cache.hits", cache.hits)
+            instrumentation.count("run_cache.misses", cache.misses)
+            instrumentation.count("run_cache.invalidations", cache.invalidations)
+            instrumentation.count("run_cache.evictions", cache.evictions)
+
+        if self.checkpoint_file:
+            self.write_checkpoint()
 
         occupancy = basic_ops.compute_occupancy(self.grid)
-        print(f"Built a grid of occupancy {occupancy:.2f}.")
+        instrumentation.emit("grid_built", occupancy=occupancy)
+
+    def iter_grid(self, deadline=None, cancel=None):
+        """Génère la grille en tâche de fond et produit ses améliorations au fil de l'eau.
+
+        La génération tourne dans un fil d'exécution séparé ; chaque progrès
+        de l'occupation produit un instantané, puis l'état final est produit
+        avec la clé "final" à True. Fermer l'itérateur avant la fin (break,
+        ou sortie d'un bloc with) annule la génération.
+
+        Args:
+            deadline (float): Voir generate_grid().
+            cancel (threading.Event): Voir generate_grid().
+
+        Yields:
+            dict: Instantanés de la grille, voir snapshot().
+
+        Raises:
+            Exception: Toute erreur survenue pendant la génération.
+        """
+        updates = queue.Queue()
+        closed = threading.Event()
+        done = object()
+
+        def run():
+            try:
+                self.generate_grid(deadline, [event for event in (cancel, closed) if event is not None],
+                                   on_improve=updates.put)
+                updates.put(dict(self.snapshot(), final=True))
+            except Exception as error:
+                updates.put(error)
+            finally:
+                updates.put(done)
+
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+
+        try:
+            while True:
+                update = updates.get()
+                if update is done:
+                    break
+                if isinstance(update, Exception):
+                    raise update
+                yield update
+        finally:
+            closed.set()
+            worker.join()
+
+    def stop_requested(self):
+        """Point de contrôle appelé régulièrement par les algorithmes de remplissage.
+
+        Signale les progrès de l'occupation à on_improve, puis indique si la
+        génération doit s'arrêter : fonction should_stop, jeton d'annulation
+        levé ou échéance dépassée.
+
+        Returns:
+            bool: True si la génération doit s'arrêter.
+        """
+        self.report_progress()
+        self.checkpoint_if_due()
+        if self.should_stop is not None and self.should_stop():
+            return True
+        if any(event.is_set() for event in self.cancel_events):
+            return True
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def report_progress(self):
+        """Appelle on_improve avec un instantané si l'occupation a progressé."""
+        if self.on_improve is not None and self.grid.filled > self._best_filled:
+            self._best_filled = self.grid.filled
+            self.on_improve(self.snapshot())
+
+    def snapshot(self):
+        """Retourne une copie indépendante de l'état courant de la génération.
+
+        Returns:
+            dict: Occupation, temps écoulé depuis le début de la génération,
+            grille (liste de listes) et mots placés.
+        """
+        return {"occupancy": self.grid.occupancy(), "elapsed": time.time() - self._start_time,
+                "grid": self.grid.to_lists(), "words": [dict(word) for word in self.journal.words()]}
+
+    def checkpoint_if_due(self):
+        """Écrit un point de reprise si checkpoint_interval secondes se sont écoulées depuis le précédent."""
+        if self.checkpoint_file and time.time() >= self._next_checkpoint:
+            self.write_checkpoint()
+
+    def write_checkpoint(self):
+        """Écrit un point de reprise dans checkpoint_file.
+
+        C'est un journal de rejeu (voir file_ops.write_replay_log) des mots
+        enregistrés dans le journal, dont l'en-tête retient aussi les mots
+        utilisés, l'état du générateur aléatoire et le nombre de boucles
+        terminées. Une erreur d'écriture est signalée sans interrompre la
+        génération.
+        """
+        version, state, gauss_next = self.rng.getstate()
+        header = dict(self.checkpoint_header, dimensions=self.dimensions,
+                      checkpoint={"loops_done": self.loops_done, "used": self.word_list.used_words(),
+                                  "rng": [version, list(state), gauss_next]})
+        try:
+            file_ops.write_replay_log(self.checkpoint_file, header, self.journal.words())
+            instrumentation.count("checkpoints")
+            instrumentation.emit("checkpoint_written", filename=self.checkpoint_file, loops_done=self.loops_done)
+        except OSError as error:
+            instrumentation.emit("checkpoint_failed", filename=self.checkpoint_file, error=str(error))
+        self._next_checkpoint = time.time() + self.checkpoint_interval
+
+    def restore_checkpoint(self, header, placements):
+        """Reprend l'état d'un point de reprise écrit par write_checkpoint().
+
+        Args:
+            header (dict): En-tête du point de reprise.
+            placements (list): Mots placés, dans l'ordre de leur placement.
+        """
+        self.replay(placements)
+        checkpoint = header["checkpoint"]
+        for word in checkpoint["used"]:
+            self.word_list.mark_used(word)
+        version, state, gauss_next = checkpoint["rng"]
+        self.rng.setstate((version, tuple(state), gauss_next))
+        self.loops_done = checkpoint["loops_done"]
 
     def reset(self):
-        """Réinitialise la grille et la liste des mots."""
-        self.grid = basic_ops.create_empty_grid(self.dimensions)
-        self.words_in_grid = []
+        """Réinitialise la grille, la liste des mots et les mots disponibles."""
+        self.grid = basic_ops.create_empty_grid(self.dimensions, self.compact_grid, self.bitboard_grid)
+        if self.run_cache:
+            self.grid.run_cache = CrossingRunCache()
+        self.journal = PlacementJournal(self.grid, self.word_list)
+        self.word_list.reset()
+
+    def replay(self, placements):
+        """Reconstruit une grille à partir de placements enregistrés, sans aucune recherche.
+
+        Args:
+            placements (list): Mots à placer, dans l'ordre de leur placement
+                (voir words_in_grid).
+        """
+        self.reset()
+        for possibility in placements:
+            self.journal.add(possibility)
+            self.word_list.mark_used(possibility["word"])
 
     def generate_content_for_grid(self):
         """Utilise l'algorithme de remplissage de base pour remplir la grille."""
-        new_words = basic_ops.basic_grid_fill(self.grid, self.target_occupancy, self.timeout, self.dimensions, self.word_list)
-        self.words_in_grid.extend(new_words)
+        basic_ops.basic_grid_fill(self.grid, self.target_occupancy, self.timeout, self.dimensions, self.word_list,
+                                  self.stop_requested, self.anchored_sampling, self.rng, self.candidate_batch,
+                                  record=self.journal.record)
+
+    def improve_grid(self):
+        """Améliore la grille remplie par recuit simulé pendant anneal_timeout secondes."""
+        instrumentation.emit("annealing_start", timeout=self.anneal_timeout)
+        self.anneal_history = annealing_ops.anneal_grid(self.grid, self.journal, self.word_list, self.anneal_timeout,
+                                                        should_stop=self.stop_requested, rng=self.rng)
+        self.cull_isolated_words()
+
+        for elapsed, occupancy in self.anneal_history:
+            instrumentation.emit("annealing_improved", elapsed=elapsed, occupancy=occupancy)
 
     def cull_isolated_words(self):
-        """Supprime les mots qui sont trop isolés de la grille."""
-        isolated_words = [word for word in self.words_in_grid if basic_ops.is_isolated(word, self.grid)]
-        
-        for word in isolated_words:
-            print(f"Culling word: {word}.")
-            self.words_in_grid.remove(word)
+        """Supprime les mots qui sont trop isolés de la grille.
+
+        Seuls les mots ajoutés ou dont le voisinage a changé depuis le dernier
+        tri sont revérifiés, et chaque mot retiré n'efface que ses propres cases.
+        """
+        for word in self.journal.cull_isolated():
+            instrumentation.count("culled")
+            instrumentation.emit("word_culled", word=word)
 
     def reset_grid_to_existing_words(self):
-        """Réinitialise la grille avec les mots présents dans self.words_in_grid."""
-        self.grid = basic_ops.create_empty_grid(self.dimensions)
+        """Reconstruit entièrement la grille et le journal à partir des mots présents."""
+        words = self.words_in_grid
+        self.grid.clear_all()
+        self.journal = PlacementJournal(self.grid, self.word_list)
+
+        for word in words:
+            self.journal.add(word)
+
+
+class PatternGridGenerator(GridGenerator):
+    """Générateur qui remplit les emplacements ouverts à partir de leur motif de lettres."""
+
+    def generate_content_for_grid(self):
+        """Utilise le moteur de placement par motifs pour remplir la grille.
+
+        Quand plus aucun emplacement ne peut être rempli avant l'objectif, le
+        temps restant de la boucle sert à rouvrir les zones bloquées : les mots
+        autour d'un emplacement mort sont retirés (voir
+        annealing_ops.reopen_dead_slots), puis la grille est de nouveau
+        remplie. Une grille moins remplie que la précédente est abandonnée, et
+        la meilleure grille obtenue est gardée.
+        """
+        start_time = time.time()
+        dead_slots = set()
+        pattern_ops.pattern_grid_fill(self.grid, self.target_occupancy, self.timeout, self.dimensions, self.word_list,
+                                      self.stop_requested, self.rng, self.journal.record, dead_slots)
+        filled, goal = self.grid.filled, self.target_occupancy * self.grid.height * self.grid.width
+        best_filled, best_words = filled, self.journal.words()
+
+        while filled < goal and dead_slots:
+            remaining = self.timeout - (time.time() - start_time)
+            if remaining <= 0 or self.stop_requested():
+                break
+            removed = annealing_ops.reopen_dead_slots(self.grid, self.journal, self.word_list, dead_slots,
+                                                      pattern_ops.REOPEN_RADIUS, self.rng)
+            if not removed:
+                continue
+            instrumentation.count("reopened")
+            instrumentation.emit("slots_reopened", removed=removed, occupancy=self.grid.occupancy())
+
+            dead_slots = set()
+            pattern_ops.pattern_grid_fill(self.grid, self.target_occupancy, remaining, self.dimensions,
+                                          self.word_list, self.stop_requested, self.rng, self.journal.record,
+                                          dead_slots)
+            if self.grid.filled >= filled:
+                filled = self.grid.filled
+            else:
+                self.restore_words(best_words)
+                filled = best_filled
+            if filled > best_filled:
+                best_filled, best_words = filled, self.journal.words()
+
+        if filled < best_filled:
+            self.restore_words(best_words)
+
+    def restore_words(self, placements):
+        """Remplace les mots de la grille par des placements enregistrés, mots disponibles compris.
 
-        for word in self.words_in_grid:
-            basic_ops.add_word_to_grid(word, self.grid)
+        Args:
+            placements (list): Mots à placer, dans l'ordre de leur placement.
+        """
+        # Retirer un mot peut en rétablir un autre qu'il avait absorbé
+        while self.journal.placements:
+            self.word_list.release(self.journal.remove(max(self.journal.placements))["word"])
+        for possibility in placements:
+            self.journal.add(possibility)
+            self.word_list.mark_used(possibility["word"])
@@ -0,0 +1,141 @@
+import json
+import os
+
+# Caractères d'un gabarit texte : case noire, case à remplir
+BLOCK = "#"
+OPEN = "."
+
+
+class GridTemplate:
+    """Forme imposée d'une grille : cases noires fixées à l'avance et emplacements à remplir.
+
+    Les emplacements sont les suites maximales d'au moins deux cases
+    blanches, horizontales ou verticales ; ils sont calculés une seule fois,
+    avec leurs croisements. Une case blanche isolée dans une direction n'y
+    forme pas d'emplacement.
+    """
+
+    def __init__(self, blocks):
+        """Construit le gabarit et ses emplacements.
+
+        Args:
+            blocks (list): Une liste de booléens par ligne, True pour une case noire.
+
+        Raises:
+            ValueError: Si le gabarit est vide ou si ses lignes n'ont pas toutes la même longueur.
+        """
+        if not blocks or not blocks[0] or any(len(row) != len(blocks[0]) for row in blocks):
+            raise ValueError("A grid template needs non-empty rows of equal length.")
+
+        self.blocks = [[bool(cell) for cell in row] for row in blocks]
+        self.height, self.width = len(blocks), len(blocks[0])
+        self.n_open = sum(not cell for row in self.blocks for cell in row)
+
+        # Emplacements (ligne, colonne, direction, longueur), et emplacements de chaque case
+        self.slots = []
+        self.cell_slots = {}
+        self._slot_indexes = {}
+        for direction in ("E", "S"):
+            n_lines, size = (self.height, self.width) if direction == "E" else (self.width, self.height)
+            for a in range(n_lines):
+                b = 0
+                while b < size:
+                    if self._is_block(a, b, direction):
+                        b += 1
+                        continue
+                    start = b
+                    while b < size and not self._is_block(a, b, direction):
+                        b += 1
+                    if b - start >= 2:
+                        line, column = (a, start) if direction == "E" else (start, a)
+                        self._add_slot(line, column, direction, b - start)
+
+        # Croisements de chaque emplacement : (position, autre emplacement, position dans l'autre)
+        self.crossings = [[] for _ in self.slots]
+        for cell, slots in self.cell_slots.items():
+            if len(slots) == 2:
+                (first, first_position), (second, second_position) = slots
+                self.crossings[first].append((first_position, second, second_position))
+                self.crossings[second].append((second_position, first, first_position))
+
+    def _is_block(self, a, b, direction):
+        return self.blocks[a][b] if direction == "E" else self.blocks[b][a]
+
+    def _add_slot(self, line, column, direction, length):
+        index = len(self.slots)
+        self.slots.append((line, column, direction, length))
+        self._slot_indexes[self.slots[-1]] = index
+        for position, cell in enumerate(self.slot_cells(index)):
+            self.cell_slots.setdefault(cell, []).append((index, position))
+
+    @property
+    def dimensions(self):
+        """Dimensions de la grille, [lignes, colonnes]."""
+        return [self.height, self.width]
+
+    def occupancy(self):
+        """Occupation d'une grille entièrement remplie selon ce gabarit."""
+        return self.n_open / (self.height * self.width)
+
+    def slot_cells(self, index):
+        """Retourne les cases (ligne, colonne) d'un emplacement, dans l'ordre du mot."""
+        line, column, direction, length = self.slots[index]
+        if direction == "E":
+            return [(line, column + k) for k in range(length)]
+        return [(line + k, column) for k in range(length)]
+
+    def slot_of(self, possibility):
+        """Retourne l'indice de l'emplacement occupé exactement par un mot, ou None."""
+        return self._slot_indexes.get((*possibility["location"], possibility["D"], len(possibility["word"])))
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Construit un gabarit à partir de lignes de texte, '#' marquant les cases noires.
+
+        Args:
+            rows (list): Lignes du gabarit ; '.' (ou '_', ou '0') marque une case à remplir.
+
+        Raises:
+            ValueError: Si une ligne contient un autre caractère.
+        """
+        blocks = []
+        for row in rows:
+            unknown = set(row) - {BLOCK, OPEN, "_", "0"}
+            if unknown:
+                raise ValueError(f"Unknown characters in grid template: {''.join(sorted(unknown))}.")
+            blocks.append([cell == BLOCK for cell in row])
+        return cls(blocks)
+
+    @classmethod
+    def load(cls, filename):
+        """Lit un gabarit dans un fichier texte ou JSON.
+
+        Le fichier texte contient une ligne de '#' (cases noires) et de '.'
+        par ligne de la grille, les lignes vides étant ignorées. Le fichier
+        JSON (extension .json) contient soit {"rows": [...]} avec les mêmes
+        lignes, soit {"dim": [lignes, colonnes], "blocks": [[ligne, colonne], ...]}.
+
+        Args:
+            filename (str): Fichier du gabarit.
+
+        Returns:
+            GridTemplate: Le gabarit.
+
+        Raises:
+            ValueError: Si le fichier n'est pas un gabarit valide.
+        """
+        with open(filename, encoding="utf-8") as template_file:
+            if os.path.splitext(filename)[1].lower() != ".json":
+                return cls.from_rows([line.strip() for line in template_file if line.strip()])
+            data = json.load(template_file)
+
+        if "rows" in data:
+            return cls.from_rows(data["rows"])
+        try:
+            height, width = data["dim"]
+            blocks = [[False] * width for _ in range(height)]
+            for line, column in data.get("blocks", []):
+                blocks[line][column] = True
+        except (KeyError, TypeError, ValueError, IndexError) as error:
+            raise ValueError(f"Invalid grid template {filename}: {error}.") from error
+        return cls(blocks)
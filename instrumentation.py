@@ -0,0 +1,198 @@
+import functools
+import json
+import sys
+import time
+
+# Messages affichés par LogSink pour chaque événement de génération
+EVENT_MESSAGES = {
+    "generation_start": "Generating {dimensions} grid with {n_words} words.",
+    "stop_requested": "Stop requested, ending generation early.",
+    "loop_start": "Starting execution loop {loop}:",
+    "word_added": 'Word "{word}" added. Occupancy: {occupancy:.3f}. Score: {score}.',
+    "crossings_created": "This also created the words: {new_words}",
+    "no_open_slot": "No open slot can be filled anymore.",
+    "slots_reopened": "Reopened a blocked area by removing {removed} words. Occupancy: {occupancy:.3f}.",
+    "culling": "Culling isolated words.",
+    "word_culled": "Culling word: {word}.",
+    "search_done": "Backtracking search explored {nodes} nodes with {backjumps} backjumps. Occupancy: {occupancy:.3f}.",
+    "annealing_start": "Annealing grid for {timeout} s.",
+    "annealing_improved": "  {elapsed:6.2f} s: occupancy {occupancy:.3f}",
+    "attempt_done": "Attempt with seed {seed} reached occupancy {occupancy:.3f}.",
+    "grid_built": "Built a grid of occupancy {occupancy:.2f}.",
+    "tiles_filled": "Filled {n_tiles} tiles in {elapsed:.2f} s.",
+    "checkpoint_written": "Wrote checkpoint {filename} after {loops_done} loops.",
+    "checkpoint_failed": "Could not write checkpoint {filename}: {error}",
+}
+
+# Fonctions du chemin critique de basic_ops chronométrées par enable_timers()
+HOT_FUNCTIONS = ("generate_random_possibility", "generate_anchored_possibility", "is_valid", "find_new_words",
+                 "add_word_to_grid")
+
+
+class SilentSink:
+    """Destination qui ignore tous les événements, sans les mettre en forme."""
+
+    enabled = False
+
+    def emit(self, event, fields):
+        pass
+
+
+class LogSink:
+    """Destination qui affiche les événements sous forme de messages lisibles."""
+
+    enabled = True
+
+    def __init__(self, stream=None):
+        """Args:
+            stream (file): Flux de sortie. Par défaut, la sortie standard au moment de l'écriture.
+        """
+        self.stream = stream
+
+    def emit(self, event, fields):
+        print(EVENT_MESSAGES[event].format(**fields), file=self.stream or sys.stdout)
+
+
+class JsonLinesSink:
+    """Destination qui écrit chaque événement comme un objet JSON par ligne."""
+
+    enabled = True
+
+    def __init__(self, stream):
+        """Args:
+            stream (file): Flux de sortie, ouvert en écriture texte.
+        """
+        self.stream = stream
+
+    def emit(self, event, fields):
+        self.stream.write(json.dumps({"event": event, "time": time.time(), **fields}, default=str) + "\n")
+
+
+# État global : compteurs, chronomètres et destination des événements
+counters = {}
+timers = {}
+sink = LogSink()
+
+
+def set_sink(new_sink):
+    """Change la destination des événements.
+
+    Args:
+        new_sink (SilentSink | LogSink | JsonLinesSink): Nouvelle destination.
+    """
+    global sink
+    sink = new_sink
+
+
+def emit(event, **fields):
+    """Envoie un événement à la destination courante, si elle est active.
+
+    Args:
+        event (str): Nom de l'événement, voir EVENT_MESSAGES.
+        **fields: Données de l'événement.
+    """
+    if sink.enabled:
+        sink.emit(event, fields)
+
+
+def count(name, amount=1):
+    """Incrémente un compteur.
+
+    Args:
+        name (str): Nom du compteur, par exemple "rejected.bounds".
+        amount (int): Valeur à ajouter.
+    """
+    counters[name] = counters.get(name, 0) + amount
+
+
+def reset():
+    """Remet à zéro les compteurs et les chronomètres."""
+    counters.clear()
+    for timer in timers.values():
+        timer[0], timer[1] = 0, 0.0
+
+
+def _timed(name, function):
+    """Enveloppe une fonction pour cumuler son nombre d'appels et sa durée."""
+    timer = timers.setdefault(name, [0, 0.0])
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timer[0] += 1
+            timer[1] += time.perf_counter() - start
+
+    return wrapper
+
+
+def enable_timers(module=None, names=HOT_FUNCTIONS):
+    """Chronomètre des fonctions d'un module en les remplaçant par des versions enveloppées.
+
+    Les appels passant par le module (basic_ops.is_valid(...), ou un appel
+    interne au module) sont chronométrés ; sans appel à cette fonction, le
+    chemin critique ne paie aucun surcoût.
+
+    Args:
+        module (module): Module dont les fonctions sont chronométrées. Par défaut, basic_ops.
+        names (tuple): Noms des fonctions à chronométrer.
+    """
+    if module is None:
+        import basic_ops
+        module = basic_ops
+
+    for name in names:
+        function = getattr(module, name)
+        if not hasattr(function, "__wrapped__"):
+            setattr(module, name, _timed(name, function))
+
+
+def disable_timers(module=None, names=HOT_FUNCTIONS):
+    """Rétablit les fonctions remplacées par enable_timers()."""
+    if module is None:
+        import basic_ops
+        module = basic_ops
+
+    for name in names:
+        function = getattr(module, name)
+        if hasattr(function, "__wrapped__"):
+            setattr(module, name, function.__wrapped__)
+
+
+def report():
+    """Retourne les compteurs et les chronomètres sous forme de dictionnaire sérialisable.
+
+    Returns:
+        dict: Compteurs, et pour chaque chronomètre le nombre d'appels, la
+        durée totale et la durée moyenne d'un appel.
+    """
+    return {"counters": dict(sorted(counters.items())),
+            "timers": {name: {"calls": calls, "seconds": round(seconds, 6),
+                              "mean_us": round(1e6 * seconds / calls, 3) if calls else None}
+                       for name, (calls, seconds) in sorted(timers.items())}}
+
+
+def print_report(stream=None):
+    """Affiche les compteurs, les raisons de rejet et les chronomètres.
+
+    Args:
+        stream (file): Flux de sortie. Par défaut, la sortie standard.
+    """
+    stream = stream or sys.stdout
+    data = report()
+
+    print("Counters:", file=stream)
+    for name, value in data["counters"].items():
+        print(f"  {name:<28} {value}", file=stream)
+
+    tries = counters.get("candidates.tries", 0)
+    if tries:
+        print(f"Candidate acceptance rate: {counters.get('candidates.accepted', 0) / tries:.5f}", file=stream)
+
+    if data["timers"]:
+        print("Timers:", file=stream)
+        for name, timer in data["timers"].items():
+            print(f"  {name:<28} {timer['calls']:>10} calls {timer['seconds']:>10.3f} s "
+                  f"{timer['mean_us'] or 0:>10.2f} us/call", file=stream)
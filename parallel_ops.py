@@ -0,0 +1,259 @@
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import basic_ops
+import file_ops
+import instrumentation
+
+# État propre à chaque processus de travail, initialisé par _init_worker
+_worker_words = None
+_worker_stop_event = None
+_worker_dictionaries = {}
+
+
+def _init_worker(word_list, stop_event):
+    """Prépare un processus de travail : mots partagés, signal d'arrêt, sortie et événements muets.
+
+    Args:
+        word_list (list | WordIndex): Mots valides.
+        stop_event (multiprocessing.Event): Signal levé quand un essai atteint l'objectif.
+    """
+    global _worker_words, _worker_stop_event
+    _worker_words = word_list
+    _worker_stop_event = stop_event
+    sys.stdout = open(os.devnull, "w")
+    instrumentation.set_sink(instrumentation.SilentSink())
+
+
+def _run_attempt(generator_class, dimensions, n_loops, timeout, target_occupancy, seed, early_stop):
+    """Exécute un essai de génération indépendant dans un processus de travail.
+
+    Args:
+        generator_class (type): Classe du générateur à utiliser.
+        dimensions (list): Dimensions de la grille.
+        n_loops (int): Nombre de boucles d'exécution.
+        timeout (int): Temps maximum par boucle d'exécution.
+        target_occupancy (float): Occupation désirée.
+        seed (int): Graine de cet essai.
+        early_stop (bool): Si True, s'arrête dès qu'un autre essai atteint l'objectif.
+
+    Returns:
+        tuple: Graine, occupation, grille et mots de la grille obtenue.
+    """
+    should_stop = _worker_stop_event.is_set if early_stop else None
+
+    generator = generator_class(_worker_words, dimensions, n_loops, timeout, target_occupancy, should_stop,
+                                rng=random.Random(seed))
+    generator.generate_grid()
+
+    grid = generator.get_grid()
+    occupancy = basic_ops.compute_occupancy(grid)
+    if early_stop and occupancy >= target_occupancy:
+        _worker_stop_event.set()
+
+    return seed, occupancy, grid, generator.get_words_in_grid()
+
+
+def generate_best_grid(generator_class, word_list, dimensions, n_loops, timeout, target_occupancy,
+                       n_jobs, base_seed, early_stop=False):
+    """Lance n_jobs essais de génération en parallèle et garde la grille la plus remplie.
+
+    L'essai numéro i utilise la graine base_seed + i : tant qu'il n'est pas
+    interrompu par son délai ou par l'arrêt anticipé, il peut être rejoué à
+    l'identique avec cette graine. À occupation égale, l'essai de plus petit
+    numéro l'emporte, ce qui rend le choix indépendant de l'ordre d'arrivée.
+
+    Args:
+        generator_class (type): Classe du générateur à utiliser.
+        word_list (list | WordIndex): Mots valides.
+        dimensions (list): Dimensions de la grille.
+        n_loops (int): Nombre de boucles d'exécution par essai.
+        timeout (int): Temps maximum par boucle d'exécution.
+        target_occupancy (float): Occupation désirée.
+        n_jobs (int): Nombre d'essais, et de processus, à lancer.
+        base_seed (int): Graine de base des essais.
+        early_stop (bool): Si True, tous les essais s'arrêtent dès que l'un
+            d'eux atteint target_occupancy.
+
+    Returns:
+        tuple: Graine, occupation, grille et mots de la meilleure grille.
+    """
+    stop_event = multiprocessing.Event()
+    seeds = [base_seed + i for i in range(n_jobs)]
+
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                             initargs=(word_list, stop_event)) as executor:
+        futures = [executor.submit(_run_attempt, generator_class, dimensions, n_loops, timeout,
+                                   target_occupancy, seed, early_stop) for seed in seeds]
+        results = [future.result() for future in futures]
+
+    for seed, occupancy, _, _ in results:
+        instrumentation.emit("attempt_done", seed=seed, occupancy=occupancy)
+
+    return max(results, key=lambda result: (result[1], -result[0]))
+
+
+def _run_tile(generator_class, dimensions, n_loops, timeout, target_occupancy, seed, placements, used_words):
+    """Remplit une tuile d'une grande grille dans un processus de travail.
+
+    Args:
+        generator_class (type | functools.partial): Classe du générateur de la tuile.
+        dimensions (list): Dimensions de la tuile.
+        n_loops (int): Nombre de boucles d'exécution.
+        timeout (int): Temps maximum par boucle d'exécution.
+        target_occupancy (float): Occupation désirée de la tuile.
+        seed (int): Graine de cette tuile.
+        placements (list): Mots déjà présents dans la tuile, en coordonnées de la tuile.
+        used_words (list): Mots déjà utilisés ailleurs dans la grille.
+
+    Returns:
+        list: Les mots ajoutés à la tuile, dans l'ordre de leur placement.
+    """
+    generator = generator_class(_worker_words, dimensions, n_loops, timeout, target_occupancy,
+                                rng=random.Random(seed))
+    generator.replay(placements)
+    for word in used_words:
+        generator.word_list.mark_used(word)
+    generator.generate_grid(resume=True)
+
+    existing = {(possibility["D"], *possibility["location"], possibility["word"]) for possibility in placements}
+    return [possibility for possibility in generator.get_words_in_grid()
+            if (possibility["D"], *possibility["location"], possibility["word"]) not in existing]
+
+
+def fill_tiles(generator_class, word_list, tiles, n_loops, timeout, target_occupancy, seeds, used_words,
+               n_workers):
+    """Remplit les tuiles d'une grande grille en parallèle, une tâche par tuile.
+
+    Args:
+        generator_class (type | functools.partial): Classe du générateur des tuiles.
+        word_list (WordIndex): Mots valides, transmis une seule fois à chaque processus.
+        tiles (list): Pour chaque tuile, ses dimensions et ses mots déjà présents.
+        n_loops (int): Nombre de boucles d'exécution par tuile.
+        timeout (int): Temps maximum par boucle d'exécution.
+        target_occupancy (float): Occupation désirée des tuiles.
+        seeds (list): Graine de chaque tuile.
+        used_words (list): Mots déjà utilisés dans la grille.
+        n_workers (int): Nombre de processus de travail.
+
+    Returns:
+        list: Les mots ajoutés à chaque tuile, dans l'ordre des tuiles.
+    """
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(word_list, multiprocessing.Event())) as executor:
+        futures = [executor.submit(_run_tile, generator_class, dimensions, n_loops, timeout, target_occupancy,
+                                   seed, placements, used_words)
+                   for (dimensions, placements), seed in zip(tiles, seeds)]
+        return [future.result() for future in futures]
+
+
+def _run_batch_job(index, generator_class, dimensions, n_loops, timeout, target_occupancy, seed, deadline=None,
+                   error=None):
+    """Génère une grille d'un lot dans un processus de travail.
+
+    Les erreurs sont capturées et renvoyées dans le résultat, afin qu'une
+    grille en échec n'interrompe pas le reste du lot.
+
+    Args:
+        index (int): Numéro de la grille dans le lot.
+        generator_class (type): Classe du générateur à utiliser, ou None si
+            l'algorithme demandé est inconnu.
+        dimensions (list): Dimensions de la grille.
+        n_loops (int): Nombre de boucles d'exécution.
+        timeout (int): Temps maximum par boucle d'exécution.
+        target_occupancy (float): Occupation désirée.
+        seed (int): Graine de cette grille.
+        deadline (float): Instant (time.time()) auquel la génération s'arrête
+            et rend sa grille courante, ou None.
+        error (str): Erreur relevée dans la demande avant la génération, ou
+            None ; la grille est alors comptée comme un échec.
+
+    Returns:
+        dict: Résultat de la grille, avec son temps de génération.
+    """
+    start_time = time.time()
+    result = {"index": index, "dim": dimensions, "target_occupancy": target_occupancy, "seed": seed}
+
+    try:
+        if error is not None:
+            raise ValueError(error)
+        if generator_class is None:
+            raise ValueError("unknown algorithm")
+        generator = generator_class(_worker_words, dimensions, n_loops, timeout, target_occupancy,
+                                    rng=random.Random(seed))
+        generator.generate_grid(deadline)
+        grid = generator.get_grid()
+        result.update(occupancy=basic_ops.compute_occupancy(grid), grid=grid.to_lists(),
+                      words=generator.get_words_in_grid())
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+
+    result["elapsed"] = time.time() - start_time
+    return result
+
+
+def generate_batch(word_list, jobs, n_workers):
+    """Génère un lot de grilles sur un nombre borné de processus.
+
+    Les tâches sont lues au fur et à mesure et au plus 2 * n_workers d'entre
+    elles sont en attente à la fois ; chaque résultat est rendu dès qu'il est
+    prêt, dans l'ordre d'achèvement.
+
+    Args:
+        word_list (list | WordIndex): Mots valides, transmis une seule fois à chaque processus.
+        jobs (iterable): Tuples (numéro, classe du générateur, dimensions,
+            boucles, délai, occupation désirée, graine).
+        n_workers (int): Nombre de processus de travail.
+
+    Yields:
+        dict: Résultat de chaque grille, voir _run_batch_job.
+    """
+    max_pending = 2 * n_workers
+
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(word_list, multiprocessing.Event())) as executor:
+        pending = set()
+        for job in jobs:
+            pending.add(executor.submit(_run_batch_job, *job))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def _init_service_worker(word_files):
+    """Prépare un processus de travail du service : dictionnaires préchargés, sortie muette.
+
+    Args:
+        word_files (dict): Fichier de mots de chaque dictionnaire, par identifiant.
+    """
+    global _worker_dictionaries
+    sys.stdout = open(os.devnull, "w")
+    instrumentation.set_sink(instrumentation.SilentSink())
+    _worker_dictionaries = {name: file_ops.read_word_index(filename) for name, filename in word_files.items()}
+
+
+def _run_service_job(word_list_id, *job):
+    """Génère une grille pour le service avec l'un des dictionnaires préchargés.
+
+    Args:
+        word_list_id (str): Identifiant du dictionnaire à utiliser.
+        *job: Arguments de _run_batch_job.
+
+    Returns:
+        dict: Résultat de la grille, voir _run_batch_job.
+    """
+    global _worker_words
+    _worker_words = _worker_dictionaries.get(word_list_id)
+    if _worker_words is None:
+        return {"index": job[0], "error": f"unknown word list: {word_list_id}", "elapsed": 0.0}
+    return _run_batch_job(*job)
@@ -0,0 +1,254 @@
+import random
+import time
+
+import basic_ops
+import instrumentation
+
+# Demi-côté de la zone rouverte autour d'un emplacement mort quand le remplissage est bloqué
+REOPEN_RADIUS = 3
+
+
+def runs_in_line(cells, lengths):
+    """Énumère les segments d'une ligne ou colonne où un mot pourrait être posé.
+
+    Un segment doit avoir ses deux extrémités libres (ou au bord de la grille)
+    et contenir au moins une case vide.
+
+    Args:
+        cells (list): Contenu de la ligne ou de la colonne.
+        lengths (list): Longueurs de mots disponibles, triées.
+
+    Returns:
+        list: Tuples (début, longueur, croisements), où croisements est le
+        nombre de lettres existantes que le segment recouvre.
+    """
+    size = len(cells)
+    runs = []
+
+    for start in range(size):
+        if start > 0 and cells[start - 1] != 0:
+            continue
+        for length in lengths:
+            end = start + length
+            if end > size:
+                break
+            if end < size and cells[end] != 0:
+                continue
+            segment = cells[start:end]
+            if 0 in segment:
+                runs.append((start, length, length - segment.count(0)))
+
+    return runs
+
+
+def open_slots(grid, lengths):
+    """Énumère les emplacements ouverts de la grille, dans les deux directions.
+
+    Args:
+        grid (Grid): Grille actuelle.
+        lengths (list): Longueurs de mots disponibles, triées.
+
+    Returns:
+        list: Tuples (ligne, colonne, direction, longueur, croisements).
+    """
+    slots = []
+
+    for line, row in enumerate(grid):
+        for start, length, crossings in runs_in_line(row, lengths):
+            slots.append((line, start, "E", length, crossings))
+
+    for column in range(grid.width):
+        cells = [row[column] for row in grid]
+        for start, length, crossings in runs_in_line(cells, lengths):
+            slots.append((start, column, "S", length, crossings))
+
+    return slots
+
+
+def allowed_letters(line, column, direction, grid, words):
+    """Calcule les lettres qu'une case vide peut recevoir pour un mot de direction donnée.
+
+    Args:
+        line (int): Ligne de la case.
+        column (int): Colonne de la case.
+        direction (str): Direction du mot posé ('E' ou 'S').
+        grid (Grid): Grille actuelle.
+        words (WordIndex): Mots disponibles.
+
+    Returns:
+        frozenset: Lettres qui forment un mot perpendiculaire disponible, ou
+        None si la case n'a aucun voisin perpendiculaire.
+    """
+    if not grid.side_neighbors(line, column, direction):
+        return None
+
+    crossing = "S" if direction == "E" else "E"
+    run, start = basic_ops.extract_crossing_word(line, column, "", grid, crossing)
+    split = column - start[1] if crossing == "E" else line - start[0]
+    prefix, suffix = run[:split], run[split:]
+
+    return frozenset(letter for letter in words.alphabet if prefix + letter + suffix in words)
+
+
+def slot_pattern(slot, grid, words, cache):
+    """Calcule le motif de contraintes d'un emplacement.
+
+    Args:
+        slot (tuple): Emplacement (ligne, colonne, direction, longueur, croisements).
+        grid (Grid): Grille actuelle.
+        words (WordIndex): Mots disponibles.
+        cache (dict): Lettres autorisées déjà calculées, par case et direction.
+
+    Returns:
+        list: Une contrainte par case (lettre, None ou ensemble de lettres), ou
+        None si une case vide ne peut recevoir aucune lettre.
+    """
+    line, column, direction, length, _ = slot
+    pattern = []
+
+    for k in range(length):
+        i, j = (line, column + k) if direction == "E" else (line + k, column)
+        letter = grid.cell(i, j)
+        if letter != 0:
+            pattern.append(letter)
+            continue
+
+        key = (i, j, direction)
+        if key not in cache:
+            cache[key] = allowed_letters(i, j, direction, grid, words)
+        allowed = cache[key]
+
+        if allowed is not None and not allowed:
+            return None
+        pattern.append(allowed)
+
+    return pattern
+
+
+def slot_touches(slot, line, column, direction, length):
+    """Indique si un mot posé modifie le voisinage d'un emplacement.
+
+    Args:
+        slot (tuple): Emplacement (ligne, colonne, direction, longueur, croisements).
+        line (int): Ligne de départ du mot posé.
+        column (int): Colonne de départ du mot posé.
+        direction (str): Direction du mot posé.
+        length (int): Longueur du mot posé.
+
+    Returns:
+        bool: True si les deux zones se recouvrent.
+    """
+    s_line, s_column, s_direction, s_length, _ = slot
+    if s_direction == "E":
+        top, bottom, left, right = s_line - 1, s_line + 1, s_column - 1, s_column + s_length
+    else:
+        top, bottom, left, right = s_line - 1, s_line + s_length, s_column - 1, s_column + 1
+
+    last_line = line + length - 1 if direction == "S" else line
+    last_column = column + length - 1 if direction == "E" else column
+
+    return not (last_line < top or line > bottom or last_column < left or column > right)
+
+
+def find_slot_candidate(grid, words, dead_slots, rng=random):
+    """Cherche un mot qui respecte le motif d'un emplacement ouvert.
+
+    Les emplacements qui croisent le plus de lettres existantes sont essayés
+    en premier, puis les plus longs, dans un ordre aléatoire à égalité. Ceux
+    sans aucun mot compatible sont ajoutés à dead_slots, ainsi que, si aucun
+    emplacement ne peut être rempli, ceux dont le mot tiré formait un mot
+    croisé invalide.
+
+    Args:
+        grid (Grid): Grille actuelle.
+        words (WordIndex): Mots disponibles.
+        dead_slots (set): Emplacements déjà connus comme impossibles à remplir.
+        rng (random.Random): Générateur aléatoire. Par défaut, celui du module random.
+
+    Returns:
+        tuple: La possibilité trouvée et les nouveaux mots qu'elle crée, ou
+        (None, None) si aucun emplacement ne peut être rempli.
+    """
+    slots = [slot for slot in open_slots(grid, words.lengths()) if slot not in dead_slots]
+    rng.shuffle(slots)
+    slots.sort(key=lambda slot: (-slot[4], -slot[3]))
+    cache = {}
+    blocked = []
+
+    for slot in slots:
+        pattern = slot_pattern(slot, grid, words, cache)
+        word = words.random_match(pattern, rng) if pattern is not None else None
+        if word is None:
+            dead_slots.add(slot)
+            continue
+
+        line, column, direction = slot[0], slot[1], slot[2]
+        new_words = basic_ops.find_new_words(word, line, column, direction, grid, words)
+        if new_words is None:
+            blocked.append(slot)
+            continue
+
+        return {"word": word, "location": [line, column], "D": direction}, new_words
+
+    dead_slots.update(blocked)
+    return None, None
+
+
+def pattern_grid_fill(grid, occ_goal, timeout, dim, words, should_stop=None, rng=random, record=None,
+                      dead_slots=None):
+    """Remplit la grille en interrogeant l'index positionnel emplacement par emplacement.
+
+    Args:
+        grid (Grid): Grille actuelle.
+        occ_goal (float): Objectif d'occupation.
+        timeout (int): Temps maximum pour le remplissage.
+        dim (list): Dimensions de la grille.
+        words (WordIndex): Mots valides, marqués comme utilisés au fur et à mesure.
+        should_stop (callable): Fonction sans argument qui, si elle retourne
+            True, interrompt le remplissage avant l'objectif.
+        rng (random.Random): Générateur aléatoire. Par défaut, celui du module random.
+        record (callable): Voir basic_ops.basic_grid_fill.
+        dead_slots (set): Ensemble complété avec les emplacements impossibles
+            à remplir qui restent à la fin, ou None.
+
+    Returns:
+        list: Liste des mots ajoutés.
+    """
+    start_time = time.time()
+    occupancy = basic_ops.compute_occupancy(grid)
+    added_words = []
+    dead_slots = dead_slots if dead_slots is not None else set()
+
+    while occupancy < occ_goal and time.time() - start_time < timeout:
+        if should_stop is not None and should_stop():
+            break
+
+        new, new_words = find_slot_candidate(grid, words, dead_slots, rng)
+
+        if new is None:
+            instrumentation.emit("no_open_slot")
+            break
+
+        basic_ops.add_word_to_grid(new, grid)
+        added_words.append(new)
+        added_words.extend(new_words)
+
+        basic_ops.mark_word_used(words, new["word"])
+        for word in new_words:
+            basic_ops.mark_word_used(words, word["word"])
+        if record is not None:
+            for word in [new] + new_words:
+                record(word)
+
+        line, column = new["location"]
+        for slot in [slot for slot in dead_slots if slot_touches(slot, line, column, new["D"], len(new["word"]))]:
+            dead_slots.discard(slot)
+
+        occupancy = basic_ops.compute_occupancy(grid)
+        instrumentation.count("placements")
+        instrumentation.emit("word_added", word=new["word"], occupancy=occupancy,
+                             score=basic_ops.score_candidate(new["word"], new_words))
+        if new_words:
+            instrumentation.emit("crossings_created", new_words=new_words)
+
+    return added_words
@@ -0,0 +1,166 @@
+import basic_ops
+
+
+class PlacementJournal:
+    """Journal des mots placés dans une grille, avec annulation mot par mot.
+
+    Chaque case compte les mots qui la recouvrent : retirer un mot n'efface que
+    les cases dont il était le seul propriétaire, sans reconstruire la grille.
+    Le journal retient aussi les mots dont le voisinage a changé depuis le
+    dernier tri, afin de ne revérifier l'isolement que de ceux-là.
+
+    Un mot qui en prolonge un autre de même direction (un mot croisé qui
+    allonge une suite de lettres déjà placée, par exemple) absorbe le mot le
+    plus court : celui-ci n'est plus un mot entier de la grille et sort du
+    journal, et des mots utilisés si le journal connaît la liste de mots. Il
+    y revient quand le mot qui l'a absorbé est retiré.
+    """
+
+    def __init__(self, grid, word_list=None):
+        """Crée un journal vide pour une grille.
+
+        Args:
+            grid (Grid | CompactGrid): La grille dont les mots sont suivis.
+            word_list (WordIndex): Mots disponibles, dont les mots absorbés
+                sont libérés puis de nouveau marqués quand ils reviennent.
+        """
+        self.grid = grid
+        self.word_list = word_list
+        self.placements = {}
+        # Mots absorbés par chaque placement, à rétablir quand il est retiré
+        self._absorbed = {}
+        self.dirty = set()
+        self._next_id = 0
+        self._owners = [set() for _ in range(grid.height * grid.width)]
+
+    def __len__(self):
+        return len(self.placements)
+
+    @property
+    def n_recorded(self):
+        """Nombre total de placements enregistrés, y compris ceux retirés depuis."""
+        return self._next_id
+
+    def words(self):
+        """Retourne les mots placés, dans l'ordre de leur placement."""
+        # Un mot rétabli par remove() est réinséré en fin de dictionnaire
+        return [self.placements[placement_id] for placement_id in sorted(self.placements)]
+
+    def cells(self, possibility):
+        """Retourne les indices des cases recouvertes par un mot."""
+        line, column = possibility["location"]
+        step = 1 if possibility["D"] == "E" else self.grid.width
+        start = line * self.grid.width + column
+        return range(start, start + step * len(possibility["word"]), step)
+
+    def owners(self, index):
+        """Retourne les identifiants des placements qui recouvrent une case.
+
+        Args:
+            index (int): Indice de la case, ligne * largeur + colonne.
+
+        Returns:
+            set: Identifiants des placements propriétaires de la case.
+        """
+        return self._owners[index]
+
+    def record(self, possibility):
+        """Enregistre un mot déjà écrit dans la grille.
+
+        Args:
+            possibility (dict): Dictionnaire contenant le mot, sa position et sa direction.
+
+        Returns:
+            int: Identifiant du placement, à passer à remove().
+        """
+        placement_id = self._next_id
+        self._next_id += 1
+        cells = self.cells(possibility)
+
+        absorbed = []
+        for other_id in {owner for index in cells for owner in self._owners[index]}:
+            other = self.placements[other_id]
+            other_cells = self.cells(other)
+            if other["D"] == possibility["D"] and cells.start <= other_cells.start and other_cells[-1] <= cells[-1]:
+                absorbed.append((other_id, self.placements.pop(other_id)))
+                for index in other_cells:
+                    self._owners[index].discard(other_id)
+                self.dirty.discard(other_id)
+                if self.word_list is not None:
+                    self.word_list.release(other["word"])
+        if absorbed:
+            self._absorbed[placement_id] = absorbed
+
+        self.placements[placement_id] = possibility
+        self.dirty.add(placement_id)
+        for index in cells:
+            self._owners[index].add(placement_id)
+
+        return placement_id
+
+    def add(self, possibility):
+        """Écrit un mot dans la grille et l'enregistre.
+
+        Args:
+            possibility (dict): Dictionnaire contenant le mot, sa position et sa direction.
+
+        Returns:
+            int: Identifiant du placement.
+        """
+        basic_ops.add_word_to_grid(possibility, self.grid)
+        return self.record(possibility)
+
+    def remove(self, placement_id):
+        """Retire un mot et efface les cases dont il était le seul propriétaire.
+
+        Les mots qu'il avait absorbés reviennent, sauf ceux utilisés ailleurs
+        entre-temps. Les mots qui partagent une case avec lui ou touchent une
+        case effacée sont marqués pour la prochaine vérification d'isolement.
+
+        Args:
+            placement_id (int): Identifiant du placement à retirer.
+
+        Returns:
+            dict: Le mot retiré.
+        """
+        possibility = self.placements.pop(placement_id)
+        width = self.grid.width
+
+        for other_id, other in self._absorbed.pop(placement_id, ()):
+            if self.word_list is not None:
+                if other["word"] not in self.word_list:
+                    self._absorbed.pop(other_id, None)
+                    continue
+                self.word_list.mark_used(other["word"])
+            self.placements[other_id] = other
+            self.dirty.add(other_id)
+            for index in self.cells(other):
+                self._owners[index].add(other_id)
+
+        for index in self.cells(possibility):
+            owners = self._owners[index]
+            owners.discard(placement_id)
+            if owners:
+                self.dirty.update(owners)
+                continue
+
+            line, col = divmod(index, width)
+            self.grid.clear(line, col)
+            for n_line, n_col in ((line - 1, col), (line + 1, col), (line, col - 1), (line, col + 1)):
+                if 0 <= n_line < self.grid.height and 0 <= n_col < width:
+                    self.dirty.update(self._owners[n_line * width + n_col])
+
+        self.dirty.discard(placement_id)
+        return possibility
+
+    def cull_isolated(self):
+        """Retire les mots isolés parmi ceux dont le voisinage a changé.
+
+        Returns:
+            list: Les mots retirés.
+        """
+        candidates, self.dirty = self.dirty, set()
+        isolated = [placement_id for placement_id in sorted(candidates)
+                    if basic_ops.is_isolated(self.placements[placement_id], self.grid)]
+
+        return [self.remove(placement_id) for placement_id in isolated]
@@ -0,0 +1,160 @@
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
+
+import file_ops
+
+# Formats de sortie disponibles ; seul "pdf" a besoin de LaTeX
+OUTPUT_FORMATS = ("pdf", "tex", "text", "json", "svg")
+
+# Côté d'une case et marge des grilles SVG, en pixels
+SVG_CELL_SIZE = 28
+SVG_MARGIN = 14
+
+
+def word_strings(words):
+    """Retourne les mots utilisés sous forme de chaînes, triés par longueur puis par ordre alphabétique."""
+    return sorted((word["word"] if isinstance(word, dict) else word for word in words),
+                  key=lambda word: (len(word), word))
+
+
+def grid_to_text(grid, is_solution=True):
+    """Met une grille en forme sous forme de texte brut.
+
+    Args:
+        grid (list): Grille, sous forme de liste de listes.
+        is_solution (bool): Si True, affiche les lettres ; sinon, les cases
+            remplies sont marquées par '_'.
+
+    Returns:
+        str: Une ligne de texte par ligne de la grille ; les cases vides sont marquées par '#'.
+    """
+    return "\n".join(" ".join("#" if element == 0 else str(element) if is_solution else "_" for element in line)
+                     for line in grid) + "\n"
+
+
+def puzzle_to_text(grid, words):
+    """Met une grille en forme en texte brut : énoncé, mots utilisés puis solution."""
+    return ("Challenge:\n" + grid_to_text(grid, is_solution=False) +
+            "\nWords:\n" + "\n".join(word_strings(words)) + "\n" +
+            "\nSolution:\n" + grid_to_text(grid))
+
+
+def puzzle_to_json(grid, words):
+    """Met une grille en forme sous forme d'objet sérialisable en JSON."""
+    return {"grid": [list(line) for line in grid],
+            "words": [dict(word) if isinstance(word, dict) else word for word in words]}
+
+
+def grid_to_svg(grid, x, y, is_solution):
+    """Retourne les éléments SVG d'une grille placée en (x, y)."""
+    elements = []
+    for i, line in enumerate(grid):
+        for j, element in enumerate(line):
+            left, top = x + j * SVG_CELL_SIZE, y + i * SVG_CELL_SIZE
+            fill = "black" if element == 0 else "white"
+            elements.append(f'<rect x="{left}" y="{top}" width="{SVG_CELL_SIZE}" height="{SVG_CELL_SIZE}" '
+                            f'fill="{fill}" stroke="black"/>')
+            if element != 0 and is_solution:
+                elements.append(f'<text x="{left + SVG_CELL_SIZE / 2}" y="{top + SVG_CELL_SIZE * 0.72}" '
+                                f'text-anchor="middle">{escape(str(element))}</text>')
+    return elements
+
+
+def puzzle_to_svg(grid, words):
+    """Met une grille en forme sous forme d'image SVG : énoncé et solution côte à côte, puis les mots."""
+    height, width = len(grid), len(grid[0])
+    grid_width, grid_height = width * SVG_CELL_SIZE, height * SVG_CELL_SIZE
+    words = word_strings(words)
+    columns = 4
+    rows = (len(words) + columns - 1) // columns
+    column_width = (2 * grid_width + SVG_MARGIN) / columns
+    total_width = 2 * grid_width + 3 * SVG_MARGIN
+    total_height = grid_height + 2 * SVG_MARGIN + rows * 18 + (SVG_MARGIN if rows else 0)
+
+    elements = grid_to_svg(grid, SVG_MARGIN, SVG_MARGIN, is_solution=False)
+    elements += grid_to_svg(grid, grid_width + 2 * SVG_MARGIN, SVG_MARGIN, is_solution=True)
+    for index, word in enumerate(words):
+        column, row = divmod(index, rows)
+        elements.append(f'<text x="{SVG_MARGIN + column * column_width}" '
+                        f'y="{grid_height + 2 * SVG_MARGIN + (row + 1) * 18}">{escape(word)}</text>')
+
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{total_width}" height="{total_height}" '
+            f'font-family="sans-serif" font-size="{SVG_CELL_SIZE * 0.6:.0f}">\n' +
+            "\n".join(elements) + "\n</svg>\n")
+
+
+def numbered_path(out_path, index, count):
+    """Ajoute un numéro au nom d'un fichier de sortie quand plusieurs fichiers sont produits."""
+    if count == 1:
+        return out_path
+    root, extension = os.path.splitext(out_path)
+    return f"{root}-{index}{extension}"
+
+
+def write_puzzles(puzzles, out_path, output_format="pdf", keep_tex=False):
+    """Écrit des grilles dans le format demandé.
+
+    Les formats pdf et tex produisent un seul document de plusieurs pages, le
+    format text un seul fichier et le format json un objet par ligne ; le
+    format svg produit un fichier par grille, numéroté s'il y en a plusieurs.
+
+    Args:
+        puzzles (list): Couples (grille, mots utilisés).
+        out_path (str): Fichier de sortie.
+        output_format (str): Un des OUTPUT_FORMATS.
+        keep_tex (bool): Avec pdf, conserve le fichier .tex à côté du PDF.
+
+    Raises:
+        ValueError: Si le format est inconnu.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}.")
+
+    if output_format == "pdf":
+        file_ops.write_puzzles_to_file(puzzles, os.path.splitext(out_path)[0] + ".tex", out_pdf=out_path,
+                                       keep_tex=keep_tex)
+    elif output_format == "tex":
+        file_ops.write_puzzles_to_file(puzzles, out_path, out_pdf=None)
+    elif output_format == "svg":
+        for index, (grid, words) in enumerate(puzzles):
+            with open(numbered_path(out_path, index, len(puzzles)), "w", encoding="utf-8") as out:
+                out.write(puzzle_to_svg(grid, words))
+    else:
+        with open(out_path, "w", encoding="utf-8") as out:
+            for index, (grid, words) in enumerate(puzzles):
+                if output_format == "json":
+                    out.write(json.dumps(puzzle_to_json(grid, words)) + "\n")
+                else:
+                    out.write(("\n" if index else "") + puzzle_to_text(grid, words))
+
+
+def render_pdfs(documents, n_workers=None):
+    """Compile plusieurs documents PDF en même temps.
+
+    Chaque document est écrit puis compilé dans son propre dossier
+    temporaire par un fil d'exécution ; pdflatex tourne dans des processus
+    séparés, sans que le dossier courant ne change.
+
+    Args:
+        documents (list): Couples (grilles du document, fichier PDF de sortie),
+            les grilles étant des couples (grille, mots utilisés).
+        n_workers (int): Nombre de compilations simultanées. Par défaut, le
+            nombre de processeurs.
+
+    Returns:
+        list: Pour chaque document, None en cas de succès ou l'erreur rencontrée.
+    """
+    def render(document):
+        puzzles, out_pdf = document
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                file_ops.write_puzzles_to_file(puzzles, os.path.join(tmpdir, "puzzles.tex"), out_pdf)
+        except (OSError, RuntimeError) as error:
+            return error
+        return None
+
+    with ThreadPoolExecutor(max_workers=n_workers or os.cpu_count()) as executor:
+        return list(executor.map(render, documents))
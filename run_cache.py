@@ -0,0 +1,99 @@
+# Nombre d'entrées au-delà duquel le cache est vidé
+DEFAULT_MAX_ENTRIES = 1 << 16
+
+
+class CrossingRunCache:
+    """Cache des lettres qui entourent les cases vides d'une grille, pour les mots croisés.
+
+    Poser une lettre sur une case vide forme, perpendiculairement, le mot
+    préfixe + lettre + suffixe, où préfixe et suffixe sont les lettres
+    contiguës de part et d'autre de la case. Ils ne dépendent que des cases
+    de cette suite et des deux cases vides qui la bornent : l'entrée d'une
+    case et d'une direction est effacée dès que l'une d'elles change (voir
+    invalidate(), appelée par la grille à chaque écriture ou effacement).
+
+    Le cache est borné : il est vidé entièrement quand il atteint max_entries
+    entrées. Les compteurs hits, misses, invalidations et evictions
+    permettent d'en suivre l'efficacité.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        """Crée un cache vide.
+
+        Args:
+            max_entries (int): Nombre maximum d'entrées.
+        """
+        self.max_entries = max_entries
+        # Entrées par (direction, ligne pour 'E' ou colonne pour 'S'), puis par position de la case
+        self._lines = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, line, column, direction):
+        """Retourne l'entrée d'une case vide pour une direction, ou None si elle n'est pas en cache.
+
+        Returns:
+            tuple: Préfixe, suffixe et position de départ du mot le long de la
+            ligne (ou de la colonne), ou None.
+        """
+        index, position = (line, column) if direction == "E" else (column, line)
+        entries = self._lines.get((direction, index))
+        entry = entries.get(position) if entries is not None else None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, line, column, direction, prefix, suffix, start):
+        """Enregistre l'entrée d'une case vide et la retourne.
+
+        Args:
+            line (int): Ligne de la case.
+            column (int): Colonne de la case.
+            direction (str): Direction du mot formé ('E' ou 'S').
+            prefix (str): Lettres contiguës avant la case.
+            suffix (str): Lettres contiguës après la case.
+            start (int): Position de départ du mot le long de la ligne (ou de la colonne).
+
+        Returns:
+            tuple: L'entrée (préfixe, suffixe, départ).
+        """
+        if self.size >= self.max_entries:
+            self.clear()
+            self.evictions += 1
+
+        index, position = (line, column) if direction == "E" else (column, line)
+        entry = (prefix, suffix, start)
+        entries = self._lines.setdefault((direction, index), {})
+        if position not in entries:
+            self.size += 1
+        entries[position] = entry
+        return entry
+
+    def invalidate(self, line, column):
+        """Efface les entrées qui dépendent d'une case dont le contenu vient de changer."""
+        for direction, index, changed in (("E", line, column), ("S", column, line)):
+            entries = self._lines.get((direction, index))
+            if not entries:
+                continue
+            # Une entrée dépend des cases de son mot et des deux cases vides qui le bornent
+            stale = [position for position, (_, suffix, start) in entries.items()
+                     if start - 1 <= changed <= position + len(suffix) + 1]
+            for position in stale:
+                del entries[position]
+            self.size -= len(stale)
+            self.invalidations += len(stale)
+
+    def clear(self):
+        """Efface toutes les entrées."""
+        self._lines.clear()
+        self.size = 0
+
+    def hit_rate(self):
+        """Proportion des recherches trouvées en cache, ou None avant toute recherche."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
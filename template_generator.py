@@ -0,0 +1,239 @@
+import math
+import time
+
+import basic_ops
+import instrumentation
+from grid_generator import GridGenerator
+
+
+class TemplateGridGenerator(GridGenerator):
+    """Générateur pour grilles à forme imposée (voir GridTemplate).
+
+    Seuls les emplacements du gabarit sont remplis : la recherche choisit à
+    chaque nœud l'emplacement libre qui a le moins de mots compatibles avec
+    les lettres déjà posées, y essaie quelques mots, et revient en arrière
+    dès qu'un emplacement n'a plus aucun mot. C'est une recherche bien plus
+    petite que le placement libre sur toutes les cases.
+
+    Une recherche sans issue est relancée avec d'autres tirages jusqu'à
+    l'échéance. L'occupation désirée est relative aux cases blanches du
+    gabarit : 1.0 demande une grille entièrement remplie. Si le temps
+    manque, la meilleure grille partielle est gardée, débarrassée des mots
+    qui forment, avec un emplacement encore libre, une suite de lettres qui
+    n'est pas un mot.
+    """
+
+    # Nombre de mots essayés au plus pour un emplacement
+    max_branching = 4
+    # Nombre de mots tirés pour un emplacement, parmi lesquels les max_branching meilleurs sont essayés
+    candidate_pool = 16
+
+    def __init__(self, word_list, dimensions, n_loops, timeout, target_occupancy, should_stop=None, template=None,
+                 **kwargs):
+        """Crée le générateur ; les dimensions sont celles du gabarit.
+
+        Raises:
+            ValueError: Sans gabarit, ou si le dictionnaire n'a aucun mot de
+                la longueur d'un emplacement.
+        """
+        if template is None:
+            raise ValueError("The template generator needs a grid template.")
+        self.template = template
+        super().__init__(word_list, template.dimensions, n_loops, timeout, target_occupancy * template.occupancy(),
+                         should_stop, **kwargs)
+
+        missing = sorted({slot[3] for slot in template.slots} - set(self.word_list.lengths()))
+        if missing:
+            raise ValueError(f"The word list has no word of length {', '.join(map(str, missing))}, "
+                             f"needed by the grid template.")
+
+    def generate_content_for_grid(self):
+        """Remplit les emplacements du gabarit par recherche avec retour arrière, dans le temps imparti."""
+        self.goal_cells = math.ceil(self.target_occupancy * self.grid.height * self.grid.width)
+        self.search_deadline = time.time() + self.timeout
+        self.stack = []
+        self.assigned = {}
+        for placement_id, possibility in self.journal.placements.items():
+            slot = self.template.slot_of(possibility)
+            if slot is not None:
+                self.assigned[slot] = placement_id
+        self.best = []
+        self.best_state = (self.grid.filled, 0)
+        self.nodes = 0
+
+        # Une branche sans issue relance la recherche, avec d'autres tirages, jusqu'à l'échéance
+        while not self.search():
+            while self.stack:
+                self.undo()
+            instrumentation.count("search.restarts")
+
+        # Retour à l'état initial puis rejeu de la meilleure branche trouvée
+        while self.stack:
+            self.undo()
+        for slot, word in self.best:
+            self.place(slot, word)
+        self.drop_partial_runs()
+        self.stack = []
+
+        instrumentation.count("search.nodes", self.nodes)
+        instrumentation.emit("search_done", nodes=self.nodes, backjumps=0,
+                             occupancy=basic_ops.compute_occupancy(self.grid))
+
+    def search(self):
+        """Explore récursivement les affectations d'emplacements à partir de l'état courant.
+
+        Returns:
+            bool: True si la recherche doit s'arrêter (objectif atteint, tous
+            les emplacements remplis, temps écoulé ou arrêt demandé), False si
+            cette branche est sans issue.
+        """
+        self.nodes += 1
+        if self.grid.filled >= self.goal_cells and self.is_consistent():
+            return True
+        if time.time() > self.search_deadline or self.stop_requested():
+            return True
+
+        slot, pattern, count = self.choose_slot()
+        if slot is None:
+            return True
+        if not count:
+            return False
+
+        for word in self.slot_candidates(slot, pattern, count):
+            self.place(slot, word)
+            # Les derniers mots ne remplissent souvent aucune case de plus : leur nombre départage
+            if (self.grid.filled, len(self.stack)) > self.best_state:
+                self.best_state = (self.grid.filled, len(self.stack))
+                self.best = [(entry[0], entry[1]) for entry in self.stack]
+            if self.search():
+                return True
+            self.undo()
+
+        return False
+
+    def slot_pattern(self, slot):
+        """Motif d'un emplacement : sa lettre pour chaque case remplie, None sinon."""
+        return [self.grid.cell(line, column) or None for line, column in self.template.slot_cells(slot)]
+
+    def choose_slot(self):
+        """Choisit l'emplacement libre qui a le moins de mots compatibles.
+
+        Returns:
+            tuple: L'emplacement, son motif et son nombre de mots ; le nombre
+            vaut 0 dès qu'un emplacement n'a plus aucun mot. L'emplacement
+            vaut None si tous sont remplis.
+        """
+        best_slot, best_pattern, best_count = None, None, None
+        for slot in range(len(self.template.slots)):
+            if slot in self.assigned:
+                continue
+            pattern = self.slot_pattern(slot)
+            count = self.word_list.match(pattern).bit_count()
+            if best_count is None or count < best_count:
+                best_slot, best_pattern, best_count = slot, pattern, count
+                if not count:
+                    break
+        return best_slot, best_pattern, best_count
+
+    def slot_candidates(self, slot, pattern, count):
+        """Choisit au plus max_branching mots pour un emplacement, en regardant un coup en avant.
+
+        Parmi candidate_pool mots tirés, ceux qui laissent un emplacement
+        croisé sans aucun mot sont écartés ; les autres sont classés selon le
+        nombre de mots qui restent à l'emplacement croisé le plus contraint.
+
+        Args:
+            slot (int): Indice de l'emplacement.
+            pattern (list): Motif de l'emplacement.
+            count (int): Nombre de mots qui respectent le motif.
+
+        Returns:
+            list: Les mots à essayer, dans l'ordre.
+        """
+        words = []
+        for _ in range(2 * min(self.candidate_pool, count)):
+            word = self.word_list.random_match(pattern, self.rng)
+            if word not in words:
+                words.append(word)
+            if len(words) >= min(self.candidate_pool, count):
+                break
+
+        crossing = {other for _, other, _ in self.template.crossings[slot]}
+        scored = []
+        for word in words:
+            self.place(slot, word)
+            support = min((self.word_list.match(self.slot_pattern(other)).bit_count()
+                           for other in crossing if other not in self.assigned), default=count)
+            self.undo()
+            if support:
+                scored.append((support, word))
+
+        scored.sort(key=lambda entry: -entry[0])
+        return [word for _, word in scored[:self.max_branching]]
+
+    def place(self, slot, word):
+        """Écrit un mot dans un emplacement et empile de quoi l'annuler."""
+        line, column, direction, _ = self.template.slots[slot]
+        placement_id = self.journal.add({"word": word, "location": [line, column], "D": direction})
+        self.word_list.mark_used(word)
+        self.assigned[slot] = placement_id
+        self.stack.append((slot, word))
+
+    def undo(self):
+        """Annule le dernier placement empilé par place()."""
+        slot, word = self.stack.pop()
+        self.remove_slot(slot)
+
+    def remove_slot(self, slot):
+        """Retire le mot d'un emplacement rempli et le rend disponible."""
+        possibility = self.journal.remove(self.assigned.pop(slot))
+        self.word_list.release(possibility["word"])
+
+    def drop_partial_runs(self):
+        """Retire les mots qui forment des suites de lettres invalides dans des emplacements libres.
+
+        Dans une grille partielle, les lettres de mots voisins peuvent se
+        suivre dans un emplacement encore libre sans y former de mot. Tant
+        qu'une telle suite existe, le mot le plus récent qui la croise est
+        retiré ; un emplacement libre dont toutes les cases forment un mot
+        disponible est au contraire enregistré tel quel.
+        """
+        order = {slot: rank for rank, slot in enumerate(self.assigned)}
+        changed = True
+        while changed:
+            changed = False
+            for slot in range(len(self.template.slots)):
+                if slot in self.assigned:
+                    continue
+                pattern = self.slot_pattern(slot)
+                if None not in pattern and "".join(pattern) in self.word_list:
+                    line, column, direction, _ = self.template.slots[slot]
+                    self.assigned[slot] = self.journal.record({"word": "".join(pattern), "location": [line, column],
+                                                               "D": direction})
+                    self.word_list.mark_used("".join(pattern))
+                    order[slot] = len(order)
+                    continue
+
+                run = self.invalid_run(slot, pattern)
+                if run:
+                    crossing = [other for position, other, _ in self.template.crossings[slot]
+                                if position in run and other in self.assigned]
+                    self.remove_slot(max(crossing, key=order.get))
+                    changed = True
+
+    def is_consistent(self):
+        """Indique si aucun emplacement libre ne contient de suite de lettres qui n'est pas encore un mot."""
+        return all(self.invalid_run(slot, self.slot_pattern(slot)) is None
+                   for slot in range(len(self.template.slots)) if slot not in self.assigned)
+
+    def invalid_run(self, slot, pattern):
+        """Retourne les positions d'une suite d'au moins deux lettres dans un emplacement libre, ou None."""
+        run = []
+        for position, letter in enumerate(pattern + [None]):
+            if letter is not None:
+                run.append(position)
+                continue
+            if len(run) >= 2:
+                return set(run)
+            run = []
+        return None
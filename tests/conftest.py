@@ -0,0 +1,77 @@
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bench
+import file_ops
+import instrumentation
+
+# Nombre de mots de la liste synthétique partagée par les tests
+N_WORDS = 20000
+
+
+@pytest.fixture(autouse=True)
+def event_log():
+    """Met en forme les événements dans un tampon, pour vérifier leurs messages sans rien afficher."""
+    stream = io.StringIO()
+    instrumentation.set_sink(instrumentation.LogSink(stream))
+    instrumentation.reset()
+    yield stream
+    instrumentation.set_sink(instrumentation.LogSink())
+
+
+@pytest.fixture(scope="session")
+def word_file(tmp_path_factory):
+    """Liste de mots synthétique de bench.py, écrite une seule fois pour la session."""
+    filename = str(tmp_path_factory.mktemp("words") / "words.txt")
+    bench.synthetic_word_list(filename, N_WORDS)
+    return filename
+
+
+@pytest.fixture
+def words(word_file):
+    """Index neuf de la liste synthétique, sans dictionnaire compilé."""
+    return file_ops.read_word_index(word_file, cache=False)
+
+
+def grid_runs(grid):
+    """Retourne les suites d'au moins deux lettres de la grille, sous forme (direction, ligne, colonne, mot)."""
+    runs = set()
+    for direction, n_lines, size in (("E", grid.height, grid.width), ("S", grid.width, grid.height)):
+        for a in range(n_lines):
+            run, start = "", 0
+            for b in range(size + 1):
+                cell = (grid.cell(a, b) if direction == "E" else grid.cell(b, a)) if b < size else 0
+                if cell:
+                    if not run:
+                        start = b
+                    run += cell
+                    continue
+                if len(run) >= 2:
+                    runs.add((direction, a, start, run) if direction == "E" else (direction, start, a, run))
+                run = ""
+    return runs
+
+
+def assert_valid_grid(grid, listed, words):
+    """Vérifie la liste des mots d'une grille.
+
+    Chaque mot listé est une suite entière de lettres de la grille et fait
+    partie du dictionnaire, aucun mot n'est listé deux fois, et chaque suite
+    d'au moins deux lettres de la grille est listée.
+
+    Args:
+        grid (Grid): La grille.
+        listed (list): Les mots de la grille (words_in_grid).
+        words (WordIndex): Le dictionnaire.
+    """
+    placements = [(word["D"], *word["location"], word["word"]) for word in listed]
+    runs = grid_runs(grid)
+    assert [placement for placement in placements if placement not in runs] == []
+    assert sorted(runs - set(placements)) == []
+    assert len({placement[3] for placement in placements}) == len(placements)
+    assert all(words.is_known(placement[3]) for placement in placements)
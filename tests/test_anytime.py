@@ -0,0 +1,42 @@
+import threading
+import time
+
+import pytest
+
+from conftest import assert_valid_grid
+from grid_generator import GridGenerator, PatternGridGenerator
+
+
+@pytest.mark.parametrize("generator_class", [GridGenerator, PatternGridGenerator])
+def test_closing_the_iterator_cancels_generation(words, generator_class):
+    generator = generator_class(words, [15, 15], 3, 30.0, 1.0)
+    n_threads = threading.active_count()
+    start = time.time()
+    updates = generator.iter_grid()
+    first = next(updates)
+    updates.close()
+    assert list(updates) == []
+    assert time.time() - start < 5
+    assert first["occupancy"] > 0 and "final" not in first
+    assert threading.active_count() == n_threads
+    assert_valid_grid(generator.grid, generator.words_in_grid, words)
+
+
+def test_cancel_event_and_deadline_end_with_a_final_snapshot(words):
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+    generator = GridGenerator(words, [15, 15], 3, 30.0, 1.0)
+    start = time.time()
+    snapshots = list(generator.iter_grid(cancel=cancel))
+    assert time.time() - start < 5
+
+    assert [snapshot.get("final", False) for snapshot in snapshots] == [False] * (len(snapshots) - 1) + [True]
+    occupancies = [snapshot["occupancy"] for snapshot in snapshots[:-1]]
+    assert occupancies == sorted(occupancies)
+    assert snapshots[-1]["grid"] == generator.grid.to_lists()
+    snapshots[-1]["grid"][0][0] = "?"
+    assert generator.grid.cell(0, 0) != "?"
+
+    start = time.time()
+    final = list(GridGenerator(words, [15, 15], 3, 30.0, 1.0).iter_grid(deadline=time.time() + 0.3))[-1]
+    assert final["final"] and time.time() - start < 5
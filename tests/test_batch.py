@@ -0,0 +1,30 @@
+import argparse
+
+import parallel_ops
+from batch_generator import read_manifest
+from grid_generator import GridGenerator, PatternGridGenerator
+
+
+def test_invalid_manifest_lines_become_failed_jobs(tmp_path):
+    manifest = tmp_path / "specs.jsonl"
+    manifest.write_text('{"dim": 6, "occupancy": 0.3, "seed": 1}\n'
+                        'not json\n'
+                        '\n'
+                        '[6, 6]\n'
+                        '{"dim": []}\n'
+                        '{"dim": "six"}\n'
+                        '{"dim": [6, 7], "algorithm": "basic", "timeout": "2"}\n'
+                        '{"algorithm": "nope"}\n')
+    args = argparse.Namespace(dim=[20, 20], algorithm="pattern", n_loops=1, timeout=10, target_occ=1.0, seed=100)
+
+    jobs = list(read_manifest(str(manifest), args))
+    assert [job[0] for job in jobs] == list(range(7))
+    assert jobs[0] == (0, PatternGridGenerator, [6, 6], 1, 10.0, 0.3, 1)
+    assert jobs[5] == (5, GridGenerator, [6, 7], 1, 2.0, 1.0, 105)
+    for job in jobs[1:5]:
+        assert job[1] is None and job[-1].startswith("invalid manifest line")
+
+    for job in jobs[1:5] + jobs[6:]:
+        result = parallel_ops._run_batch_job(*job)
+        assert result["index"] == job[0] and result["error"].startswith("ValueError")
+        assert "grid" not in result
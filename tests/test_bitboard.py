@@ -0,0 +1,58 @@
+import random
+
+import basic_ops
+from grid import BitboardGrid, Grid
+
+
+def random_grids(rng, height, width, letters="ABC"):
+    """Remplit et efface au hasard les mêmes cases d'une grille ordinaire et d'une grille à masques de bits."""
+    grid, bitboard = Grid([height, width]), BitboardGrid([height, width])
+    for _ in range(rng.randint(0, height * width)):
+        line, column = rng.randrange(height), rng.randrange(width)
+        if rng.random() < 0.2:
+            grid.clear(line, column)
+            bitboard.clear(line, column)
+        else:
+            letter = rng.choice(letters)
+            grid.set(line, column, letter)
+            bitboard.set(line, column, letter)
+    if rng.random() < 0.3:
+        snapshot = bitboard.snapshot()
+        bitboard.clear_all()
+        bitboard.restore(snapshot)
+    return grid, bitboard
+
+
+def random_possibility(rng, grid, letters="ABC", fit=False):
+    """Tire un mot dans la grille ; avec fit, il reprend les lettres déjà présentes sur son emprise."""
+    while True:
+        direction, length = rng.choice("ES"), rng.randint(1, 8)
+        line, column = rng.randrange(grid.height), rng.randrange(grid.width)
+        if basic_ops.is_within_bounds(length, line, column, direction, grid.width, grid.height):
+            break
+    word = ""
+    for k in range(length):
+        cell = grid.cell(line, column + k) if direction == "E" else grid.cell(line + k, column)
+        word += cell if fit and cell else rng.choice(letters)
+    return {"word": word, "location": [line, column], "D": direction}
+
+
+def test_bitboard_checks_match_cell_checks():
+    rng = random.Random(1)
+    for _ in range(200):
+        grid, bitboard = random_grids(rng, rng.randint(3, 25), rng.randint(3, 25))
+        for _ in range(100):
+            possibility = random_possibility(rng, grid, fit=rng.random() < 0.5)
+            word, (line, column), direction = possibility["word"], possibility["location"], possibility["D"]
+            for check in (lambda g: basic_ops.collides_with_existing_words(word, line, column, direction, g),
+                          lambda g: basic_ops.ends_are_isolated(word, line, column, direction, g),
+                          lambda g: basic_ops.is_isolated(possibility, g),
+                          lambda g: basic_ops.is_valid(possibility, g, None)):
+                assert check(bitboard) == check(grid), possibility
+
+
+def test_bitboard_bounds_rejection():
+    bitboard = BitboardGrid([5, 5])
+    assert not basic_ops.is_valid({"word": "ABCDEF", "location": [0, 0], "D": "E"}, bitboard, None)
+    assert not basic_ops.is_valid({"word": "AB", "location": [4, 4], "D": "S"}, bitboard, None)
+    assert basic_ops.is_valid({"word": "ABCDE", "location": [4, 0], "D": "E"}, bitboard, None)
@@ -0,0 +1,110 @@
+import random
+import time
+
+import pytest
+
+import basic_ops
+import instrumentation
+from backtracking_generator import BacktrackingGenerator
+from conftest import assert_valid_grid
+from grid_generator import GridGenerator, PatternGridGenerator
+from grid_template import GridTemplate
+from template_generator import TemplateGridGenerator
+from tiled_generator import TiledGridGenerator
+from word_index import WordIndex
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+@pytest.mark.parametrize("grid_options", [{}, {"compact_grid": True}, {"bitboard_grid": True}])
+def test_basic_fill_lists_whole_runs(words, seed, grid_options):
+    generator = GridGenerator(words, [12, 12], 2, 0.4, 0.9, rng=random.Random(seed), **grid_options)
+    generator.generate_grid()
+    assert generator.words_in_grid
+    assert_valid_grid(generator.grid, generator.words_in_grid, words)
+
+
+def test_absorbed_word_comes_back_on_removal(words):
+    generator = GridGenerator(words, [12, 12], 1, 0.4, 0.9)
+    short = next(word for word in words if len(word) == 3)
+    longer = next((word for word in words if len(word) == 5 and word.startswith(short)), None)
+    if longer is None:
+        pytest.skip("no word extends a three-letter word in this list")
+
+    first = generator.journal.add({"word": short, "location": [0, 0], "D": "E"})
+    generator.word_list.mark_used(short)
+    second = generator.journal.add({"word": longer, "location": [0, 0], "D": "E"})
+    generator.word_list.mark_used(longer)
+    assert [word["word"] for word in generator.words_in_grid] == [longer]
+    assert short in generator.word_list
+
+    generator.journal.remove(second)
+    generator.word_list.release(longer)
+    assert [word["word"] for word in generator.words_in_grid] == [short]
+    assert short not in generator.word_list
+    assert generator.grid.to_lists()[0][:6] == list(short) + [0, 0, 0]
+    generator.journal.remove(first)
+    assert generator.grid.filled == 0
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_pattern_fill_lists_whole_runs(words, seed):
+    generator = PatternGridGenerator(words, [12, 12], 2, 0.4, 0.9, rng=random.Random(seed))
+    generator.generate_grid()
+    assert generator.words_in_grid
+    assert_valid_grid(generator.grid, generator.words_in_grid, words)
+
+
+def test_pattern_fill_reopens_blocked_areas(words):
+    generator = PatternGridGenerator(words, [12, 12], 1, 0.4, 1.0, rng=random.Random(2))
+    generator.generate_grid()
+    assert instrumentation.counters.get("reopened", 0) > 0
+    assert_valid_grid(generator.grid, generator.words_in_grid, words)
+    assert not [word["word"] for word in generator.words_in_grid if word["word"] in words]
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_backtracking_lists_whole_runs(words, seed):
+    generator = BacktrackingGenerator(words, [10, 10], 1, 0.5, 0.9, rng=random.Random(seed))
+    generator.generate_grid()
+    assert generator.words_in_grid
+    assert_valid_grid(generator.grid, generator.words_in_grid, words)
+    assert not any(word["word"] in generator.word_list for word in generator.words_in_grid)
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_annealing_lists_whole_runs(words, seed):
+    generator = GridGenerator(words, [10, 10], 1, 0.3, 0.9, rng=random.Random(seed), anneal_timeout=0.5)
+    generator.generate_grid()
+    assert generator.anneal_history
+    assert_valid_grid(generator.grid, generator.words_in_grid, words)
+    assert not any(word["word"] in generator.word_list for word in generator.words_in_grid)
+
+
+def test_template_fill_lists_whole_runs(words):
+    # Les mots synthétiques alternent consonnes et voyelles : les croisements tombent sur des positions paires
+    template = GridTemplate.from_rows([".......", ".#.#.#.", ".......", ".#.#.#.", "......."])
+    generator = TemplateGridGenerator(words, None, 1, 1.0, 1.0, template=template, rng=random.Random(1))
+    generator.generate_grid()
+    assert generator.words_in_grid
+    assert_valid_grid(generator.grid, generator.words_in_grid, words)
+    assert not any(template.blocks[line][column] and generator.grid.cell(line, column)
+                   for line in range(template.height) for column in range(template.width))
+
+
+@pytest.mark.parametrize("tile_class", [GridGenerator, BacktrackingGenerator])
+def test_tiled_fill_lists_whole_runs(words, tile_class):
+    generator = TiledGridGenerator(words, [30, 30], 1, 0.5, 0.9, tile_class=tile_class, tile_size=15, jobs=2,
+                                   rng=random.Random(4))
+    generator.generate_grid()
+    assert len(generator.tiles()) == 4
+    assert generator.words_in_grid
+    assert_valid_grid(generator.grid, generator.words_in_grid, words)
+
+
+def test_basic_fill_stops_when_no_word_fits():
+    words = WordIndex(["ABCDEFGHIJKL"])
+    for anchored in (True, False):
+        grid = basic_ops.create_empty_grid([5, 5])
+        start = time.time()
+        assert basic_ops.basic_grid_fill(grid, 1.0, 2.0, [5, 5], words, anchored=anchored) == []
+        assert time.time() - start < 1.0
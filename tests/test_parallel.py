@@ -0,0 +1,36 @@
+import random
+import time
+
+import basic_ops
+import parallel_ops
+
+# Cases remplies et attente de chaque essai, par graine : les essais 11 et 12 sont à égalité
+FILLED = {10: 2, 11: 5, 12: 5, 13: 1}
+DELAYS = {10: 0.0, 11: 0.4, 12: 0.0, 13: 0.0}
+
+
+class FixedGenerator:
+    """Générateur factice dont le résultat ne dépend que de sa graine."""
+
+    def __init__(self, word_list, dimensions, n_loops, timeout, target_occupancy, should_stop=None, rng=None):
+        draw = rng.random()
+        self.seed = next(seed for seed in FILLED if random.Random(seed).random() == draw)
+        self.grid = basic_ops.create_empty_grid(dimensions)
+
+    def generate_grid(self):
+        time.sleep(DELAYS[self.seed])
+        for column in range(FILLED[self.seed]):
+            self.grid.set(0, column, "A")
+
+    def get_grid(self):
+        return self.grid
+
+    def get_words_in_grid(self):
+        return [self.seed]
+
+
+def test_ties_go_to_the_lowest_seed_whatever_the_finishing_order():
+    seed, occupancy, grid, words = parallel_ops.generate_best_grid(FixedGenerator, ["ABC"], [2, 5], 1, 1, 1.0,
+                                                                   len(FILLED), min(FILLED))
+    assert (seed, occupancy, words) == (11, 0.5, [11])
+    assert grid.filled == 5
@@ -0,0 +1,103 @@
+import io
+import json
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+import file_ops
+import render_ops
+
+GRID = [["C", "A", "T"], [0, 0, "O"]]
+WORDS = [{"word": "CAT", "location": [0, 0], "D": "E"}, "TO"]
+
+EXPECTED_TEX = (
+    "\\documentclass[a4paper]{article}\n"
+    "\\usepackage[utf8]{inputenc}\n"
+    "\\usepackage[table]{xcolor}\n"
+    "\\usepackage{multicol}\n"
+    "\\usepackage{fullpage}\n"
+    "\\usepackage{graphicx}\n"
+    "\n"
+    "\\begin{document}\n"
+    "\\section*{Challenge}\n"
+    "\\resizebox{\\textwidth}{!}{\n\\begin{tabular}{|c|c|c|}\n\\hline\n"
+    " &  & \\\\ \\hline\n"
+    "\\cellcolor{black}0 & \\cellcolor{black}0 & \\\\ \\hline\n"
+    "\\end{tabular}\n}\n"
+    "\\section*{Words used for the problem}\n\\begin{multicols}{4}\n\\noindent\n"
+    "TO\\\\\nCAT\\\\\n"
+    "\\end{multicols}\n"
+    "\\newpage\n\\section*{Solution}\n"
+    "\\resizebox{\\textwidth}{!}{\n\\begin{tabular}{|c|c|c|}\n\\hline\n"
+    "C & A & T\\\\ \\hline\n"
+    "\\cellcolor{black}0 & \\cellcolor{black}0 & O\\\\ \\hline\n"
+    "\\end{tabular}\n}\n"
+    "\\end{document}\n"
+)
+
+
+class CountingStream(io.StringIO):
+    """Tampon qui compte ses appels à write()."""
+
+    writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def test_tex_output_matches_the_reference_document(tmp_path):
+    tex_file = tmp_path / "puzzle.tex"
+    file_ops.write_puzzles_to_file([(GRID, WORDS)], str(tex_file), out_pdf=None)
+    assert tex_file.read_text(encoding="utf-8") == EXPECTED_TEX
+
+    render_ops.write_puzzles([(GRID, WORDS), (GRID, WORDS)], str(tex_file), "tex")
+    body = EXPECTED_TEX[len(file_ops.LATEX_PREAMBLE):-len("\\end{document}\n")]
+    assert tex_file.read_text(encoding="utf-8") == \
+        file_ops.LATEX_PREAMBLE + body + "\\newpage\n" + body + "\\end{document}\n"
+
+
+def test_chunks_are_written_in_blocks():
+    grid = [["A"] * 50 for _ in range(200)]
+    chunks = list(file_ops.tex_document_chunks([(grid, ["AAA"])] * 3))
+    for buffer_size in (1, 1000, 1 << 16):
+        out = CountingStream()
+        file_ops.write_chunks(out, iter(chunks), buffer_size)
+        assert out.getvalue() == "".join(chunks)
+        assert out.writes <= len("".join(chunks)) // buffer_size + 1
+    assert out.writes * 100 < len(chunks)
+
+
+def test_text_backend():
+    assert render_ops.puzzle_to_text(GRID, WORDS) == ("Challenge:\n_ _ _\n# # _\n"
+                                                      "\nWords:\nTO\nCAT\n"
+                                                      "\nSolution:\nC A T\n# # O\n")
+
+
+def test_json_backend_round_trips(tmp_path):
+    out_file = tmp_path / "puzzles.jsonl"
+    render_ops.write_puzzles([(GRID, WORDS), ([["É", "T", "É"]], ["ÉTÉ"])], str(out_file), "json")
+    lines = out_file.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [{"grid": GRID, "words": WORDS},
+                                                   {"grid": [["É", "T", "É"]], "words": ["ÉTÉ"]}]
+
+
+def test_svg_backend_draws_both_grids_and_the_words(tmp_path):
+    out_file = tmp_path / "puzzle.svg"
+    grid = [["<", "A", "T"], [0, 0, "&"]]
+    render_ops.write_puzzles([(grid, WORDS), (GRID, WORDS)], str(out_file), "svg")
+    assert not out_file.exists()
+
+    root = ElementTree.parse(tmp_path / "puzzle-0.svg").getroot()
+    namespace = "{http://www.w3.org/2000/svg}"
+    rects = root.findall(namespace + "rect")
+    texts = [text.text for text in root.findall(namespace + "text")]
+    assert len(rects) == 2 * 6
+    assert sum(rect.get("fill") == "black" for rect in rects) == 2 * 2
+    assert texts == ["<", "A", "T", "&", "TO", "CAT"]
+    assert (tmp_path / "puzzle-1.svg").exists()
+
+
+def test_unknown_format_is_refused(tmp_path):
+    with pytest.raises(ValueError):
+        render_ops.write_puzzles([(GRID, WORDS)], str(tmp_path / "out.doc"), "doc")
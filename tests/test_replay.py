@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+import file_ops
+from conftest import assert_valid_grid
+from grid_generator import GridGenerator, PatternGridGenerator
+
+
+@pytest.mark.parametrize("generator_class", [GridGenerator, PatternGridGenerator])
+def test_seeded_runs_are_reproducible(words, generator_class):
+    runs = []
+    for _ in range(2):
+        generator = generator_class(words, [10, 10], 1, 5.0, 0.4, rng=random.Random(7))
+        generator.generate_grid()
+        runs.append(generator.words_in_grid)
+    assert runs[0] == runs[1]
+
+
+@pytest.mark.parametrize("extension", [".jsonl", ".jsonl.gz"])
+def test_replay_log_rebuilds_the_grid(words, tmp_path, extension):
+    generator = GridGenerator(words, [10, 12], 2, 0.3, 0.9, rng=random.Random(3))
+    generator.generate_grid()
+    log_file = str(tmp_path / ("run" + extension))
+    file_ops.write_replay_log(log_file, {"seed": 3, "dimensions": [10, 12]}, generator.words_in_grid)
+
+    header, placements = file_ops.read_replay_log(log_file)
+    assert header["seed"] == 3 and header["dimensions"] == [10, 12]
+    replayed = GridGenerator(words, header["dimensions"], 1, 0.3, 0.9)
+    replayed.replay(placements)
+    assert replayed.grid.to_lists() == generator.grid.to_lists()
+    assert replayed.words_in_grid == generator.words_in_grid
+    assert_valid_grid(replayed.grid, replayed.words_in_grid, words)
+
+
+def test_checkpoints_written_mid_loop_match_the_grid(words, tmp_path):
+    checkpoint_file = str(tmp_path / "run.ckpt.jsonl")
+    generator = GridGenerator(words, [10, 10], 1, 0.5, 0.9, rng=random.Random(5),
+                              checkpoint_file=checkpoint_file, checkpoint_interval=0)
+    mismatches = []
+
+    def check_checkpoint():
+        # stop_requested() vient d'écrire le point de reprise : il doit décrire la grille courante
+        header, placements = file_ops.read_replay_log(checkpoint_file)
+        replayed = GridGenerator(words, [10, 10], 1, 0.5, 0.9)
+        replayed.replay(placements)
+        if replayed.grid.to_lists() != generator.grid.to_lists():
+            mismatches.append(len(placements))
+        used = set(header["checkpoint"]["used"])
+        if not all(possibility["word"] in used for possibility in placements):
+            mismatches.append(len(placements))
+        return False
+
+    generator.should_stop = check_checkpoint
+    generator.generate_grid()
+    assert generator.words_in_grid
+    assert mismatches == []
+
+
+def test_resume_from_checkpoint(words, tmp_path):
+    checkpoint_file = str(tmp_path / "run.ckpt.gz")
+    generator = GridGenerator(words, [10, 10], 2, 0.3, 0.9, rng=random.Random(6), checkpoint_file=checkpoint_file)
+    generator.generate_grid()
+
+    header, placements = file_ops.read_replay_log(checkpoint_file)
+    assert header["checkpoint"]["loops_done"] == generator.loops_done
+    resumed = GridGenerator(words, header["dimensions"], 3, 0.3, 0.9)
+    resumed.restore_checkpoint(header, placements)
+    assert resumed.grid.to_lists() == generator.grid.to_lists()
+    assert sorted(resumed.word_list.used_words()) == sorted(header["checkpoint"]["used"])
+    assert resumed.rng.getstate() == generator.rng.getstate()
+
+    resumed.generate_grid(resume=True)
+    assert resumed.loops_done > generator.loops_done
+    assert_valid_grid(resumed.grid, resumed.words_in_grid, words)
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+import basic_ops
+from run_cache import CrossingRunCache
+
+
+@pytest.mark.parametrize("options", [{}, {"compact": True}, {"bitboard": True}])
+@pytest.mark.parametrize("max_entries", [16, 1 << 16])
+def test_cached_runs_match_the_grid(options, max_entries):
+    rng = random.Random(8)
+    grid = basic_ops.create_empty_grid([9, 11], **options)
+    cache = grid.run_cache = CrossingRunCache(max_entries)
+    snapshots = []
+
+    for step in range(3000):
+        line, column = rng.randrange(grid.height), rng.randrange(grid.width)
+        roll = rng.random()
+        if roll < 0.5:
+            grid.set(line, column, rng.choice("ABC"))
+        elif roll < 0.9:
+            grid.clear(line, column)
+        elif roll < 0.95:
+            snapshots.append(grid.snapshot())
+        elif roll < 0.99 and snapshots:
+            grid.restore(rng.choice(snapshots))
+        else:
+            grid.clear_all()
+
+        for _ in range(10):
+            line, column = rng.randrange(grid.height), rng.randrange(grid.width)
+            if not grid.is_free(line, column):
+                continue
+            for direction in ("E", "S"):
+                prefix, suffix, start = basic_ops.crossing_run(line, column, grid, direction)
+                expected = prefix + "Z" + suffix, [line, start] if direction == "E" else [start, column]
+                assert basic_ops.extract_crossing_word(line, column, "Z", grid, direction) == expected
+
+    assert cache.hits and cache.invalidations
+    assert cache.size <= max_entries
+    assert cache.evictions if max_entries == 16 else not cache.evictions
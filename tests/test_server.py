@@ -0,0 +1,62 @@
+import asyncio
+import json
+import shutil
+import time
+
+from crossword_server import GenerationService, serve_lines
+
+
+def run_requests(word_file, tmp_path, specs, concurrency=1, max_pending=8, request_timeout=1.0):
+    """Soumet des demandes en même temps à un service à un seul processus et rend les réponses et leurs durées."""
+    source = tmp_path / "words.txt"
+    shutil.copy(word_file, source)
+
+    async def main():
+        service = GenerationService({"words": str(source)}, 1, concurrency, max_pending, request_timeout)
+        start = time.time()
+
+        async def timed(spec):
+            response = await service.submit(spec)
+            return response, time.time() - start
+
+        try:
+            return await asyncio.gather(*(timed(spec) for spec in specs))
+        finally:
+            service.close()
+
+    return asyncio.run(main())
+
+
+def test_queued_request_times_out_from_admission(word_file, tmp_path):
+    specs = [{"id": n, "dim": 10, "algorithm": "basic", "occupancy": 1.0, "seed": n} for n in range(2)]
+    (first, first_time), (second, second_time) = run_requests(word_file, tmp_path, specs)
+
+    assert first["id"] == 0 and "grid" in first
+    assert second == {"id": 1, "error": "timeout"}
+    assert second_time < 1.5
+
+
+def test_requests_beyond_the_queue_are_refused(word_file, tmp_path):
+    specs = [{"id": "a", "dim": "six"},
+             {"id": "b", "dim": 6, "occupancy": 0.3, "seed": 1, "request_timeout": 0.5},
+             {"id": "c", "dim": 6}]
+    responses = [response for response, _ in run_requests(word_file, tmp_path, specs, max_pending=1)]
+
+    assert responses[0]["id"] == "a" and responses[0]["error"].startswith("invalid request")
+    assert responses[1]["id"] == "b" and "grid" in responses[1]
+    assert responses[2] == {"id": "c", "error": "busy"}
+
+
+def test_invalid_lines_are_answered_without_a_worker():
+    lines = iter(['not json\n', '[1, 2]\n', '\n', ''])
+    responses = []
+
+    async def read_line():
+        return next(lines)
+
+    async def write_line(line):
+        responses.append(json.loads(line))
+
+    asyncio.run(serve_lines(None, read_line, write_line))
+    assert responses[0]["error"].startswith("invalid JSON") and responses[1] == {"error": "invalid request"}
+    assert len(responses) == 2
@@ -0,0 +1,45 @@
+import bz2
+import gzip
+import lzma
+
+import file_ops
+
+WORDS = ["ÉTAGE", "CAFÉ", "MAISON", "ARBRE", "LOUP", "ZÈBRE"]
+
+
+def write_source(path, words, encoding):
+    """Écrit une liste de mots, compressée selon l'extension du fichier."""
+    opener = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}.get(path.suffix, open)
+    with opener(path, "wb") as source:
+        source.write("".join(word + "\n" for word in words).encode(encoding))
+    return str(path)
+
+
+def test_compressed_and_mixed_encoding_sources_are_merged(tmp_path):
+    sources = [write_source(tmp_path / "a.txt.gz", WORDS[:3], "utf-8"),
+               write_source(tmp_path / "b.txt.bz2", WORDS[2:5], "latin1"),
+               write_source(tmp_path / "c.txt.xz", ["", "  ZÈBRE  ", "ÉTAGE"], "utf-8"),
+               write_source(tmp_path / "d.txt", ["CAFÉ"], "utf-8")]
+    assert list(file_ops.iter_words(sources[1])) == WORDS[2:5]
+    assert list(file_ops.stream_words(sources)) == WORDS
+
+    index = file_ops.read_word_index(sources)
+    assert sorted(index) == sorted(WORDS)
+    cached = file_ops.read_word_index(sources)
+    assert cached.path is not None and sorted(cached) == sorted(WORDS)
+
+
+def test_filters_and_normalization(tmp_path):
+    source = write_source(tmp_path / "words.txt", ["étage", "Café", "maison", "arbre", "aaa", "ab", "lit"], "utf-8")
+    blocklist = write_source(tmp_path / "block.txt.gz", ["ARBRE"], "utf-8")
+
+    assert list(file_ops.stream_words(source, file_ops.word_filters())) == ["étage", "Café", "maison", "arbre", "lit"]
+    assert list(file_ops.stream_words(source, file_ops.word_filters(max_length=4), fold_case=True)) == \
+        ["CAFÉ", "LIT"]
+    assert list(file_ops.stream_words(source, file_ops.word_filters(alphabet="abeilmnorst"),
+                                      strip_accents=True)) == ["maison", "arbre", "lit"]
+
+    options = {"fold_case": True, "strip_accents": True, "blocklist": blocklist}
+    assert sorted(file_ops.read_word_index(source, cache=False, **options)) == ["CAFE", "ETAGE", "LIT", "MAISON"]
+    assert sorted(file_ops.read_word_index(source, max_words=2, fold_case=True)) == ["CAFÉ", "ÉTAGE"]
+    assert sorted(file_ops.read_word_index(source, **options)) == ["CAFE", "ETAGE", "LIT", "MAISON"]
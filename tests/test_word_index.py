@@ -0,0 +1,127 @@
+import pickle
+import random
+import shutil
+
+import pytest
+
+import file_ops
+from word_index import WordIndex, build_alias_table, nth_set_bit, set_bit_positions
+
+
+def test_set_bit_helpers_match_a_bit_scan():
+    rng = random.Random(1)
+    for size in (1, 63, 64, 65, 4095, 4096, 4097, 50000):
+        mask = 0
+        while not mask:
+            mask = rng.getrandbits(size) & rng.getrandbits(size)
+        positions = [position for position in range(mask.bit_length()) if mask >> position & 1]
+        assert list(set_bit_positions(mask)) == positions
+        for n in {0, len(positions) - 1, rng.randrange(len(positions))}:
+            assert nth_set_bit(mask, n) == positions[n]
+    assert list(set_bit_positions(0)) == []
+
+
+def test_random_match_respects_the_pattern():
+    rng = random.Random(2)
+    words = WordIndex("".join(rng.choice("ABCD") for _ in range(6)) for _ in range(3000))
+    pattern = ["A", None, "B", None, None, None]
+    expected = {word for word in words if word[0] == "A" and word[2] == "B"}
+    assert set(words.matches(pattern)) == expected
+    drawn = {words.random_match(pattern, rng) for _ in range(500)}
+    assert drawn <= expected and len(drawn) > len(expected) // 2
+
+
+def test_used_words_follow_marks_and_releases():
+    rng = random.Random(3)
+    vocabulary = sorted({"".join(rng.choice("ABCDE") for _ in range(rng.randint(2, 6))) for _ in range(5000)})
+    words = WordIndex(vocabulary)
+    used = set()
+    for step in range(3000):
+        word = rng.choice(vocabulary)
+        if rng.random() < 0.6:
+            words.mark_used(word)
+            used.add(word)
+        else:
+            words.release(word)
+            used.discard(word)
+        if step % 300 == 0:
+            assert set(words) == set(vocabulary) - used
+            assert len(words) == len(vocabulary) - len(used)
+            assert set(words.used_words()) == used
+            assert words.random_word(rng=rng) not in used
+            assert not set(words.matches([None, "A", None])) & used
+
+    words.set_weights(len)
+    assert set(words.used_words()) == used
+    assert set(pickle.loads(pickle.dumps(words)).used_words()) == used
+
+
+def test_compiled_index_matches_source(word_file, tmp_path):
+    source = tmp_path / "words.txt"
+    shutil.copy(word_file, source)
+    built = file_ops.read_word_index(str(source))
+    assert (tmp_path / "words.idx").exists()
+    compiled = file_ops.read_word_index(str(source))
+    assert compiled.path is not None
+
+    assert list(compiled) == list(built)
+    assert compiled.lengths() == built.lengths()
+    for pattern in ("B?D", "?A?A?", ["K", None, {"B", "D"}, None]):
+        assert compiled.matches(pattern) == built.matches(pattern)
+    word = next(iter(built))
+    assert compiled.is_known(word) and not compiled.is_known(word + "Q")
+    compiled.mark_used(word)
+    assert word not in compiled and compiled.is_known(word)
+    compiled.release(word)
+    assert word in compiled
+
+
+def test_alias_table_gives_each_word_its_weight():
+    rng = random.Random(4)
+    weights = [rng.choice((0.1, 1.0, 7.5)) * rng.random() + 1e-3 for _ in range(500)]
+    probabilities, aliases = build_alias_table(weights)
+    implied = list(probabilities)
+    for ordinal, alias in enumerate(aliases):
+        implied[alias] += 1.0 - probabilities[ordinal]
+    total = sum(weights)
+    assert all(abs(share / len(weights) - weight / total) < 1e-9 for share, weight in zip(implied, weights))
+
+
+@pytest.mark.parametrize("n_words", [20, 2000])
+def test_weighted_draws_follow_the_weights(n_words):
+    rng = random.Random(5)
+    vocabulary = sorted({"".join(rng.choice("ABCDEFGH") for _ in range(5)) for _ in range(3 * n_words)})[:n_words]
+    heavy = set(vocabulary[::4])
+    words = WordIndex(vocabulary)
+    words.set_weights(lambda word: 9.0 if word in heavy else 1.0)
+    expected = 9 * len(heavy) / (9 * len(heavy) + len(vocabulary) - len(heavy))
+
+    draws = [words.random_match([None] * 5, rng) for _ in range(20000)]
+    assert abs(sum(word in heavy for word in draws) / len(draws) - expected) < 0.02
+    draws = [words.random_word(rng=rng) for _ in range(20000)]
+    assert abs(sum(word in heavy for word in draws) / len(draws) - expected) < 0.02
+
+    for word in heavy:
+        words.mark_used(word)
+    assert not {words.random_word(rng=rng) for _ in range(2000)} & heavy
+    assert not {words.random_match([None] * 5, rng) for _ in range(2000)} & heavy
+
+
+def test_weighted_lengths_share_the_draws():
+    words = WordIndex(["ABC", "ABD", "ABCDE", "ABCDF"])
+    words.set_weights(lambda word: 3.0 if len(word) == 5 else 1.0)
+    rng = random.Random(6)
+    assert abs(sum(len(words.random_word(rng=rng)) == 5 for _ in range(20000)) / 20000 - 0.75) < 0.02
+
+    words.mark_used("ABCDE")
+    words.mark_used("ABCDF")
+    assert {words.random_word(rng=rng) for _ in range(200)} == {"ABC", "ABD"}
+    assert words.random_word(min_length=4, rng=rng) is None
+    with pytest.raises(ValueError):
+        words.set_weights(lambda word: 0.0)
+
+
+def test_word_weights_file(tmp_path):
+    weights_file = tmp_path / "freq.txt"
+    weights_file.write_text("chat 12\nchien\t3.5\nchat 20\nloup x\nours 0\n\nété 2\n", encoding="utf-8")
+    assert file_ops.read_word_weights(str(weights_file), fold_case=True) == {"CHAT": 20.0, "CHIEN": 3.5, "ÉTÉ": 2.0}
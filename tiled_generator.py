@@ -0,0 +1,160 @@
+import functools
+import os
+import time
+
+import basic_ops
+import instrumentation
+import parallel_ops
+from grid_generator import GridGenerator
+
+
+class TiledGridGenerator(GridGenerator):
+    """Générateur pour très grandes grilles, remplies tuile par tuile.
+
+    La grille est découpée en tuiles d'environ tile_size cases de côté,
+    séparées par une ligne ou une colonne laissée vide. Chaque tuile est
+    remplie dans un processus de travail par le générateur de son choix, à
+    partir des mots qu'elle contient déjà. Les mots des tuiles sont ensuite
+    recopiés dans la grille avec les règles de validité habituelles : un mot
+    déjà utilisé ailleurs, ou qui ne tient plus à côté des mots voisins, est
+    écarté. Enfin, des fenêtres qui chevauchent chaque séparation sont
+    remplies à leur tour par l'algorithme de base, pour relier les tuiles.
+
+    Chaque étape ne lit qu'une tuile ou une fenêtre : le temps de génération
+    croît à peu près comme la surface de la grille divisée par le nombre de
+    processus.
+    """
+
+    # Côté, en cases, des tuiles remplies en parallèle
+    tile_size = 20
+    # Demi-largeur, en cases, des fenêtres remplies de part et d'autre de chaque séparation
+    seam_width = 3
+    # Temps maximum, en secondes, passé à remplir chaque fenêtre
+    seam_timeout = 0.25
+
+    def __init__(self, word_list, dimensions, n_loops, timeout, target_occupancy, should_stop=None,
+                 tile_class=GridGenerator, tile_size=None, jobs=None, **kwargs):
+        """Crée le générateur.
+
+        Args:
+            tile_class (type): Classe du générateur de chaque tuile.
+            tile_size (int): Côté des tuiles. Par défaut, tile_size.
+            jobs (int): Nombre de processus qui remplissent les tuiles. Par
+                défaut, le nombre de processeurs.
+        """
+        super().__init__(word_list, dimensions, n_loops, timeout, target_occupancy, should_stop, **kwargs)
+        self.tile_class = tile_class
+        self.tile_size = max(4, tile_size or self.tile_size)
+        self.jobs = jobs or os.cpu_count()
+
+    def tile_bounds(self, size):
+        """Découpe une dimension en tuiles.
+
+        Returns:
+            list: Intervalles [début, fin) des tuiles ; la dernière case de
+            chaque tuile, sauf la dernière, est la séparation avec la suivante.
+        """
+        starts = list(range(0, size, self.tile_size))
+        # Une dernière tuile trop petite est rattachée à la précédente
+        if len(starts) > 1 and size - starts[-1] < self.tile_size // 2:
+            starts.pop()
+        return [(start, end) for start, end in zip(starts, starts[1:] + [size])]
+
+    def tiles(self):
+        """Retourne les tuiles de la grille, sous forme (première ligne, première colonne, hauteur, largeur).
+
+        La hauteur et la largeur excluent la séparation avec la tuile suivante.
+        """
+        rows, columns = self.tile_bounds(self.grid.height), self.tile_bounds(self.grid.width)
+        return [(top, left, bottom - top - (bottom < self.grid.height), right - left - (right < self.grid.width))
+                for top, bottom in rows for left, right in columns]
+
+    def seam_windows(self):
+        """Retourne les fenêtres (lignes [début, fin), colonnes [début, fin)) qui chevauchent les séparations."""
+        rows, columns = self.tile_bounds(self.grid.height), self.tile_bounds(self.grid.width)
+        windows = []
+        for _, bottom in rows[:-1]:
+            for left, right in columns:
+                windows.append((bottom - 1 - self.seam_width, bottom + self.seam_width, left, right))
+        for top, bottom in rows:
+            for _, right in columns[:-1]:
+                windows.append((top, bottom, right - 1 - self.seam_width, right + self.seam_width))
+        return windows
+
+    def generate_content_for_grid(self):
+        """Remplit les tuiles en parallèle, les recopie dans la grille puis remplit les séparations."""
+        tiles = self.tiles()
+        placements = self.journal.words()
+        tile_contents = []
+        for top, left, height, width in tiles:
+            # Mots entièrement contenus dans la tuile, en coordonnées de la tuile
+            inside = []
+            for possibility in placements:
+                line, column = possibility["location"]
+                end_line, end_column = (line, column + len(possibility["word"]) - 1) if possibility["D"] == "E" \
+                    else (line + len(possibility["word"]) - 1, column)
+                if top <= line and end_line < top + height and left <= column and end_column < left + width:
+                    inside.append(dict(possibility, location=[line - top, column - left]))
+            tile_contents.append(([height, width], inside))
+
+        tile_class = functools.partial(self.tile_class, compact_grid=self.compact_grid,
+                                       bitboard_grid=self.bitboard_grid, run_cache=self.run_cache,
+                                       anchored_sampling=self.anchored_sampling,
+                                       candidate_batch=self.candidate_batch)
+        seeds = [self.rng.randrange(2 ** 32) for _ in tiles]
+        start_time = time.time()
+        results = parallel_ops.fill_tiles(tile_class, self.word_list, tile_contents, 1, self.timeout,
+                                          self.target_occupancy, seeds, self.word_list.used_words(),
+                                          min(self.jobs, len(tiles)))
+        instrumentation.emit("tiles_filled", n_tiles=len(tiles), elapsed=time.time() - start_time)
+
+        placed = {placement_key(possibility) for possibility in self.journal.words()}
+        for (top, left, _, _), new_words in zip(tiles, results):
+            for possibility in new_words:
+                line, column = possibility["location"]
+                self.stitch(dict(possibility, location=[top + line, left + column]), placed)
+
+        # Remplissage des fenêtres qui chevauchent les séparations, pour relier les tuiles
+        for window in self.seam_windows():
+            if self.stop_requested():
+                break
+            basic_ops.basic_grid_fill(self.grid, 1.0, self.seam_timeout, self.dimensions, self.word_list,
+                                      self.stop_requested, True, self.rng, self.candidate_batch, window,
+                                      self.journal.record)
+
+    def stitch(self, possibility, placed):
+        """Recopie un mot d'une tuile dans la grille s'il y est encore valide.
+
+        Args:
+            possibility (dict): Le mot, en coordonnées de la grille.
+            placed (set): Placements déjà présents dans la grille (voir
+                placement_key), complété au fil des mots recopiés.
+
+        Returns:
+            bool: True si le mot est présent dans la grille, False s'il a été écarté.
+        """
+        if placement_key(possibility) in placed:
+            return True
+        word = possibility["word"]
+        line, column = possibility["location"]
+        new_words = None
+        if word in self.word_list and basic_ops.is_valid(possibility, self.grid, self.word_list):
+            new_words = basic_ops.find_new_words(word, line, column, possibility["D"], self.grid, self.word_list)
+        if new_words is None:
+            instrumentation.count("tiles.rejected")
+            return False
+
+        self.journal.add(possibility)
+        self.word_list.mark_used(word)
+        placed.add(placement_key(possibility))
+        for new_word in new_words:
+            self.journal.record(new_word)
+            self.word_list.mark_used(new_word["word"])
+            placed.add(placement_key(new_word))
+        instrumentation.count("tiles.stitched")
+        return True
+
+
+def placement_key(possibility):
+    """Clé hachable d'un placement : direction, ligne, colonne et mot."""
+    return possibility["D"], *possibility["location"], possibility["word"]
@@ -0,0 +1,661 @@
+import array
+import bisect
+import json
+import mmap
+import random
+import struct
+
+# En-tête des dictionnaires compilés : signature, puis taille de l'en-tête JSON
+COMPILED_MAGIC = b"CWIDX\x00\x02\x00"
+COMPILED_HEADER = struct.Struct("<8sI")
+
+# Tirages pondérés : essais par la table d'alias avant un tirage direct parmi les mots d'un masque
+ALIAS_ATTEMPTS = 32
+# Nombre de mots en dessous duquel un masque est tiré directement, sans table d'alias
+DIRECT_DRAW_LIMIT = 64
+# Taille, en octets, des blocs de masque dont les bits à 1 sont comptés d'un coup (voir nth_set_bit)
+SCAN_BLOCK_BYTES = 512
+
+
+class PackedWords:
+    """Mots d'une même longueur, triés et stockés bout à bout dans un tampon.
+
+    Chaque mot occupe le même nombre d'octets, ce qui permet d'accéder au
+    i-ème mot et de retrouver la position d'un mot par dichotomie directement
+    dans le tampon (typiquement un fichier projeté en mémoire), sans jamais
+    construire de liste ni de dictionnaire Python.
+    """
+
+    def __init__(self, buffer, offset, count, width, encoding):
+        """Décrit une suite de mots dans un tampon.
+
+        Args:
+            buffer (mmap.mmap | bytes): Tampon contenant les mots.
+            offset (int): Position du premier mot dans le tampon.
+            count (int): Nombre de mots.
+            width (int): Nombre d'octets par mot.
+            encoding (str): Encodage des mots, à largeur fixe.
+        """
+        self.buffer = buffer
+        self.offset = offset
+        self.count = count
+        self.width = width
+        self.encoding = encoding
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, ordinal):
+        if not 0 <= ordinal < self.count:
+            raise IndexError(ordinal)
+        start = self.offset + ordinal * self.width
+        return self.buffer[start:start + self.width].decode(self.encoding)
+
+    def __iter__(self):
+        return (self[ordinal] for ordinal in range(self.count))
+
+    def _key(self, ordinal):
+        start = self.offset + ordinal * self.width
+        return self.buffer[start:start + self.width]
+
+    def find(self, word):
+        """Retourne la position d'un mot, ou None s'il est absent."""
+        try:
+            key = word.encode(self.encoding)
+        except UnicodeEncodeError:
+            return None
+        if len(key) != self.width:
+            return None
+
+        ordinal = bisect.bisect_left(range(self.count), key, key=self._key)
+        if ordinal < self.count and self._key(ordinal) == key:
+            return ordinal
+        return None
+
+
+class WordIndex:
+    """Dictionnaire de mots regroupé par longueur.
+
+    Remplace la simple liste de mots : l'appartenance et le marquage d'un mot
+    comme utilisé se font en O(1), sans modifier la liste fournie par
+    l'appelant, et les tirages aléatoires peuvent se limiter aux mots qui
+    tiennent dans l'espace restant.
+
+    Les mots de chaque longueur ont un ordre fixe ; les mots utilisés sont
+    retenus dans un tableau de bits par longueur, lu et modifié en O(1). Le
+    masque des mots disponibles qu'en tirent les recherches est gardé en
+    cache et reconstruit une seule fois après une série de marquages. Un
+    index positionnel (un masque de bits par triplet longueur, position,
+    lettre) permet en outre de trouver directement les mots qui respectent
+    un motif comme "A??E?".
+
+    L'index peut être enregistré dans un fichier compilé (voir save()) puis
+    rouvert par projection en mémoire (voir load()) : les mots et les masques
+    sont alors lus à la demande dans le fichier, sans rien reconstruire.
+
+    Les tirages sont uniformes, ou pondérés par mot après set_weights() :
+    une table d'alias par longueur donne alors chaque tirage en O(1).
+    """
+
+    def __init__(self, words):
+        """Construit l'index à partir d'un itérable de mots.
+
+        Args:
+            words (iterable): Mots à indexer. Les doublons sont ignorés.
+        """
+        # Ordre fixe des mots de chaque longueur, utilisé par les masques de bits
+        self._by_length = {}
+        self._ordinals = {}
+        for word in dict.fromkeys(words):
+            fixed = self._by_length.setdefault(len(word), [])
+            self._ordinals[word] = len(fixed)
+            fixed.append(word)
+
+        self._letter_masks = {}
+        self._compiled = None
+        self._weights = None
+        self.path = None
+        self.alphabet = frozenset(letter for word in self._ordinals for letter in word)
+        self.reset()
+
+    def reset(self):
+        """Rend de nouveau disponibles tous les mots marqués comme utilisés."""
+        self._lengths = sorted(self._by_length)
+        # Un bit par mot, dans l'ordre fixe de sa longueur
+        self._used_bits = {length: bytearray((len(self._by_length[length]) + 7) // 8) for length in self._lengths}
+        # Masques des mots disponibles, par longueur, effacés à chaque marquage
+        self._available_masks = {}
+        self._used_counts = dict.fromkeys(self._lengths, 0)
+        self._used_weights = dict.fromkeys(self._lengths, 0.0)
+        self._n_used = 0
+
+    def _ordinal(self, word):
+        """Position d'un mot dans l'ordre fixe de sa longueur, ou None s'il est inconnu."""
+        if word in self._ordinals:
+            return self._ordinals[word]
+        if self._compiled is None:
+            return None
+
+        # Index compilé : recherche par dichotomie, retenue pour les requêtes suivantes
+        fixed = self._by_length.get(len(word))
+        ordinal = self._ordinals[word] = fixed.find(word) if fixed is not None else None
+        return ordinal
+
+    def _is_used(self, word, ordinal):
+        return self._used_bits[len(word)][ordinal >> 3] >> (ordinal & 7) & 1
+
+    def _available_mask(self, length):
+        """Masque de bits des mots disponibles d'une longueur, reconstruit s'il a changé depuis la dernière fois."""
+        mask = self._available_masks.get(length)
+        if mask is None:
+            full = (1 << len(self._by_length[length])) - 1
+            mask = self._available_masks[length] = full & ~int.from_bytes(self._used_bits[length], "little")
+        return mask
+
+    def __contains__(self, word):
+        ordinal = self._ordinal(word)
+        return ordinal is not None and not self._is_used(word, ordinal)
+
+    def __len__(self):
+        return sum(len(fixed) for fixed in self._by_length.values()) - self._n_used
+
+    def __iter__(self):
+        for length in self._lengths:
+            fixed = self._by_length[length]
+            for ordinal in set_bit_positions(self._available_mask(length)):
+                yield fixed[ordinal]
+
+    def __reduce__(self):
+        # Un index compilé est rouvert depuis son fichier plutôt que copié ; seuls ses poids voyagent
+        if self.path is not None:
+            return (type(self)._reopen, (self.path, self._weights))
+        return super().__reduce__()
+
+    @classmethod
+    def _reopen(cls, path, weights):
+        index = cls.load(path)
+        if weights is not None:
+            index._set_weight_arrays(weights)
+        return index
+
+    def lengths(self):
+        """Retourne la liste triée des longueurs de mots présentes dans l'index."""
+        return self._lengths
+
+    def is_known(self, word):
+        """Indique si le mot fait partie du dictionnaire, qu'il soit utilisé ou non."""
+        return self._ordinal(word) is not None
+
+    def mark_used(self, word):
+        """Retire un mot des mots disponibles en O(1).
+
+        Marquer un mot inconnu ou déjà utilisé est sans effet.
+
+        Args:
+            word (str): Le mot à marquer.
+        """
+        ordinal = self._ordinal(word)
+        if ordinal is None or self._is_used(word, ordinal):
+            return
+
+        self._used_bits[len(word)][ordinal >> 3] |= 1 << (ordinal & 7)
+        self._available_masks.pop(len(word), None)
+        self._used_counts[len(word)] += 1
+        self._n_used += 1
+        if self._weights is not None:
+            self._used_weights[len(word)] += self._weights[len(word)][ordinal]
+
+    def release(self, word):
+        """Rend de nouveau disponible un mot marqué comme utilisé, en O(1).
+
+        Args:
+            word (str): Le mot à libérer. Un mot inconnu ou déjà disponible est ignoré.
+        """
+        ordinal = self._ordinal(word)
+        if ordinal is None or not self._is_used(word, ordinal):
+            return
+
+        self._used_bits[len(word)][ordinal >> 3] &= ~(1 << (ordinal & 7))
+        self._available_masks.pop(len(word), None)
+        self._used_counts[len(word)] -= 1
+        self._n_used -= 1
+        if self._weights is not None:
+            self._used_weights[len(word)] -= self._weights[len(word)][ordinal]
+
+    def used_words(self):
+        """Retourne la liste des mots marqués comme utilisés, par longueur puis dans l'ordre fixe."""
+        used = []
+        for length in self._lengths:
+            fixed = self._by_length[length]
+            used_mask = int.from_bytes(self._used_bits[length], "little")
+            used.extend(fixed[ordinal] for ordinal in set_bit_positions(used_mask))
+        return used
+
+    def _available(self, length):
+        """Nombre de mots disponibles d'une longueur."""
+        return len(self._by_length[length]) - self._used_counts[length]
+
+    def count(self, max_length=None):
+        """Compte les mots disponibles de longueur au plus max_length.
+
+        Args:
+            max_length (int): Longueur maximale, ou None pour tous les mots.
+
+        Returns:
+            int: Nombre de mots disponibles.
+        """
+        if max_length is None:
+            return len(self)
+        return sum(self._available(length) for length in self._lengths if length <= max_length)
+
+    def set_weights(self, weight):
+        """Pondère les tirages de mots, par exemple selon leur fréquence, leur thème ou leur longueur.
+
+        Chaque mot est ensuite tiré avec une probabilité proportionnelle à
+        son poids parmi les mots candidats, au lieu d'uniformément.
+
+        Args:
+            weight (callable): Fonction qui associe à un mot son poids, un
+                nombre strictement positif ; None rétablit les tirages uniformes.
+
+        Raises:
+            ValueError: Si un poids n'est pas strictement positif.
+        """
+        if weight is None:
+            self._weights = self._aliases = None
+            return
+
+        weights = {}
+        for length in self._lengths:
+            weights[length] = array.array("d", map(weight, self._by_length[length]))
+            if min(weights[length]) <= 0:
+                raise ValueError("Word weights must be strictly positive.")
+        self._set_weight_arrays(weights)
+
+    def _set_weight_arrays(self, weights):
+        """Installe les poids des mots, par longueur et dans l'ordre fixe, et construit leurs tables d'alias."""
+        self._weights = weights
+        self._weight_totals = {length: sum(weights[length]) for length in self._lengths}
+        self._aliases = {length: build_alias_table(weights[length]) for length in self._lengths}
+        used = self.used_words()
+        self.reset()
+        for word in used:
+            self.mark_used(word)
+
+    def random_word(self, max_length=None, min_length=None, rng=random):
+        """Tire un mot disponible dont la longueur est comprise entre min_length et max_length.
+
+        Le tirage est uniforme, ou proportionnel au poids des mots après set_weights().
+
+        Args:
+            max_length (int): Longueur maximale du mot, ou None pour aucune limite.
+            min_length (int): Longueur minimale du mot, ou None pour aucune limite.
+            rng (random.Random): Générateur aléatoire. Par défaut, celui du module random.
+
+        Returns:
+            str: Le mot tiré, ou None si aucun mot disponible ne convient.
+        """
+        lengths = [length for length in self._lengths
+                   if (max_length is None or length <= max_length) and (min_length is None or length >= min_length)]
+        if self._weights is None:
+            shares = [self._available(length) for length in lengths]
+            total = sum(shares)
+            index = rng.randrange(total) if total else None
+        else:
+            shares = [self._weight_totals[length] - self._used_weights[length] if self._available(length) else 0
+                      for length in lengths]
+            total = sum(shares)
+            index = rng.random() * total if total > 0 else None
+        if index is None:
+            return None
+
+        for length, share in zip(lengths, shares):
+            if index < share:
+                return self._draw(length, self._available_mask(length), self._available(length), rng)
+            index -= share
+
+        # Arrondi des poids flottants : le dernier groupe non vide est retenu
+        length = next(length for length, share in zip(reversed(lengths), reversed(shares)) if share)
+        return self._draw(length, self._available_mask(length), self._available(length), rng)
+
+    def _masks_for_length(self, length):
+        """Construit (une seule fois) les masques positionnels d'une longueur.
+
+        Args:
+            length (int): Longueur des mots.
+
+        Returns:
+            list: Pour chaque position, un dictionnaire lettre -> masque de bits.
+        """
+        masks = self._letter_masks.get(length)
+        if masks is not None:
+            return masks
+
+        if self._compiled is not None:
+            buffer, header = self._compiled
+            size = (len(self._by_length[length]) + 7) // 8
+            masks = [{letter: int.from_bytes(buffer[offset:offset + size], "little")
+                      for letter, offset in position.items()}
+                     for position in header["lengths"][str(length)]["masks"]]
+            self._letter_masks[length] = masks
+            return masks
+
+        fixed = self._by_length.get(length, [])
+        bitmaps = [{} for _ in range(length)]
+        for ordinal, word in enumerate(fixed):
+            byte, bit = ordinal >> 3, 1 << (ordinal & 7)
+            for position, letter in enumerate(word):
+                bitmap = bitmaps[position].get(letter)
+                if bitmap is None:
+                    bitmap = bitmaps[position][letter] = bytearray((len(fixed) + 7) // 8)
+                bitmap[byte] |= bit
+
+        masks = [{letter: int.from_bytes(bitmap, "little") for letter, bitmap in position.items()}
+                 for position in bitmaps]
+        self._letter_masks[length] = masks
+        return masks
+
+    def match(self, pattern):
+        """Calcule le masque des mots disponibles qui respectent un motif.
+
+        Args:
+            pattern (str | list): Motif comme "A??E?", ou liste de contraintes
+                par position : une lettre, None (toute lettre) ou un ensemble
+                de lettres autorisées.
+
+        Returns:
+            int: Masque de bits des mots correspondants, dans l'ordre fixe de
+            leur longueur.
+        """
+        length = len(pattern)
+        if length not in self._by_length:
+            return 0
+
+        masks = self._masks_for_length(length)
+        result = self._available_mask(length)
+
+        for position, constraint in enumerate(pattern):
+            if constraint is None or constraint == "?":
+                continue
+            if isinstance(constraint, str):
+                result &= masks[position].get(constraint, 0)
+            else:
+                allowed = 0
+                for letter in constraint:
+                    allowed |= masks[position].get(letter, 0)
+                result &= allowed
+            if not result:
+                return 0
+
+        return result
+
+    def matches(self, pattern, limit=None):
+        """Retourne les mots disponibles qui respectent un motif.
+
+        Args:
+            pattern (str | list): Motif, voir match().
+            limit (int): Nombre maximum de mots retournés, ou None.
+
+        Returns:
+            list: Les mots correspondants.
+        """
+        mask = self.match(pattern)
+        fixed = self._by_length.get(len(pattern), [])
+        found = []
+
+        for ordinal in set_bit_positions(mask):
+            if limit is not None and len(found) >= limit:
+                break
+            found.append(fixed[ordinal])
+
+        return found
+
+    def random_match(self, pattern, rng=random):
+        """Tire un mot disponible qui respecte un motif, uniformément ou selon les poids des mots.
+
+        Args:
+            pattern (str | list): Motif, voir match().
+            rng (random.Random): Générateur aléatoire. Par défaut, celui du module random.
+
+        Returns:
+            str: Le mot tiré, ou None si aucun mot ne correspond.
+        """
+        mask = self.match(pattern)
+        if not mask:
+            return None
+        return self._draw(len(pattern), mask, mask.bit_count(), rng)
+
+    def _draw(self, length, mask, count, rng=random):
+        """Tire un mot parmi ceux d'un masque non vide, uniformément ou selon les poids des mots.
+
+        Args:
+            length (int): Longueur des mots du masque.
+            mask (int): Masque de bits des mots candidats.
+            count (int): Nombre de bits à 1 du masque.
+            rng (random.Random): Générateur aléatoire.
+
+        Returns:
+            str: Le mot tiré.
+        """
+        fixed = self._by_length[length]
+
+        if self._weights is not None:
+            # Table d'alias sur tous les mots de la longueur, en rejetant ceux hors du masque
+            if count > DIRECT_DRAW_LIMIT:
+                probabilities, aliases = self._aliases[length]
+                for _ in range(ALIAS_ATTEMPTS):
+                    ordinal = rng.randrange(len(fixed))
+                    if rng.random() >= probabilities[ordinal]:
+                        ordinal = aliases[ordinal]
+                    if mask >> ordinal & 1:
+                        return fixed[ordinal]
+
+            # Peu de mots, ou de faible poids : tirage direct parmi les mots du masque
+            ordinals = list(set_bit_positions(mask))
+            weights = self._weights[length]
+            return fixed[rng.choices(ordinals, [weights[ordinal] for ordinal in ordinals])[0]]
+
+        # Masque dense : tirage par rejet sur l'ordre fixe
+        if 4 * count >= len(fixed):
+            while True:
+                ordinal = rng.randrange(len(fixed))
+                if mask >> ordinal & 1:
+                    return fixed[ordinal]
+
+        return fixed[nth_set_bit(mask, rng.randrange(count))]
+
+    def save(self, out_file, metadata=None):
+        """Enregistre l'index dans un fichier compilé, relu par load().
+
+        Le fichier contient un en-tête JSON (métadonnées, alphabet, et pour
+        chaque longueur la position des mots et des masques positionnels),
+        puis les mots de chaque longueur triés bout à bout, puis les masques.
+
+        Args:
+            out_file (file): Fichier binaire ouvert en écriture.
+            metadata (dict): Informations libres conservées dans l'en-tête.
+        """
+        alphabet = "".join(sorted(self.alphabet))
+        encoding = "latin1" if all(ord(letter) < 256 for letter in alphabet) else "utf-32-be"
+        width = 1 if encoding == "latin1" else 4
+
+        # Les mots de chaque longueur sont triés, pour la recherche par dichotomie
+        sorted_index = WordIndex(word for length in self._lengths for word in sorted(self._by_length[length]))
+        chunks = []
+        lengths = {}
+        offset = 0
+        for length in self._lengths:
+            fixed = sorted_index._by_length[length]
+            chunks.append("".join(fixed).encode(encoding))
+            lengths[str(length)] = {"count": len(fixed), "words": offset, "masks": []}
+            offset += len(chunks[-1])
+
+        for length in self._lengths:
+            size = (lengths[str(length)]["count"] + 7) // 8
+            for masks in sorted_index._masks_for_length(length):
+                position = {}
+                for letter, mask in sorted(masks.items()):
+                    chunks.append(mask.to_bytes(size, "little"))
+                    position[letter] = offset
+                    offset += size
+                lengths[str(length)]["masks"].append(position)
+
+        header = json.dumps({"metadata": metadata or {}, "alphabet": alphabet, "encoding": encoding,
+                             "width": width, "lengths": lengths}).encode("utf-8")
+        out_file.write(COMPILED_HEADER.pack(COMPILED_MAGIC, len(header)))
+        out_file.write(header)
+        for chunk in chunks:
+            out_file.write(chunk)
+
+    @classmethod
+    def read_metadata(cls, filename):
+        """Lit les métadonnées d'un fichier compilé sans projeter les mots.
+
+        Returns:
+            dict: Les métadonnées passées à save(), ou None si le fichier
+            n'est pas un index compilé lisible.
+        """
+        try:
+            with open(filename, "rb") as compiled_file:
+                magic, size = COMPILED_HEADER.unpack(compiled_file.read(COMPILED_HEADER.size))
+                if magic != COMPILED_MAGIC:
+                    return None
+                return json.loads(compiled_file.read(size))["metadata"]
+        except (OSError, ValueError, KeyError, struct.error):
+            return None
+
+    @classmethod
+    def load(cls, filename):
+        """Ouvre un index compilé par save(), projeté en mémoire en lecture seule.
+
+        Les pages du fichier sont partagées entre tous les processus qui
+        l'ouvrent ; seuls les masques des mots utilisés sont propres à chacun.
+
+        Args:
+            filename (str): Fichier compilé.
+
+        Returns:
+            WordIndex: L'index.
+
+        Raises:
+            ValueError: Si le fichier n'est pas un index compilé.
+        """
+        with open(filename, "rb") as compiled_file:
+            buffer = mmap.mmap(compiled_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, size = COMPILED_HEADER.unpack_from(buffer)
+        if magic != COMPILED_MAGIC:
+            raise ValueError(f"{filename} is not a compiled word index.")
+        header = json.loads(buffer[COMPILED_HEADER.size:COMPILED_HEADER.size + size])
+        data = COMPILED_HEADER.size + size
+
+        index = cls.__new__(cls)
+        index._by_length = {}
+        for length, entry in header["lengths"].items():
+            index._by_length[int(length)] = PackedWords(buffer, data + entry["words"], entry["count"],
+                                                        int(length) * header["width"], header["encoding"])
+            for position in entry["masks"]:
+                for letter in position:
+                    position[letter] += data
+
+        index._ordinals = {}
+        index._letter_masks = {}
+        index._weights = None
+        index._compiled = (buffer, header)
+        index.path = filename
+        index.alphabet = frozenset(header["alphabet"])
+        index.reset()
+        return index
+
+
+def build_alias_table(weights):
+    """Construit la table d'alias (méthode de Vose) d'une suite de poids.
+
+    Un tirage pondéré se fait ensuite en O(1) : on tire une case i
+    uniformément, puis on garde i avec la probabilité probabilities[i], et
+    on prend aliases[i] sinon.
+
+    Args:
+        weights (array): Poids strictement positifs.
+
+    Returns:
+        tuple: Tableaux (probabilities, aliases), de la taille de weights.
+    """
+    n = len(weights)
+    total = sum(weights)
+    scaled = array.array("d", (weight * n / total for weight in weights))
+    probabilities = array.array("d", bytes(8 * n))
+    aliases = array.array("l", range(n))
+    small = [i for i in range(n) if scaled[i] < 1.0]
+    large = [i for i in range(n) if scaled[i] >= 1.0]
+
+    while small and large:
+        less, more = small.pop(), large.pop()
+        probabilities[less] = scaled[less]
+        aliases[less] = more
+        scaled[more] -= 1.0 - scaled[less]
+        (small if scaled[more] < 1.0 else large).append(more)
+
+    # Restes dus aux arrondis : ces cases sont gardées à coup sûr
+    for i in small + large:
+        probabilities[i] = 1.0
+    return probabilities, aliases
+
+
+def set_bit_positions(mask):
+    """Énumère les positions des bits à 1 d'un masque, dans l'ordre croissant.
+
+    Le masque est converti une seule fois en octets puis parcouru par blocs
+    de 64 bits : le coût est proportionnel à sa taille plus son nombre de
+    bits à 1, au lieu de leur produit quand on efface un bit à la fois.
+
+    Args:
+        mask (int): Masque de bits, positif ou nul.
+
+    Yields:
+        int: Position de chaque bit à 1.
+    """
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for start in range(0, len(data), 8):
+        block = int.from_bytes(data[start:start + 8], "little")
+        while block:
+            low = block & -block
+            yield 8 * start + low.bit_length() - 1
+            block ^= low
+
+
+def nth_set_bit(mask, n):
+    """Retourne la position du n-ième bit à 1 d'un masque, en comptant à partir de 0.
+
+    Les bits à 1 sont comptés avec int.bit_count() par blocs de
+    SCAN_BLOCK_BYTES octets, puis par mots de 64 bits dans le bloc trouvé :
+    le coût est proportionnel à la taille du masque, quel que soit n.
+
+    Args:
+        mask (int): Masque de bits.
+        n (int): Rang du bit cherché, inférieur au nombre de bits à 1 du masque.
+
+    Returns:
+        int: Position du bit.
+    """
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for start in range(0, len(data), SCAN_BLOCK_BYTES):
+        block = int.from_bytes(data[start:start + SCAN_BLOCK_BYTES], "little")
+        count = block.bit_count()
+        if n < count:
+            break
+        n -= count
+
+    position = 8 * start
+    while True:
+        word = block & 0xFFFFFFFFFFFFFFFF
+        count = word.bit_count()
+        if n < count:
+            break
+        n -= count
+        block >>= 64
+        position += 64
+
+    for _ in range(n):
+        word &= word - 1
+    return position + (word & -word).bit_length() - 1